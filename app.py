@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask
 from sqlalchemy import create_engine
 from flask_cors import CORS
@@ -5,6 +6,9 @@ from flask_cors import CORS
 from models import *
 from services import *
 from views import *
+from cache import SingleFlight
+from recommend import Word2VecModel, ModelRegistry, SimilarityPool, Selector, UserProfiles, Autocomplete, TrendsCache, GuardedTrendsClient, CircuitBreaker, \
+    TrendsSnapshotStore, TrendsSnapshotImporter, fetch_related_topics, fetch_related_topics_batch
 
 class Services:
     pass
@@ -26,18 +30,171 @@ def create_app(test_config = None):
     note_dao = NoteDao(database)
     page_dao = PageDao(database)
     link_dao = LinkDao(database)
+    recommendation_dao = RecommendationDao(database)
     # tag_dao = TagDao(database)
 
+    ## Recommendation Model
+    # 프로세스당 한 번만 불러오고, 벡터는 mmap으로 worker 간에 공유한다.
+    # 모델 옆에 IVF 인덱스가 있으면 W2V_ANN_N_PROBE개의 클러스터만 탐색한다. (0이면 전체 검색)
+    # W2V_QUANTIZED('float16', 'int8')를 지정하면 양자화된 벡터로 검색해서 worker당 메모리를 줄인다.
+    def create_w2v_model(model_path):
+        return Word2VecModel(
+            model_path,
+            n_probe=app.config.get('W2V_ANN_N_PROBE'),
+            quantized=app.config.get('W2V_QUANTIZED')
+        )
+
+    w2v_model = create_w2v_model(app.config.get('W2V_MODEL_PATH', './recommend/w2v_model/w2v_sg.model'))
+    if app.config.get('W2V_WARM_UP', True):
+        try:
+            app.logger.info('[recommend] Word2Vec 모델 워밍업 완료: %s', w2v_model.warm_up())
+        except Exception as e:
+            app.logger.warning('[recommend] Word2Vec 모델 워밍업 실패: %s', e)
+
+    # 재학습한 모델은 재배포 없이 /recommend/admin/model/reload 로 백그라운드에서 불러와 교체하고,
+    # 문제가 있으면 직전 버전으로 되돌린다.
+    model_registry = ModelRegistry(w2v_model, create_w2v_model, keep=app.config.get('W2V_KEEP_VERSIONS', 2))
+
+    # W2V_PROCESS_POOL_WORKERS를 지정하면 유사 단어 검색을 worker 프로세스에서 실행해서 CRUD 요청 thread가 GIL에 막히지 않게 한다.
+    # 대기 중인 검색이 W2V_PROCESS_POOL_MAX_PENDING개를 넘으면 503으로 바로 거절한다.
+    # worker 프로세스는 spawn으로 만들기 때문에 python app.py로 실행하면 worker가 app.py를 __mp_main__으로 다시 import한다. (파일 끝 참고)
+    similarity_pool = None
+    if app.config.get('W2V_PROCESS_POOL_WORKERS'):
+        similarity_pool = SimilarityPool(
+            w2v_model.model_path,
+            max_workers=app.config['W2V_PROCESS_POOL_WORKERS'],
+            max_pending=app.config.get('W2V_PROCESS_POOL_MAX_PENDING'),
+            model_kwargs={
+                'n_probe': app.config.get('W2V_ANN_N_PROBE'),
+                'quantized': app.config.get('W2V_QUANTIZED')
+            }
+        )
+
+    # google trends 호출은 시간 제한, 동시 호출 제한, 차단기로 감싸서 upstream이 느려져도 worker가 묶이지 않게 한다.
+    trends_client = GuardedTrendsClient(
+        fetch_related_topics,
+        fetch_related_topics_batch,
+        timeout=app.config.get('TRENDS_TIMEOUT', 10.0),
+        max_concurrency=app.config.get('TRENDS_MAX_CONCURRENCY', 2),
+        max_retries=app.config.get('TRENDS_MAX_RETRIES', 1),
+        breaker=CircuitBreaker(
+            failure_threshold=app.config.get('TRENDS_BREAKER_FAILURE_THRESHOLD', 5),
+            reset_timeout=app.config.get('TRENDS_BREAKER_RESET_TIMEOUT', 60.0)
+        )
+    )
+
+    # google trends 결과는 하루 동안 그대로 사용하고, 이후 일주일까지는 백그라운드에서 갱신하면서 사용한다.
+    trends_cache = TrendsCache(
+        trends_client.fetch,
+        app.config.get('TRENDS_CACHE_PATH', './recommend/google_trends/trends_cache.sqlite3'),
+        ttl=app.config.get('TRENDS_CACHE_TTL', 24 * 60 * 60),
+        stale_ttl=app.config.get('TRENDS_CACHE_STALE_TTL', 7 * 24 * 60 * 60),
+        max_size=app.config.get('TRENDS_CACHE_MAX_SIZE', 1024),
+        fetch_many=trends_client.fetch_many
+    )
+
+    # pages.keyword의 google trends 결과를 미리 모아 둔 로컬 저장소 (python -m recommend.google_trends.snapshot 으로 채운다.)
+    # TRENDS_SNAPSHOT_REFRESH_INTERVAL을 지정하면 주기적으로 갱신한다. (cron에서 CLI로 갱신하는 것을 권장)
+    # 이때 worker마다 google trends를 호출하지 않도록 TRENDS_SNAPSHOT_PATH.lock 파일 잠금을 잡은 프로세스 하나만 갱신하고,
+    # TRENDS_SNAPSHOT_ONLY이면 요청 처리 중에는 google trends를 호출하지 않는다.
+    trends_snapshot = None
+    if app.config.get('TRENDS_SNAPSHOT_PATH'):
+        trends_snapshot = TrendsSnapshotStore(
+            app.config['TRENDS_SNAPSHOT_PATH'],
+            max_size=app.config.get('TRENDS_SNAPSHOT_MAX_SIZE', 4096),
+            # 다른 프로세스가 갱신한 결과는 TRENDS_SNAPSHOT_MEMORY_TTL초 안에 반영된다.
+            memory_ttl=app.config.get('TRENDS_SNAPSHOT_MEMORY_TTL', 5 * 60)
+        )
+        if app.config.get('TRENDS_SNAPSHOT_REFRESH_INTERVAL'):
+            TrendsSnapshotImporter(
+                trends_snapshot,
+                trends_client.fetch_many,
+                page_dao.find_distinct_keywords,
+                max_age=app.config.get('TRENDS_SNAPSHOT_MAX_AGE', 24 * 60 * 60)
+            ).start(app.config['TRENDS_SNAPSHOT_REFRESH_INTERVAL'], lock_path=app.config['TRENDS_SNAPSHOT_PATH'] + '.lock')
+
+    # 추천 과정에서 원격 호출과 DB 조회를 동시에 실행하기 위한 공유 thread pool
+    recommend_executor = ThreadPoolExecutor(
+        max_workers=app.config.get('RECOMMEND_POOL_WORKERS', 8),
+        thread_name_prefix='recommend'
+    )
+
+    # 페이지 키워드가 바뀌면 추천 후보를 미리 계산해서 page_recommendations 테이블에 저장하는 thread pool
+    recommend_store_executor = ThreadPoolExecutor(
+        max_workers=app.config.get('RECOMMEND_STORE_WORKERS', 2),
+        thread_name_prefix='recommend-store'
+    )
+
+    # 추천 후보 선택 방법: 'sample'(keyword, page_id로 시드를 고정한 가중 무작위 선택) 또는 'top_k'(관계 정도 상위)
+    # 어느 쪽이든 같은 요청에는 항상 같은 결과를 반환한다.
+    selector = Selector(app.config.get('RECOMMEND_SELECTION_MODE', 'sample'), k=app.config.get('RECOMMEND_SELECTION_K', 5))
+
+    # RECOMMEND_PERSONALIZATION_WEIGHT를 지정하면 페이지 소유자의 모든 페이지 키워드로 만든 프로필로 추천 후보를 다시 정렬한다.
+    # 프로필은 사용자별로 캐시하고 페이지 생성, 수정, 삭제 이벤트로 갱신한다.
+    user_profiles = None
+    if app.config.get('RECOMMEND_PERSONALIZATION_WEIGHT'):
+        user_profiles = UserProfiles(
+            page_dao.find_page_id_and_keyword_by_user_id,
+            page_dao.find_page_owner_id_by_page_id,
+            weight=app.config['RECOMMEND_PERSONALIZATION_WEIGHT'],
+            max_size=app.config.get('RECOMMEND_PROFILE_CACHE_SIZE', 10000),
+            ttl=app.config.get('RECOMMEND_PROFILE_TTL', 60 * 60)
+        )
+
+    # /recommend/autocomplete 의 접두사 색인 (빈도 상위 AUTOCOMPLETE_VOCAB_SIZE개 단어와 사용자의 페이지 키워드)
+    # 단어 사전 색인은 첫 요청 전에 백그라운드에서 만들어 둔다.
+    autocomplete = None
+    if app.config.get('AUTOCOMPLETE_ENABLED', True):
+        autocomplete = Autocomplete(
+            page_dao.find_page_id_and_keyword_by_user_id,
+            max_vocab=app.config.get('AUTOCOMPLETE_VOCAB_SIZE', 200000),
+            user_ttl=app.config.get('AUTOCOMPLETE_USER_TTL', 5 * 60)
+        )
+        recommend_store_executor.submit(autocomplete.vocabulary_index, model_registry.current)
+
     ## Business Layer
+    # 데이터 변경(노트, 페이지, 연결, 사용자) 이벤트로 서비스의 캐시를 무효화한다.
+    event_bus = EventBus()
+
+    # 권한 확인 데코레이터(confirm_auth, confirm_note_permission)가 사용하는 페이지 -> 노트 -> 소유주, 노트 -> 공유 권한 캐시
+    # 노트, 페이지 생성/수정/삭제 이벤트로 갱신하고, 공유 권한은 다른 프로세스의 변경에 대비해 AUTH_CACHE_TTL초 후 다시 조회한다.
+    authorization_cache = AuthorizationCache(
+        note_dao, page_dao, event_bus,
+        max_size=app.config.get('AUTH_CACHE_SIZE', 100000),
+        ttl=app.config.get('AUTH_CACHE_TTL', 60)
+    )
+
     services = Services
-    services.jwt_service = JWTService(user_dao, app.config)
+    services.authorization_cache = authorization_cache
+    services.jwt_service = JWTService(user_dao, app.config, event_bus)
     services.auth_service = AuthService(user_dao)
-    services.user_service = UserService(user_dao)
-    services.note_service = NoteService(note_dao)
-    services.page_service = PageService(page_dao)
-    services.link_service = LinkService(link_dao)
+    services.user_service = UserService(user_dao, event_bus)
+    services.note_service = NoteService(note_dao, event_bus, authorization_cache, services.jwt_service)
+    services.page_service = PageService(page_dao, event_bus, authorization_cache, services.jwt_service)
+    # 연결 제안(/link/suggest)은 노트별로 캐시하고, 다른 프로세스의 변경에 대비해 LINK_SUGGESTION_TTL초 후 다시 계산한다.
+    services.link_service = LinkService(
+        link_dao, page_dao, model_registry, event_bus,
+        suggestion_cache_size=app.config.get('LINK_SUGGESTION_CACHE_SIZE', 256),
+        suggestion_ttl=app.config.get('LINK_SUGGESTION_TTL', 60)
+    )
     # services.tag_service = TagService(tag_dao, page_dao)
-    services.recommend_service = RecommendService(page_dao)
+    services.recommend_service = RecommendService(
+        page_dao, recommendation_dao, model_registry, trends_cache, SingleFlight(), trends_client,
+        recommend_executor, recommend_store_executor, selector, event_bus, similarity_pool,
+        store_ttl=app.config.get('RECOMMEND_STORE_TTL', 24 * 60 * 60),
+        trends_snapshot=trends_snapshot,
+        snapshot_only=app.config.get('TRENDS_SNAPSHOT_ONLY', False),
+        user_profiles=user_profiles,
+        autocomplete=autocomplete
+    )
+
+    # DAO는 요청마다 기본 키로 조회한 행을 flask.g의 IdentityMap에 보관해서 같은 행을 다시 조회하지 않는다.
+    # 요청이 끝나면 버리고, IDENTITY_MAP_LOG_DUPLICATES(기본값: debug 모드)이면 같은 행을 여러 번 조회하려고 한 경우를 기록한다.
+    log_duplicate_fetches = app.config.get('IDENTITY_MAP_LOG_DUPLICATES', app.debug)
+
+    @app.teardown_request
+    def teardown_identity_map(exception):
+        release_identity_map(log_duplicates=log_duplicate_fetches)
 
     ## endpoint 생성
     create_endpoint(app, services)
@@ -54,7 +211,10 @@ def create_app(test_config = None):
 
     return app
 
-app = create_app()
+# spawn으로 만든 SimilarityPool worker는 실행한 스크립트(python app.py)를 __mp_main__으로 다시 import하므로
+# 그때는 앱을 만들지 않는다. (gunicorn app:app 등 WSGI 서버의 진입점은 그대로 app:app)
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
     app.run(debug=True)
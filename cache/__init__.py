@@ -0,0 +1,7 @@
+from .lru_cache import LRUCache
+from .single_flight import SingleFlight
+
+__all__ = [
+    "LRUCache",
+    "SingleFlight"
+]
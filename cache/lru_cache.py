@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """최대 크기와 TTL을 가진 thread-safe LRU 캐시입니다.
+    최대 크기를 넘으면 가장 오래 사용하지 않은 항목부터 삭제하고,
+    ttl이 지난 항목은 조회할 때 삭제합니다. (ttl이 None이면 만료되지 않음)
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """key로 캐시된 값을 조회합니다.
+        만약 값이 없거나 만료되었다면 default를 반환합니다.
+
+        :param key: 조회할 key
+        :param default: 값이 없을 때 반환할 값
+        :return: 캐시된 값
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] is not None and item[1] <= time.monotonic():
+                del self._data[key]
+                item = None
+
+            if item is None:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+
+            return item[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """key에 값을 저장합니다.
+
+        :param key: 저장할 key
+        :param value: 저장할 값
+        :param ttl: 이 항목에만 적용할 ttl (기본값: 캐시의 ttl)
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """key의 값을 삭제합니다.
+
+        :param key: 삭제할 key
+        :return: 삭제 여부 (True/False)
+        """
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and (item[1] is None or item[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """캐시 사용 정보를 조회합니다.
+
+        :return: 캐시 사용 정보를 포함한 딕셔너리:
+            {
+                'size': int,        # 저장된 항목 수
+                'max_size': int,    # 최대 항목 수
+                'hits': int,        # 적중 횟수
+                'misses': int,      # 실패 횟수
+                'evictions': int,   # 크기 제한으로 삭제된 항목 수
+                'hit_ratio': float  # 적중률
+            }
+        """
+        requests = self.hits + self.misses
+
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / requests if requests else 0.0
+        }
@@ -0,0 +1,75 @@
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """같은 key에 대한 동시 호출을 하나의 계산으로 합칩니다.
+    먼저 들어온 호출(leader)만 함수를 실행하고, 실행 중에 들어온 같은 key의 호출은
+    leader의 결과(또는 예외)를 함께 받습니다. 결과는 저장하지 않으므로 실행이 끝나면 다음 호출은 다시 실행합니다.
+
+    결과 객체는 모든 호출자가 공유하므로 호출자는 결과를 수정하지 말아야 합니다.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """key에 대해 진행 중인 호출이 있으면 그 결과를 기다리고, 없으면 fn을 실행합니다.
+
+        :param key: 호출을 구분하는 key
+        :param fn: 실행할 함수
+        :return: fn의 반환값
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+    def stats(self) -> dict:
+        """호출 정보를 조회합니다.
+
+        :return: 호출 정보를 포함한 딕셔너리:
+            {
+                'executions': int,  # 실제로 실행한 횟수
+                'coalesced': int,   # 진행 중인 호출과 합쳐진 횟수
+                'in_flight': int    # 현재 진행 중인 key 수
+            }
+        """
+        return {
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._calls)
+        }
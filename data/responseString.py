@@ -13,6 +13,7 @@ class IndexMessage(Enum):
 
 
 class JwtMessage(Enum):
+    GET = '[jwt] 요청 완료'
     FAIL_NOT_INVALID = '[jwt] 유효하지 않는 토큰'
     FAIL_NOT_EXISTS = '[jwt] 존재하지 않는 토큰'
     ERROR = '[jwt] 요청 오류 발생'
@@ -70,6 +71,7 @@ class LinkMessage(Enum):
     FAIL_IS_INCLUDED_IN_DIFFERENT_NOTE = '[link] 노트가 다름'
     FAIL_NOT_PERMISSION = '[link] 접근 권한 없음'
     FAIL_IS_EXISTS = '[link] 이미 존재하는 연결입니다.'
+    FAIL_INVALID_REQUEST = '[link] 잘못된 요청'
     ERROR = '[link] 요청 중 오류 발생'
 
 class TagMessage(Enum):
@@ -87,4 +89,8 @@ class VisualizationMessage(Enum):
 
 class RecommendMessage(Enum):
     GET = '[recommend] 요청 완료'
+    FAIL_INVALID_REQUEST = '[recommend] 잘못된 요청'
+    FAIL_MODEL_LOADING = '[recommend] 다른 모델 버전을 불러오는 중'
+    FAIL_NO_PREVIOUS_MODEL = '[recommend] 되돌릴 모델 버전 없음'
+    FAIL_OVERLOADED = '[recommend] 요청이 많아 잠시 후 다시 시도'
     ERROR = '[recommend] 요청 중 오류 발생'
@@ -3,11 +3,17 @@ from .note_dao import NoteDao
 from .page_dao import PageDao
 from .link_dao import LinkDao
 from .tag_dao import TagDao
+from .recommendation_dao import RecommendationDao
+from .identity_map import IdentityMap, current_identity_map, release_identity_map
 
 __all__ = [
     "UserDao",
     "NoteDao",
     "PageDao",
     "LinkDao",
-    "TagDao"
+    "TagDao",
+    "RecommendationDao",
+    "IdentityMap",
+    "current_identity_map",
+    "release_identity_map"
 ]
\ No newline at end of file
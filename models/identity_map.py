@@ -0,0 +1,182 @@
+from collections import Counter
+from typing import Hashable, Iterable, Optional
+
+from flask import current_app, g, has_request_context, request
+
+_MISSING = object()
+
+
+def _pk(key: Hashable) -> Hashable:
+    # 요청 인자로 받은 id('3')와 DB에서 받은 id(3)를 같은 key로 보관한다.
+    try:
+        return int(key)
+    except (TypeError, ValueError):
+        return key
+
+
+class _Row(dict):
+    """보관한 행의 열 값 (complete이면 DAO의 get_*_info가 반환하는 모든 열을 가지고 있다.)"""
+
+    def __init__(self, values: dict, complete: bool):
+        super().__init__(values)
+        self.complete = complete
+
+
+class IdentityMap:
+    """한 요청 안에서 기본 키로 조회한 행을 보관합니다. (요청마다 새로 만들고 요청이 끝나면 버린다.)
+
+    - 행 전체(get_*_info)뿐 아니라 권한 확인 쿼리처럼 일부 열만 조회한 결과도 열 단위로 보관합니다.
+    - 같은 요청에서 이미 알고 있는 행이나 열을 다시 조회하면 DB 대신 보관한 값을 반환합니다.
+    - 같은 요청에서 행을 수정하면 보관한 행에 수정한 값을 반영하고, 삭제하면 존재하지 않는 행(None)으로 보관합니다.
+      (DB가 정하는 updated_at은 보관한 행에서 지우고 다음 조회 때 DB에서 읽는다.)
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self.fetches = Counter()
+        self.hits = Counter()
+
+    def get(self, table: str, key: Hashable):
+        """보관한 행을 조회합니다. 없으면 _MISSING, 존재하지 않는 행이면 None을 반환합니다."""
+        return self._rows.get((table, key), _MISSING)
+
+    def hit(self, table: str, key: Hashable):
+        self.hits[(table, key)] += 1
+
+    def fetched(self, table: str, key: Hashable):
+        self.fetches[(table, key)] += 1
+
+    def merge(self, table: str, key: Hashable, values: Optional[dict], complete: bool = False):
+        """행(또는 일부 열)을 보관한 행에 합칩니다. values가 None이면 존재하지 않는 행으로 보관합니다."""
+        if values is None:
+            self._rows[(table, key)] = None
+            return
+
+        row = self._rows.get((table, key))
+        if row is None:
+            self._rows[(table, key)] = _Row(values, complete)
+        else:
+            row.update(values)
+            row.complete = row.complete or complete
+
+    def duplicates(self) -> dict:
+        """같은 행을 두 번 이상 조회하려고 한 횟수를 조회합니다.
+
+        :return: '테이블#기본 키'를 key로, 조회하려고 한 횟수를 value로 하는 딕셔너리
+        """
+        keys = set(self.hits) | {key for key, count in self.fetches.items() if count > 1}
+
+        return {
+            f'{table}#{key}': self.fetches[(table, key)] + self.hits[(table, key)]
+            for table, key in keys
+        }
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    """현재 요청의 IdentityMap을 조회합니다. 요청 밖(백그라운드 thread 등)에서는 None을 반환합니다."""
+    if not has_request_context():
+        return None
+
+    identity_map = g.get('identity_map')
+    if identity_map is None:
+        identity_map = g.identity_map = IdentityMap()
+
+    return identity_map
+
+
+def find_row(table: str, key: Hashable, fetch) -> Optional[dict]:
+    """현재 요청에서 이미 조회한 행 전체가 있으면 그 행을, 없으면 fetch로 조회하고 보관한 행을 반환합니다.
+    (반환한 딕셔너리를 수정해도 보관한 행은 바뀌지 않는다.)
+
+    :param table: 테이블 이름
+    :param key: 기본 키
+    :param fetch: 행 전체를 조회하는 함수 (행이 없으면 None 반환)
+    :return: 조회한 행 (없으면 None)
+    """
+    identity_map = current_identity_map()
+    if identity_map is None:
+        return fetch()
+
+    key = _pk(key)
+    row = identity_map.get(table, key)
+    if row is None or (row is not _MISSING and row.complete):
+        identity_map.hit(table, key)
+        return dict(row) if row is not None else None
+
+    identity_map.fetched(table, key)
+    row = fetch()
+    identity_map.merge(table, key, row, complete=True)
+
+    return dict(row) if row is not None else None
+
+
+def find_columns(table: str, key: Hashable, columns: Iterable[str]) -> tuple:
+    """현재 요청에서 이미 알고 있는 열 값을 조회합니다. (일부 열만 조회하는 DAO 메소드가 DB 대신 사용)
+    모르는 열이 있으면 DAO가 직접 조회하고 remember_columns로 결과를 보관합니다.
+
+    :param table: 테이블 이름
+    :param key: 기본 키
+    :param columns: 필요한 열 이름 (비어 있으면 행의 존재 여부만 확인)
+    :return: (모든 열을 알고 있는지, 행) 튜플 (행이 존재하지 않으면 (True, None))
+    """
+    identity_map = current_identity_map()
+    if identity_map is None or key is None:
+        return False, None
+
+    key = _pk(key)
+    row = identity_map.get(table, key)
+    if row is None or (row is not _MISSING and all(column in row for column in columns)):
+        identity_map.hit(table, key)
+        return True, row
+
+    return False, None
+
+
+def remember_columns(table: str, key: Hashable, values: Optional[dict]):
+    """일부 열만 DB에서 조회한 결과를 보관합니다. (values가 None이면 존재하지 않는 행)"""
+    identity_map = current_identity_map()
+    if identity_map is not None and key is not None:
+        identity_map.fetched(table, _pk(key))
+        identity_map.merge(table, _pk(key), values)
+
+
+def update_row(table: str, key: Hashable, values: dict, stale: Iterable[str] = ()):
+    """현재 요청에서 수정한 열 값을 보관한 행에 반영합니다. (보관한 행이 없으면 수정한 열만 보관)
+    DB가 값을 정하는 열(updated_at 등)은 stale로 넘겨서 보관한 행에서 지우고, 다음 조회 때 DB에서 다시 읽습니다.
+
+    :param table: 테이블 이름
+    :param key: 기본 키
+    :param values: 수정한 열 값
+    :param stale: 수정으로 값이 바뀌었지만 알 수 없는 열 이름
+    """
+    identity_map = current_identity_map()
+    if identity_map is None:
+        return
+
+    key = _pk(key)
+    if identity_map.get(table, key) is None:
+        return
+
+    identity_map.merge(table, key, values)
+    row = identity_map.get(table, key)
+    for column in stale:
+        if row.pop(column, _MISSING) is not _MISSING:
+            row.complete = False
+
+
+def forget_row(table: str, key: Hashable):
+    """현재 요청에서 삭제한 행을 존재하지 않는 행으로 보관합니다."""
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        identity_map.merge(table, _pk(key), None)
+
+
+def release_identity_map(log_duplicates: bool = False):
+    """요청이 끝나면 IdentityMap을 버립니다. log_duplicates이면 같은 행을 여러 번 조회하려고 한 경우를 기록합니다."""
+    identity_map = g.pop('identity_map', None) if has_request_context() else None
+    if identity_map is None or not log_duplicates:
+        return
+
+    duplicates = identity_map.duplicates()
+    if duplicates:
+        current_app.logger.debug('[identity map] %s 중복 조회: %s', request.endpoint, duplicates)
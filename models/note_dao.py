@@ -1,6 +1,8 @@
 from sqlalchemy import text
 from typing import Optional
 
+from .identity_map import find_row, find_columns, remember_columns, update_row, forget_row
+
 class NoteDao:
     def __init__(self, database):
         self.db = database
@@ -64,6 +66,9 @@ class NoteDao:
                 'updated_at': str           # 노트 마지막 수정일
             }
         """
+        return find_row('notes', note_id, lambda: self._select_note_info(note_id))
+
+    def _select_note_info(self, note_id: int) -> Optional[dict]:
         try:
             note = self.db.execute(text("""
                 SELECT
@@ -145,6 +150,10 @@ class NoteDao:
         :param note_id: 조회할 노트 id
         :return: 사용자 id
         """
+        found, note = find_columns('notes', note_id, ('user_id',))
+        if found:
+            return note['user_id'] if note else -1
+
         try:
             row = self.db.execute(text("""
                 SELECT
@@ -157,6 +166,7 @@ class NoteDao:
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        remember_columns('notes', note_id, {'user_id': row['user_id']} if row else None)
         return row['user_id'] if row else -1
 
     def find_shared_permission_by_note_id(self, note_id: int) -> int:
@@ -167,6 +177,10 @@ class NoteDao:
         :param note_id: 조회할 노트 id
         :return: 해당 노트의 공유 권한
         """
+        found, note = find_columns('notes', note_id, ('shared_permission',))
+        if found:
+            return note['shared_permission'] if note else -1
+
         try:
             row = self.db.execute(text("""
                 SELECT
@@ -179,8 +193,103 @@ class NoteDao:
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        remember_columns('notes', note_id, {'shared_permission': row['shared_permission']} if row else None)
         return row['shared_permission'] if row else -1
 
+    def find_updated_at_by_note_id(self, note_id: int) -> Optional[str]:
+        """노트 id로 노트 마지막 수정일을 조회합니다. (수정일은 DB가 정하므로 수정한 후에는 DB에서 다시 조회)
+        만약 노트가 존재하지 않으면 None을 반환하고,
+        에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param note_id: 조회할 노트 id
+        :return: 노트 마지막 수정일
+        """
+        found, note = find_columns('notes', note_id, ('updated_at',))
+        if found:
+            return note['updated_at'] if note else None
+
+        try:
+            row = self.db.execute(text("""
+                SELECT
+                    updated_at
+                FROM notes
+                WHERE id = :note_id
+            """), {
+                'note_id': note_id
+            }).fetchone()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        remember_columns('notes', note_id, {'updated_at': row['updated_at']} if row else None)
+        return row['updated_at'] if row else None
+
+    def find_note_access(self, note_id: int, user_id: int) -> Optional[dict]:
+        """사용자의 존재 여부와 노트의 소유주(사용자) id, 공유 권한을 한 번에 조회합니다.
+        (로그인 확인과 노트 권한 확인을 하나의 쿼리로 처리)
+        만약 사용자가 존재하지 않으면 None을 반환하고,
+        에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param note_id: 조회할 노트 id
+        :param user_id: 요청한 사용자 id
+        :return: 노트 권한 정보를 포함한 딕셔너리 (노트가 존재하지 않으면 각 값이 -1):
+            {
+                'note_id': int,             # 노트 id
+                'owner_id': int,            # 노트 소유주(사용자) id
+                'shared_permission': int    # 노트 공유 권한
+            }
+        """
+        # 같은 요청에서 사용자와 노트를 이미 조회했으면 다시 조회하지 않는다.
+        found, user = find_columns('users', user_id, ())
+        if found and user is None:
+            return None
+        if found:
+            found, note = find_columns('notes', note_id, ('user_id', 'shared_permission'))
+            if found:
+                return {
+                    'note_id': int(note_id),
+                    'owner_id': note['user_id'],
+                    'shared_permission': note['shared_permission']
+                } if note is not None else {
+                    'note_id': -1,
+                    'owner_id': -1,
+                    'shared_permission': -1
+                }
+
+        try:
+            row = self.db.execute(text("""
+                SELECT
+                    notes.id AS note_id,
+                    notes.user_id AS owner_id,
+                    notes.shared_permission
+                FROM users
+                LEFT JOIN notes ON notes.id = :note_id
+                WHERE users.id = :user_id
+            """), {
+                'note_id': note_id,
+                'user_id': user_id
+            }).fetchone()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        remember_columns('users', user_id, {} if row else None)
+        if row is None:
+            return None
+
+        remember_columns('notes', note_id, {
+            'user_id': row['owner_id'],
+            'shared_permission': row['shared_permission']
+        } if row['note_id'] is not None else None)
+
+        return {
+            'note_id': row['note_id'],
+            'owner_id': row['owner_id'],
+            'shared_permission': row['shared_permission']
+        } if row['note_id'] is not None else {
+            'note_id': -1,
+            'owner_id': -1,
+            'shared_permission': -1
+        }
+
 
     # update
     def update_note_info(self, note: dict) -> bool:
@@ -205,10 +314,21 @@ class NoteDao:
                     description = :description,
                     shared_permission = :shared_permission
                 WHERE id = :note_id
-            """), note).rowcount
+            """), {
+                'title': note['title'],
+                'description': note['description'],
+                'shared_permission': note['shared_permission'],
+                'note_id': note['note_id']
+            }).rowcount
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        if updated_rowcnt and updated_rowcnt > 0:
+            update_row('notes', note['note_id'], {
+                'title': note['title'],
+                'description': note['description'],
+                'shared_permission': note['shared_permission']
+            }, stale=('updated_at',))
         return updated_rowcnt and updated_rowcnt > 0
 
 
@@ -231,4 +351,5 @@ class NoteDao:
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        forget_row('notes', note_id)
         return deleted_rowcnt and deleted_rowcnt > 0
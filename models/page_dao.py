@@ -1,6 +1,8 @@
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from typing import Optional
 
+from .identity_map import find_row, find_columns, remember_columns, update_row, forget_row
+
 class PageDao:
     def __init__(self, database):
         self.db = database
@@ -64,6 +66,9 @@ class PageDao:
                 'updated_at': str   # 페이지 마지막 수정일
             }
         """
+        return find_row('pages', page_id, lambda: self._select_page_info(page_id))
+
+    def _select_page_info(self, page_id: int) -> Optional[dict]:
         try:
             page = self.db.execute(text("""
                 SELECT
@@ -145,6 +150,10 @@ class PageDao:
         :param page_id: 조회할 페이지 id
         :return: 노트 id
         """
+        found, page = find_columns('pages', page_id, ('note_id',))
+        if found:
+            return page['note_id'] if page else -1
+
         try:
             row = self.db.execute(text("""
                 SELECT
@@ -157,8 +166,36 @@ class PageDao:
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        remember_columns('pages', page_id, {'note_id': row['note_id']} if row else None)
         return row['note_id'] if row else -1
 
+    def find_updated_at_by_page_id(self, page_id: int) -> Optional[str]:
+        """페이지 id로 페이지 마지막 수정일을 조회합니다. (수정일은 DB가 정하므로 수정한 후에는 DB에서 다시 조회)
+        만약 페이지 정보가 존재하지 않으면 None을 반환하고,
+        에러가 발생하면 'Runtime Error' 예외가 발생합니다.
+
+        :param page_id: 조회할 페이지 id
+        :return: 페이지 마지막 수정일
+        """
+        found, page = find_columns('pages', page_id, ('updated_at',))
+        if found:
+            return page['updated_at'] if page else None
+
+        try:
+            row = self.db.execute(text("""
+                SELECT
+                    updated_at
+                FROM pages
+                WHERE id = :page_id
+            """), {
+                'page_id': page_id
+            }).fetchone()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        remember_columns('pages', page_id, {'updated_at': row['updated_at']} if row else None)
+        return row['updated_at'] if row else None
+
     def find_page_owner_id_by_page_id(self, page_id: int) -> int:
         """페이지 id로 노트의 소유주(사용자) id를 조회합니다.
         만약 페이지 정보가 존재하지 않으면 -1을 반환하고,
@@ -182,6 +219,187 @@ class PageDao:
 
         return row['user_id'] if row else -1
 
+    def find_note_id_and_owner_id_by_page_id(self, page_id: int) -> Optional[dict]:
+        """페이지 id로 노트 id와 노트의 소유주(사용자) id를 조회합니다.
+        만약 페이지 정보가 존재하지 않으면 None을 반환하고,
+        에러가 발생하면 'Runtime Error' 예외가 발생합니다.
+
+        :param page_id: 조회할 페이지 id
+        :return: 노트 id와 사용자 id를 포함한 딕셔너리:
+            {
+                'note_id': int, # 노트 id
+                'user_id': int  # 노트 소유주(사용자) id
+            }
+        """
+        cached = self._cached_note_id_and_owner_id(page_id)
+        if cached is not False:
+            return cached
+
+        try:
+            row = self.db.execute(text("""
+                SELECT
+                    pages.note_id,
+                    notes.user_id
+                FROM pages
+                INNER JOIN notes ON pages.note_id = notes.id
+                WHERE pages.id = :page_id
+            """), {
+                'page_id': page_id
+            }).fetchone()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        if row:
+            self._remember_note_id_and_owner_id(page_id, row)
+
+        return {
+            'note_id': row['note_id'],
+            'user_id': row['user_id']
+        } if row else None
+
+    def _cached_note_id_and_owner_id(self, page_id: int):
+        # 같은 요청에서 이미 알고 있으면 노트 id와 소유주 id를, 모르면 False를 반환한다.
+        found, page = find_columns('pages', page_id, ('note_id',))
+        if not found:
+            return False
+        if page is None:
+            return None
+
+        found, note = find_columns('notes', page['note_id'], ('user_id',))
+        if not found:
+            return False
+
+        return {
+            'note_id': page['note_id'],
+            'user_id': note['user_id']
+        } if note else None
+
+    def _remember_note_id_and_owner_id(self, page_id: int, row):
+        remember_columns('pages', page_id, {'note_id': row['note_id']})
+        remember_columns('notes', row['note_id'], {'user_id': row['user_id']})
+
+    def find_note_id_and_owner_id_by_page_ids(self, page_ids: list) -> dict:
+        """여러 페이지 id로 각 페이지의 노트 id와 노트의 소유주(사용자) id를 한 번에 조회합니다.
+        존재하지 않는 페이지는 결과에 포함되지 않고,
+        에러가 발생하면 'Runtime Error' 예외가 발생합니다.
+
+        :param page_ids: 조회할 페이지 id 리스트
+        :return: 페이지 id를 key로, 노트 id와 사용자 id를 포함한 딕셔너리를 value로 하는 딕셔너리:
+            {
+                page_id: {
+                    'note_id': int, # 노트 id
+                    'user_id': int  # 노트 소유주(사용자) id
+                }
+            }
+        """
+        found, missing = {}, []
+        for page_id in page_ids:
+            cached = self._cached_note_id_and_owner_id(page_id)
+            if cached is False:
+                missing.append(page_id)
+            elif cached is not None:
+                found[page_id] = cached
+
+        if not missing:
+            return found
+
+        try:
+            rows = self.db.execute(text("""
+                SELECT
+                    pages.id,
+                    pages.note_id,
+                    notes.user_id
+                FROM pages
+                INNER JOIN notes ON pages.note_id = notes.id
+                WHERE pages.id IN :page_ids
+            """).bindparams(bindparam('page_ids', expanding=True)), {
+                'page_ids': missing
+            }).fetchall()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        for row in rows:
+            self._remember_note_id_and_owner_id(row['id'], row)
+            found[row['id']] = {
+                'note_id': row['note_id'],
+                'user_id': row['user_id']
+            }
+
+        return found
+
+    def find_page_access(self, page_id: int, user_id: int) -> Optional[dict]:
+        """사용자의 존재 여부와 페이지가 속한 노트 id, 노트의 소유주(사용자) id, 공유 권한을 한 번에 조회합니다.
+        (로그인 확인과 페이지 권한 확인을 하나의 쿼리로 처리)
+        만약 사용자가 존재하지 않으면 None을 반환하고,
+        에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param page_id: 조회할 페이지 id
+        :param user_id: 요청한 사용자 id
+        :return: 페이지 권한 정보를 포함한 딕셔너리 (페이지가 존재하지 않으면 각 값이 -1):
+            {
+                'note_id': int,             # 노트 id
+                'owner_id': int,            # 노트 소유주(사용자) id
+                'shared_permission': int    # 노트 공유 권한
+            }
+        """
+        # 같은 요청에서 사용자, 페이지, 노트를 이미 조회했으면 다시 조회하지 않는다.
+        found, user = find_columns('users', user_id, ())
+        if found and user is None:
+            return None
+        if found:
+            found, page = find_columns('pages', page_id, ('note_id',))
+            note = None
+            if found and page is not None:
+                found, note = find_columns('notes', page['note_id'], ('user_id', 'shared_permission'))
+            if found:
+                return {
+                    'note_id': page['note_id'],
+                    'owner_id': note['user_id'],
+                    'shared_permission': note['shared_permission']
+                } if note is not None else {
+                    'note_id': -1,
+                    'owner_id': -1,
+                    'shared_permission': -1
+                }
+
+        try:
+            row = self.db.execute(text("""
+                SELECT
+                    pages.note_id,
+                    notes.user_id AS owner_id,
+                    notes.shared_permission
+                FROM users
+                LEFT JOIN pages ON pages.id = :page_id
+                LEFT JOIN notes ON notes.id = pages.note_id
+                WHERE users.id = :user_id
+            """), {
+                'page_id': page_id,
+                'user_id': user_id
+            }).fetchone()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        remember_columns('users', user_id, {} if row else None)
+        if row is None:
+            return None
+
+        if row['owner_id'] is not None:
+            remember_columns('pages', page_id, {'note_id': row['note_id']})
+            remember_columns('notes', row['note_id'], {
+                'user_id': row['owner_id'],
+                'shared_permission': row['shared_permission']
+            })
+
+        return {
+            'note_id': row['note_id'],
+            'owner_id': row['owner_id'],
+            'shared_permission': row['shared_permission']
+        } if row['owner_id'] is not None else {
+            'note_id': -1,
+            'owner_id': -1,
+            'shared_permission': -1
+        }
+
     def find_page_id_and_keyword_by_note_id(self, note_id: int) -> list:
         """노트 id로 노트 안에 있는 모든 페이지 id와 키워드를 조회합니다.
         에러가 발생하면 'Runtime Error' 예외가 발생합니다.
@@ -211,6 +429,53 @@ class PageDao:
             'keyword': page['keyword']
         } for page in page_list]
 
+    def find_page_id_and_keyword_by_user_id(self, user_id: int) -> list:
+        """사용자 id로 사용자의 모든 노트에 있는 페이지 id와 키워드를 조회합니다.
+        에러가 발생하면 'Runtime Error' 예외가 발생합니다.
+
+        :param user_id: 조회할 사용자 id
+        :return: 페이지 id와 키워드를 포함한 리스트:
+            [{
+                'page_id': int, # 페이지 id
+                'keyword': str  # 키워드
+            }]
+        """
+        try:
+            page_list = self.db.execute(text("""
+                SELECT
+                    pages.id,
+                    pages.keyword
+                FROM pages
+                INNER JOIN notes ON pages.note_id = notes.id
+                WHERE notes.user_id = :user_id
+            """), {
+                'user_id': user_id
+            }).fetchall()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        return [{
+            'page_id': page['id'],
+            'keyword': page['keyword']
+        } for page in page_list]
+
+    def find_distinct_keywords(self) -> list:
+        """모든 페이지에서 사용 중인 키워드를 중복 없이 조회합니다.
+        에러가 발생하면 'Runtime Error' 예외가 발생합니다.
+
+        :return: 키워드 리스트
+        """
+        try:
+            keyword_list = self.db.execute(text("""
+                SELECT DISTINCT keyword
+                FROM pages
+                WHERE keyword IS NOT NULL
+            """)).fetchall()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        return [keyword['keyword'] for keyword in keyword_list]
+
 
     # update
     def update_page_header(self, page: dict) -> bool:
@@ -241,6 +506,11 @@ class PageDao:
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        if updated_rowcnt and updated_rowcnt > 0:
+            update_row('pages', page['page_id'], {
+                'title': page['title'],
+                'keyword': page['keyword']
+            }, stale=('updated_at',))
         return updated_rowcnt and updated_rowcnt > 0
 
     def update_page_content(self, page: dict) -> bool:
@@ -267,6 +537,10 @@ class PageDao:
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        if updated_rowcnt and updated_rowcnt > 0:
+            update_row('pages', page['page_id'], {
+                'content': page['content']
+            }, stale=('updated_at',))
         return updated_rowcnt and updated_rowcnt > 0
 
 
@@ -289,4 +563,5 @@ class PageDao:
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        forget_row('pages', page_id)
         return deleted_rowcnt and deleted_rowcnt > 0
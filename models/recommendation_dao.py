@@ -0,0 +1,124 @@
+from sqlalchemy import text
+from typing import Optional
+import json
+
+# 페이지 키워드별로 미리 계산한 추천 후보를 저장하는 page_recommendations 테이블 (schema/page_recommendations.sql)
+
+class RecommendationDao:
+    def __init__(self, database):
+        self.db = database
+
+    # create, update
+    def upsert_recommendation(self, recommendation: dict) -> bool:
+        """페이지의 추천 후보를 저장합니다. 이미 있으면 덮어씁니다.
+        그리고 성공 여부(True/False)를 반환합니다.
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param recommendation: 추천 후보 정보를 포함한 딕셔너리:
+            {
+                'page_id': int,         # 페이지 id
+                'source': str,          # 추천 종류 ('trend', 'association')
+                'keyword': str,         # 후보를 계산한 페이지 키워드
+                'model_version': str,   # 후보를 계산한 모델 (없으면 None)
+                'candidates': dict      # 추천 후보
+            }
+        :return: 저장 성공 여부 (True/False)
+        """
+        try:
+            upserted_rowcnt = self.db.execute(text("""
+                INSERT INTO page_recommendations (
+                    page_id,
+                    source,
+                    keyword,
+                    model_version,
+                    candidates
+                ) VALUES (
+                    :page_id,
+                    :source,
+                    :keyword,
+                    :model_version,
+                    :candidates
+                )
+                ON DUPLICATE KEY UPDATE
+                    keyword = VALUES(keyword),
+                    model_version = VALUES(model_version),
+                    candidates = VALUES(candidates),
+                    updated_at = CURRENT_TIMESTAMP
+            """), {
+                'page_id': recommendation['page_id'],
+                'source': recommendation['source'],
+                'keyword': recommendation['keyword'],
+                'model_version': recommendation['model_version'],
+                'candidates': json.dumps(recommendation['candidates'], ensure_ascii=False)
+            }).rowcount
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        return upserted_rowcnt and upserted_rowcnt > 0
+
+
+    # read
+    def find_recommendation(self, page_id: int, source: str) -> Optional[dict]:
+        """페이지 id와 추천 종류로 저장된 추천 후보를 조회합니다.
+        만약 저장된 후보가 없으면 None을 반환하고,
+        에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param page_id: 페이지 id
+        :param source: 추천 종류 ('trend', 'association')
+        :return: 추천 후보 정보를 포함한 딕셔너리:
+            {
+                'page_id': int,         # 페이지 id
+                'source': str,          # 추천 종류
+                'keyword': str,         # 후보를 계산한 페이지 키워드
+                'model_version': str,   # 후보를 계산한 모델
+                'candidates': dict,     # 추천 후보
+                'age': int              # 저장 후 지난 시간 (초)
+            } 또는 저장된 후보가 없다면 None
+        """
+        try:
+            recommendation = self.db.execute(text("""
+                SELECT
+                    page_id,
+                    source,
+                    keyword,
+                    model_version,
+                    candidates,
+                    TIMESTAMPDIFF(SECOND, updated_at, CURRENT_TIMESTAMP) AS age
+                FROM page_recommendations
+                WHERE page_id = :page_id AND source = :source
+            """), {
+                'page_id': page_id,
+                'source': source
+            }).fetchone()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        return {
+            'page_id': recommendation['page_id'],
+            'source': recommendation['source'],
+            'keyword': recommendation['keyword'],
+            'model_version': recommendation['model_version'],
+            'candidates': json.loads(recommendation['candidates']),
+            'age': recommendation['age']
+        } if recommendation else None
+
+
+    # delete
+    def delete_recommendations_by_page_id(self, page_id: int) -> bool:
+        """페이지의 모든 추천 후보를 삭제합니다. 그리고 성공 여부(True/False)를 반환합니다.
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param page_id: 페이지 id
+        :return: 삭제 성공 여부 (True/False)
+        """
+        try:
+            deleted_rowcnt = self.db.execute(text("""
+                DELETE FROM page_recommendations
+                WHERE page_id = :page_id
+            """), {
+                'page_id': page_id
+            }).rowcount
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        return deleted_rowcnt and deleted_rowcnt > 0
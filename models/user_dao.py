@@ -1,6 +1,8 @@
 from sqlalchemy import text
 from typing import Optional
 
+from .identity_map import find_row, find_columns, remember_columns, update_row, forget_row
+
 class UserDao:
     def __init__(self, database):
         self.db = database
@@ -56,6 +58,9 @@ class UserDao:
                 'updated_at': str   # 사용자 정보 마지막 수정일
             }
         """
+        return find_row('users', user_id, lambda: self._select_user_info(user_id))
+
+    def _select_user_info(self, user_id: int) -> Optional[dict]:
         try:
             user = self.db.execute(text("""
                 SELECT
@@ -80,6 +85,59 @@ class UserDao:
             'updated_at': user['updated_at']
         } if user else None
 
+    def exists_user(self, user_id: int) -> bool:
+        """ 사용자 id의 사용자가 존재하는지 조회합니다. (기본 키만 조회)
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param user_id: 조회할 사용자 id
+        :return: 존재 여부 (True/False)
+        """
+        found, user = find_columns('users', user_id, ())
+        if found:
+            return user is not None
+
+        try:
+            row = self.db.execute(text("""
+                SELECT
+                    id
+                FROM users
+                WHERE id = :user_id
+            """), {
+                'user_id': user_id
+            }).fetchone()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        remember_columns('users', user_id, {} if row else None)
+        return row is not None
+
+    def find_updated_at_by_user_id(self, user_id: int) -> Optional[str]:
+        """ 사용자 id로 사용자 정보 마지막 수정일을 조회합니다. (수정일은 DB가 정하므로 수정한 후에는 DB에서 다시 조회)
+        만약 사용자 정보가 존재하지 않으면 None을 반환하고,
+        에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param user_id: 조회할 사용자 id
+        :return: 사용자 정보 마지막 수정일
+        """
+        found, user = find_columns('users', user_id, ('updated_at',))
+        if found:
+            return user['updated_at'] if user else None
+
+        try:
+            row = self.db.execute(text("""
+                SELECT
+                    updated_at
+                FROM users
+                WHERE id = :user_id
+            """), {
+                'user_id': user_id
+            }).fetchone()
+        except Exception as e:
+            raise RuntimeError("Database Error") from e
+
+        remember_columns('users', user_id, {'updated_at': row['updated_at']} if row else None)
+        return row['updated_at'] if row else None
+
     def find_user_id_by_email(self, email: str) -> int:
         """ 사용자의 email로 사용자 id를 조회합니다.
         만약 사용자 id가 존재하지 않으면 -1을 반환하고,
@@ -155,6 +213,10 @@ class UserDao:
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        if updated_rowcnt and updated_rowcnt > 0:
+            update_row('users', user['user_id'], {
+                'profile': user['profile']
+            }, stale=('updated_at',))
         return updated_rowcnt and updated_rowcnt > 0
 
 
@@ -176,4 +238,5 @@ class UserDao:
         except Exception as e:
             raise RuntimeError("Database Error") from e
 
+        forget_row('users', user_id)
         return deleted_rowcnt and deleted_rowcnt > 0
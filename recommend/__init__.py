@@ -1,5 +1,30 @@
-from .google_trends import recommend_pytrends
+from .google_trends import fetch_related_topics, fetch_related_topics_batch, TrendsCache, \
+    GuardedTrendsClient, CircuitBreaker, TrendsUnavailableError, TrendsSnapshotStore, TrendsSnapshotImporter
+from .autocomplete import Autocomplete, PrefixIndex, decompose_hangul
+from .profile import UserProfiles
+from .selection import Selector, selection_seed, top_k, gumbel_top_k
+from .word2vec import Word2VecModel, ModelRegistry, ModelLoadingError, SimilarityPool, PoolOverloadedError
 
 __all__ = [
-    "recommend_pytrends"
-]
\ No newline at end of file
+    "fetch_related_topics",
+    "fetch_related_topics_batch",
+    "TrendsCache",
+    "GuardedTrendsClient",
+    "CircuitBreaker",
+    "TrendsUnavailableError",
+    "TrendsSnapshotStore",
+    "TrendsSnapshotImporter",
+    "Autocomplete",
+    "PrefixIndex",
+    "decompose_hangul",
+    "UserProfiles",
+    "Selector",
+    "selection_seed",
+    "top_k",
+    "gumbel_top_k",
+    "Word2VecModel",
+    "ModelRegistry",
+    "ModelLoadingError",
+    "SimilarityPool",
+    "PoolOverloadedError"
+]
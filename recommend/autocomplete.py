@@ -0,0 +1,233 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from cache import LRUCache
+
+# 한글 음절 (가 ~ 힣) 분해용 자모 (호환 자모)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_JUNGSEONG = ['ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅗㅏ', 'ㅗㅐ', 'ㅗㅣ', 'ㅛ', 'ㅜ', 'ㅜㅓ', 'ㅜㅔ',
+              'ㅜㅣ', 'ㅠ', 'ㅡ', 'ㅡㅣ', 'ㅣ']
+_JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄱㅅ', 'ㄴ', 'ㄴㅈ', 'ㄴㅎ', 'ㄷ', 'ㄹ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ', 'ㄹㅌ', 'ㄹㅍ', 'ㄹㅎ',
+              'ㅁ', 'ㅂ', 'ㅂㅅ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 입력 중에 단독으로 입력되는 겹모음, 겹받침 자모
+_COMPOUND_JAMO = {
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ',
+    'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ'
+}
+
+
+def decompose_hangul(text: str) -> str:
+    """한글 음절을 자모로 분해합니다. 겹모음과 겹받침도 낱자로 나누므로
+    입력 중인 글자('삭' -> '사과', '달' -> '닭')도 완성된 단어의 접두사가 됩니다.
+    한글이 아닌 문자는 소문자로 바꿔서 그대로 둡니다.
+
+    :param text: 분해할 문자열
+    :return: 자모로 분해한 문자열
+    """
+    decomposed = []
+    for char in text:
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            index = code - _HANGUL_BASE
+            decomposed.append(_CHOSEONG[index // 588])
+            decomposed.append(_JUNGSEONG[(index % 588) // 28])
+            decomposed.append(_JONGSEONG[index % 28])
+        else:
+            decomposed.append(_COMPOUND_JAMO.get(char, char.lower()))
+
+    return ''.join(decomposed)
+
+
+class PrefixIndex:
+    """단어를 자모로 분해한 key의 정렬된 배열입니다. 접두사로 시작하는 key의 범위를 이분 탐색으로 찾고,
+    그 범위에서 빈도가 높은 단어를 고릅니다.
+    """
+
+    def __init__(self, words: Iterable[str], frequencies: Optional[Iterable[float]] = None):
+        """
+        :param words: 색인할 단어
+        :param frequencies: 단어별 빈도 (기본값: 먼저 나온 단어일수록 높은 빈도)
+        """
+        words = list(words)
+        frequencies = np.asarray(list(frequencies) if frequencies is not None else np.arange(len(words), 0, -1),
+                                 dtype=np.float64)
+
+        keys = [decompose_hangul(word) for word in words]
+        order = sorted(range(len(words)), key=keys.__getitem__)
+
+        self.keys = [keys[i] for i in order]
+        self.words = [words[i] for i in order]
+        self.frequencies = frequencies[order] if len(order) else frequencies
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """접두사로 시작하는 단어를 빈도가 높은 순서로 찾습니다.
+
+        :param prefix: 접두사 (자모로 분해하기 전)
+        :param limit: 찾을 단어 수
+        :return: (단어, 빈도) 튜플 리스트
+        """
+        key = decompose_hangul(prefix)
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + '\U0010ffff', start)
+        if start >= end or limit <= 0:
+            return []
+
+        frequencies = self.frequencies[start:end]
+        if end - start > limit:
+            best = np.argpartition(-frequencies, limit - 1)[:limit]
+        else:
+            best = np.arange(end - start)
+        best = best[np.argsort(-frequencies[best], kind='stable')]
+
+        return [(self.words[start + i], float(frequencies[i])) for i in best.tolist()]
+
+
+class Autocomplete:
+    """페이지 키워드 자동 완성을 제공합니다.
+
+    - 단어 사전 색인: 활성 모델의 단어 사전(빈도 상위 max_vocab개)으로 만들고, 모델 버전이 바뀌면 백그라운드에서 다시 만듭니다.
+      (다시 만드는 동안에는 이전 색인을 사용한다.)
+    - 사용자 색인: 사용자의 모든 페이지 키워드로 만들고 ttl 동안 캐시합니다. 빈도는 키워드를 사용한 페이지 수입니다.
+    사용자 키워드를 먼저 보여주고, 남은 자리를 단어 사전의 완성 결과로 채웁니다.
+    단어 사전의 완성 결과는 (모델 버전, 접두사, 개수)별로 캐시합니다.
+    """
+
+    def __init__(self, load_keywords: Callable, max_vocab: Optional[int] = None, max_users: int = 10000,
+                 user_ttl: float = 5 * 60, max_results: int = 10000):
+        """
+        :param load_keywords: 사용자 id로 [{'page_id': int, 'keyword': str}] 를 반환하는 함수
+        :param max_vocab: 색인할 빈도 상위 단어 수 (기본값: 모든 단어)
+        :param max_users: 캐시할 사용자 색인 수
+        :param user_ttl: 사용자 색인을 다시 만들기까지의 시간
+        :param max_results: 캐시할 단어 사전 완성 결과 수
+        """
+        self.load_keywords = load_keywords
+        self.max_vocab = max_vocab
+
+        self._vocabulary = None
+        self._building = None
+        self._lock = threading.Lock()
+        self._users = LRUCache(max_users, user_ttl)
+        self._results = LRUCache(max_results)
+
+        self.builds = 0
+        self.build_time = None
+
+    def _build_vocabulary(self, current):
+        try:
+            start = time.perf_counter()
+            words = current.model.wv.index_to_key
+            index = PrefixIndex(words[:self.max_vocab] if self.max_vocab else words)
+
+            self._vocabulary = (current.version, index)
+            self.builds += 1
+            self.build_time = time.perf_counter() - start
+        finally:
+            with self._lock:
+                self._building = None
+
+    def vocabulary_index(self, current) -> tuple:
+        """활성 모델 버전의 단어 사전 색인을 조회합니다. 색인이 없으면 만들고,
+        다른 모델 버전의 색인이 있으면 그것을 반환하고 백그라운드에서 새로 만듭니다.
+
+        :param current: 활성 모델 버전 (ModelRegistry.current)
+        :return: (색인을 만든 모델 버전, 단어 사전 색인) 튜플
+        """
+        vocabulary = self._vocabulary
+        if vocabulary is not None and vocabulary[0] == current.version:
+            return vocabulary
+
+        with self._lock:
+            building = self._building is not None
+            if not building:
+                self._building = current.version
+
+        if vocabulary is None:
+            if not building:
+                self._build_vocabulary(current)
+            else:
+                # 다른 thread가 처음 색인을 만드는 중이면 끝날 때까지 기다린다.
+                while self._vocabulary is None and self._building is not None:
+                    time.sleep(0.01)
+            if self._vocabulary is None:
+                raise RuntimeError('failed to build the autocomplete index')
+            return self._vocabulary
+
+        if not building:
+            threading.Thread(target=self._build_vocabulary, args=(current,), name='autocomplete-index',
+                             daemon=True).start()
+
+        return vocabulary
+
+    def user_index(self, user_id: int) -> PrefixIndex:
+        """사용자의 페이지 키워드 색인을 조회합니다. 없으면 만듭니다."""
+        index = self._users.get(user_id)
+        if index is None:
+            counts = Counter(page['keyword'] for page in self.load_keywords(user_id) if page['keyword'])
+            index = PrefixIndex(counts.keys(), counts.values())
+            self._users.set(user_id, index)
+
+        return index
+
+    def invalidate_user(self, user_id: int):
+        self._users.delete(user_id)
+
+    def complete(self, prefix: str, current, user_id: Optional[int] = None, limit: int = 10) -> list:
+        """접두사로 시작하는 키워드를 찾습니다.
+
+        :param prefix: 접두사
+        :param current: 활성 모델 버전 (ModelRegistry.current)
+        :param user_id: 사용자 id (None이면 단어 사전만 사용)
+        :param limit: 찾을 키워드 수
+        :return: (키워드, 출처) 튜플 리스트 (출처는 'user' 또는 'vocabulary')
+        """
+        completions = []
+        if user_id is not None:
+            completions = [(word, 'user') for word, _ in self.user_index(user_id).complete(prefix, limit)]
+
+        version, vocabulary = self.vocabulary_index(current)
+        key = (version, decompose_hangul(prefix), limit)
+        words = self._results.get(key)
+        if words is None:
+            words = [word for word, _ in vocabulary.complete(prefix, limit)]
+            self._results.set(key, words)
+
+        seen = {word for word, _ in completions}
+        completions += [(word, 'vocabulary') for word in words if word not in seen]
+
+        return completions[:limit]
+
+    def stats(self) -> dict:
+        """자동 완성 색인 정보를 조회합니다.
+
+        :return: 자동 완성 색인 정보를 포함한 딕셔너리:
+            {
+                'vocabulary_size': int,     # 단어 사전 색인의 단어 수
+                'vocabulary_version': int,  # 단어 사전 색인을 만든 모델 버전
+                'builds': int,              # 단어 사전 색인을 만든 횟수
+                'build_time': float,        # 마지막으로 단어 사전 색인을 만든 시간 (초)
+                'users': dict,              # 사용자 색인 LRU 캐시 사용 정보
+                'results': dict             # 단어 사전 완성 결과 LRU 캐시 사용 정보
+            }
+        """
+        vocabulary = self._vocabulary
+
+        return {
+            'vocabulary_size': len(vocabulary[1]) if vocabulary is not None else 0,
+            'vocabulary_version': vocabulary[0] if vocabulary is not None else None,
+            'builds': self.builds,
+            'build_time': self.build_time,
+            'users': self._users.stats(),
+            'results': self._results.stats()
+        }
@@ -0,0 +1,370 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+from gensim.models import KeyedVectors
+
+from .selection import Selector, selection_seed
+from .google_trends import TrendsCache, GuardedTrendsClient
+from .word2vec import Word2VecModel, ModelRegistry
+from .word2vec.ann import IVFIndex
+from .word2vec.model import _resident_size
+from .word2vec.quantize import QuantizedVectors
+
+
+def build_synthetic_model(path: str, vocab_size: int = 50000, vector_size: int = 100, n_clusters: int = 256,
+                          seed: int = 0) -> str:
+    """벤치마크용 Word2Vec KeyedVectors(.kv)를 만듭니다.
+    단어 벡터는 n_clusters개의 중심 주위에 모이도록 만들어서 실제 모델처럼 가까운 이웃이 있게 합니다.
+    단어는 'w0', 'w1', ... 이며 번호가 작을수록 빈도가 높은 단어로 취급합니다.
+
+    :param path: 저장할 KeyedVectors 경로 (.kv)
+    :param vocab_size: 단어 수
+    :param vector_size: 벡터 차원
+    :param n_clusters: 단어 벡터가 모이는 중심 수
+    :param seed: 난수 시드
+    :return: 저장한 경로
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, vector_size)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=vocab_size)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((vocab_size, vector_size)).astype(np.float32)
+
+    wv = KeyedVectors(vector_size)
+    wv.add_vectors([f'w{i}' for i in range(vocab_size)], vectors)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    wv.save(path, sep_limit=0)
+
+    return path
+
+
+class StubTrendsProvider:
+    """google trends 대신 keyword마다 항상 같은 관련 토픽을 반환합니다.
+    latency초를 기다린 후 반환해서 네트워크 호출 시간을 흉내 냅니다.
+    """
+
+    def __init__(self, vocabulary: list, latency: float = 0.0, n_topics: int = 25):
+        self.vocabulary = vocabulary
+        self.latency = latency
+        self.n_topics = n_topics
+
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def topics(self, keyword: str) -> dict:
+        rng = np.random.default_rng(selection_seed('trends', keyword))
+        picks = rng.choice(len(self.vocabulary), size=min(self.n_topics, len(self.vocabulary)), replace=False)
+        values = np.sort(rng.integers(1, 101, size=len(picks)))[::-1]
+
+        return {
+            'top': [{'topic_title': self.vocabulary[i], 'topic_type': 'Topic', 'value': int(value)}
+                    for i, value in zip(picks.tolist(), values.tolist())],
+            'rising': []
+        }
+
+    def fetch(self, keyword: str, geo: str, timeframe: str, hl: str) -> dict:
+        return self.fetch_many([keyword], geo, timeframe, hl)[keyword]
+
+    def fetch_many(self, keywords: list, geo: str, timeframe: str, hl: str) -> dict:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        return {keyword: self.topics(keyword) for keyword in keywords}
+
+
+class _MemoryPageDao:
+    """RecommendService가 사용하는 PageDao 조회를 메모리에서 처리합니다. (latency초로 DB 왕복 시간을 흉내 낸다.)"""
+
+    def __init__(self, pages: dict, latency: float = 0.0):
+        self.pages = pages
+        self.latency = latency
+
+        self.notes = {}
+        for page_id, page in pages.items():
+            self.notes.setdefault(page['note_id'], []).append(page_id)
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_page_info(self, page_id: int) -> Optional[dict]:
+        self._wait()
+        page = self.pages.get(page_id)
+        return {'page_id': page_id, **page} if page else None
+
+    def find_note_id_by_page_id(self, page_id: int) -> int:
+        self._wait()
+        return self.pages[page_id]['note_id'] if page_id in self.pages else -1
+
+    def find_page_id_and_keyword_by_note_id(self, note_id: int) -> list:
+        self._wait()
+        return [{'page_id': page_id, 'keyword': self.pages[page_id]['keyword']} for page_id in self.notes.get(note_id, [])]
+
+
+class _MemoryRecommendationDao:
+    """page_recommendations 테이블 대신 메모리에 저장합니다. enabled가 False이면 항상 저장된 후보가 없습니다."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.rows = {}
+
+    def upsert_recommendation(self, recommendation: dict) -> bool:
+        if self.enabled:
+            self.rows[(recommendation['page_id'], recommendation['source'])] = {**recommendation, 'age': 0}
+        return True
+
+    def find_recommendation(self, page_id: int, source: str) -> Optional[dict]:
+        return self.rows.get((page_id, source)) if self.enabled else None
+
+    def delete_recommendations_by_page_id(self, page_id: int) -> bool:
+        return True
+
+
+def _summarize(latencies: list, errors: int, wall_time: float) -> dict:
+    latencies = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (None, None, None)
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'wall_time': wall_time,
+        'throughput': len(latencies) / wall_time if wall_time else None,
+        'mean_ms': float(latencies.mean()) if len(latencies) else None,
+        'p50_ms': float(p50) if p50 is not None else None,
+        'p95_ms': float(p95) if p95 is not None else None,
+        'p99_ms': float(p99) if p99 is not None else None
+    }
+
+
+def run_load(fn, requests: list, concurrency: int) -> dict:
+    """requests의 (keyword, page_id)로 fn을 concurrency개의 thread에서 동시에 호출하고 지연 시간을 측정합니다.
+    fn이 예외를 발생시키거나 RecommendMessage를 반환하면 오류로 셉니다.
+
+    :param fn: fn(keyword, page_id) 형태의 추천 함수
+    :param requests: (keyword, page_id) 튜플 리스트
+    :param concurrency: 동시 호출 수
+    :return: 측정 결과를 포함한 딕셔너리 (requests, errors, wall_time, throughput, mean_ms, p50_ms, p95_ms, p99_ms)
+    """
+    def call(request: tuple):
+        start = time.perf_counter()
+        try:
+            ok = isinstance(fn(*request), list)
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(call, requests))
+    wall_time = time.perf_counter() - start
+
+    return _summarize([elapsed for elapsed, _ in results], sum(1 for _, ok in results if not ok), wall_time)
+
+
+def topk_overlap(model: Word2VecModel, queries: list, topn: int = 50) -> Optional[float]:
+    """model의 유사 단어 검색(이웃 표, IVF 인덱스, 양자화 벡터) 결과가 전체 float32 검색 결과와 겹치는 비율을 측정합니다.
+
+    :param model: 측정할 모델
+    :param queries: 질의 단어 리스트
+    :param topn: 비교할 단어 수
+    :return: 질의별 겹치는 비율의 평균 (질의가 없으면 None)
+    """
+    wv = model.wv
+    vectors = np.asarray(wv.vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1.0
+
+    overlaps = []
+    for query in queries:
+        index = wv.key_to_index[query]
+        scores = (vectors @ vectors[index]) / (norms * norms[index])
+        scores[index] = -np.inf
+        expected = np.argpartition(-scores, topn - 1)[:topn]
+
+        ids, _ = model.most_similar_ids(query, topn)
+        overlaps.append(len(np.intersect1d(expected, ids)) / topn)
+
+    return float(np.mean(overlaps)) if overlaps else None
+
+
+def build_workload(vocabulary: list, n_notes: int = 200, pages_per_note: int = 10, n_requests: int = 2000,
+                   zipf: float = 1.1, seed: int = 0) -> tuple:
+    """노트와 페이지, 요청을 만듭니다. 페이지 키워드와 요청 페이지는 빈도 순위에 대한 zipf 분포로 고릅니다.
+    (같은 keyword가 여러 번 요청되므로 캐시 효과가 실제와 비슷하게 나타난다.)
+
+    :return: (페이지 id별 {'note_id', 'keyword'} 딕셔너리, (keyword, page_id) 요청 리스트) 튜플
+    """
+    rng = np.random.default_rng(seed)
+    n_pages = n_notes * pages_per_note
+
+    ranks = np.arange(1, len(vocabulary) + 1, dtype=np.float64)
+    weights = ranks ** -zipf
+    keyword_ids = rng.choice(len(vocabulary), size=n_pages, p=weights / weights.sum())
+    pages = {page_id + 1: {'note_id': page_id // pages_per_note + 1, 'keyword': vocabulary[keyword_id]}
+             for page_id, keyword_id in enumerate(keyword_ids.tolist())}
+
+    page_weights = np.arange(1, n_pages + 1, dtype=np.float64) ** -zipf
+    page_ids = rng.permutation(n_pages)[rng.choice(n_pages, size=n_requests, p=page_weights / page_weights.sum())] + 1
+    requests = [(pages[page_id]['keyword'], page_id) for page_id in page_ids.tolist()]
+
+    return pages, requests
+
+
+def run_benchmark(model_path: Optional[str] = None, vocab_size: int = 50000, vector_size: int = 100,
+                  concurrency: tuple = (1, 8), n_requests: int = 2000, n_notes: int = 200, pages_per_note: int = 10,
+                  trends_latency: float = 0.05, db_latency: float = 0.0, n_probe: Optional[int] = None,
+                  quantized: Optional[str] = None, selection_mode: str = 'sample', store: bool = False,
+                  overlap_queries: int = 200, seed: int = 0) -> dict:
+    """RecommendService의 recommend_w2v, recommend_googletrends를 동시 호출 수별로 측정합니다.
+    google trends와 DB는 StubTrendsProvider와 메모리 DAO로 대신하므로 네트워크나 DB 없이 실행할 수 있습니다.
+    동시 호출 수마다 서비스(캐시 포함)를 새로 만들어서 같은 조건에서 측정합니다.
+
+    :param model_path: 측정할 모델 경로 (None이면 vocab_size, vector_size로 합성 모델을 만들고,
+                       n_probe, quantized를 지정하면 IVF 인덱스와 양자화 벡터도 함께 만든다.)
+    :param concurrency: 측정할 동시 호출 수
+    :param trends_latency: google trends 호출 한 번의 지연 시간 (초)
+    :param db_latency: DB 조회 한 번의 지연 시간 (초)
+    :param n_probe: IVF 인덱스 탐색 클러스터 수 (Word2VecModel 참고)
+    :param quantized: 양자화 타입 (Word2VecModel 참고)
+    :param selection_mode: 추천 후보 선택 방법 ('sample', 'top_k')
+    :param store: True이면 계산한 추천 후보를 저장하고 다시 사용한다. (page_recommendations)
+    :return: 측정 결과를 포함한 딕셔너리:
+        {
+            'config': dict,         # 측정 조건
+            'model': dict,          # 모델 로딩 정보 (Word2VecModel.stats 참고)
+            'memory': dict,         # 상주 메모리 크기 (before_model, after_warm_up, after_runs, byte)
+            'topk_overlap': float,  # 유사 단어 검색 결과가 전체 float32 검색 결과와 겹치는 비율
+            'runs': [{
+                'target': str,      # 'w2v' 또는 'trends'
+                'concurrency': int, # 동시 호출 수
+                ...                 # run_load 결과
+                'upstream_calls': int,  # google trends 호출 수 (trends)
+                'metrics': dict     # 측정 후 RecommendService.get_metrics() 결과
+            }]
+        }
+    """
+    config = dict(locals())
+
+    from services import RecommendService, EventBus
+    from cache import SingleFlight
+
+    memory = {'before_model': _resident_size()}
+
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic = model_path is None
+        if synthetic:
+            model_path = build_synthetic_model(os.path.join(directory, 'synthetic.kv'), vocab_size, vector_size, seed=seed)
+
+        model = Word2VecModel(model_path, n_probe=n_probe, quantized=quantized)
+        if synthetic and n_probe:
+            vectors = KeyedVectors.load(model_path, mmap='r').vectors
+            IVFIndex.build(vectors, seed=seed).save(model.ann_path)
+        if synthetic and quantized:
+            vectors = KeyedVectors.load(model_path, mmap='r').vectors
+            QuantizedVectors.quantize(vectors, quantized).save(model.quantized_path)
+        model_stats = model.warm_up()
+        memory['after_warm_up'] = _resident_size()
+
+        vocabulary = model.wv.index_to_key
+        pages, requests = build_workload(vocabulary, n_notes, pages_per_note, n_requests, seed=seed)
+
+        rng = np.random.default_rng(seed)
+        queries = [vocabulary[i] for i in rng.choice(len(vocabulary), size=min(overlap_queries, len(vocabulary)),
+                                                     replace=False)]
+        overlap = topk_overlap(model, queries)
+
+        runs = []
+        for level in concurrency:
+            for target in ('w2v', 'trends'):
+                trends = StubTrendsProvider(vocabulary, trends_latency)
+                trends_client = GuardedTrendsClient(trends.fetch, trends.fetch_many, max_concurrency=max(2, level))
+                executor = ThreadPoolExecutor(max_workers=max(2, level), thread_name_prefix='recommend')
+                store_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='recommend-store')
+
+                service = RecommendService(
+                    _MemoryPageDao(pages, db_latency), _MemoryRecommendationDao(store), ModelRegistry(model),
+                    TrendsCache(trends_client.fetch, fetch_many=trends_client.fetch_many), SingleFlight(),
+                    trends_client, executor, store_executor, Selector(selection_mode), EventBus()
+                )
+                fn = service.recommend_w2v if target == 'w2v' else service.recommend_googletrends
+
+                result = run_load(fn, requests, level)
+                store_executor.shutdown(wait=True)
+                executor.shutdown(wait=True)
+
+                runs.append({
+                    'target': target,
+                    'concurrency': level,
+                    **result,
+                    'upstream_calls': trends.calls,
+                    'metrics': service.get_metrics()
+                })
+
+        memory['after_runs'] = _resident_size()
+
+    return {
+        'config': config,
+        'model': model_stats,
+        'memory': memory,
+        'topk_overlap': overlap,
+        'runs': runs
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='추천 서비스의 지연 시간, 처리량, 메모리, 추천 결과 일치율을 측정합니다.')
+    parser.add_argument('--model', default=None, help='측정할 모델 경로 (생략하면 합성 모델)')
+    parser.add_argument('--vocab-size', type=int, default=50000)
+    parser.add_argument('--vector-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--notes', type=int, default=200)
+    parser.add_argument('--pages-per-note', type=int, default=10)
+    parser.add_argument('--trends-latency', type=float, default=0.05, help='google trends 호출 지연 시간 (초)')
+    parser.add_argument('--db-latency', type=float, default=0.0, help='DB 조회 지연 시간 (초)')
+    parser.add_argument('--n-probe', type=int, default=None)
+    parser.add_argument('--quantized', choices=['float16', 'int8'], default=None)
+    parser.add_argument('--selection-mode', choices=['sample', 'top_k'], default='sample')
+    parser.add_argument('--store', action='store_true', help='계산한 추천 후보를 저장하고 다시 사용')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='결과를 저장할 JSON 파일 (생략하면 출력만 함)')
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        model_path=args.model,
+        vocab_size=args.vocab_size,
+        vector_size=args.vector_size,
+        concurrency=tuple(args.concurrency),
+        n_requests=args.requests,
+        n_notes=args.notes,
+        pages_per_note=args.pages_per_note,
+        trends_latency=args.trends_latency,
+        db_latency=args.db_latency,
+        n_probe=args.n_probe,
+        quantized=args.quantized,
+        selection_mode=args.selection_mode,
+        store=args.store,
+        seed=args.seed
+    )
+    report['created_at'] = time.time()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, ensure_ascii=False, indent=2, default=str)
+    print(json.dumps({
+        'topk_overlap': report['topk_overlap'],
+        'memory': report['memory'],
+        'runs': [{key: value for key, value in run.items() if key != 'metrics'} for run in report['runs']]
+    }, ensure_ascii=False))
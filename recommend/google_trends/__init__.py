@@ -1,5 +1,15 @@
-from .trends import recommend_pytrends
+from .trends import fetch_related_topics, fetch_related_topics_batch
+from .cache import TrendsCache
+from .guard import GuardedTrendsClient, CircuitBreaker, TrendsUnavailableError
+from .snapshot import TrendsSnapshotStore, TrendsSnapshotImporter
 
 __all__ = [
-    "recommend_pytrends"
-]
\ No newline at end of file
+    "fetch_related_topics",
+    "fetch_related_topics_batch",
+    "TrendsCache",
+    "GuardedTrendsClient",
+    "CircuitBreaker",
+    "TrendsUnavailableError",
+    "TrendsSnapshotStore",
+    "TrendsSnapshotImporter"
+]
@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+class TrendsCache:
+    """google trends 관련 토픽 조회 결과를 (keyword, geo, timeframe, hl) 단위로 캐시합니다.
+
+    프로세스 내 LRU 캐시와 재시작 후에도 유지되는 SQLite 캐시의 2단계로 구성됩니다.
+        - ttl 이내의 결과는 그대로 반환합니다.
+        - ttl이 지났지만 ttl + stale_ttl 이내의 결과는 그대로 반환하고, 백그라운드에서 다시 조회합니다.
+        - 그보다 오래되었거나 결과가 없으면 fetch로 조회한 후 저장합니다.
+          이때 fetch가 실패하면 오래된 결과라도 있으면 반환합니다.
+
+    fetch는 fetch(keyword, geo, timeframe, hl) 형태의 함수이며,
+    실제 pytrends 대신 다른 함수를 넘기면 네트워크 없이 사용할 수 있습니다.
+    fetch_many는 fetch_many(keywords, geo, timeframe, hl) 형태로 keyword별 결과 딕셔너리를 반환하는 함수이며,
+    get_many에서 캐시에 없는 keyword를 한 번에 조회할 때 사용합니다.
+    """
+
+    def __init__(self, fetch: Callable, path: Optional[str] = None, ttl: float = 24 * 60 * 60,
+                 stale_ttl: float = 7 * 24 * 60 * 60, max_size: int = 1024,
+                 geo: str = 'KR', timeframe: str = 'today 5-y', hl: str = 'ko',
+                 fetch_many: Optional[Callable] = None):
+        self.fetch = fetch
+        self.fetch_many = fetch_many
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.geo = geo
+        self.timeframe = timeframe
+        self.hl = hl
+
+        self._memory = LRUCache(max_size)
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.disk_errors = 0
+        self.refreshes = 0
+        self.errors = 0
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS trends_cache (
+                    keyword TEXT NOT NULL,
+                    geo TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    hl TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (keyword, geo, timeframe, hl)
+                )
+            """)
+            self._db.commit()
+
+    def key(self, keyword: str, geo: Optional[str] = None, timeframe: Optional[str] = None,
+            hl: Optional[str] = None) -> tuple:
+        return (keyword, geo or self.geo, timeframe or self.timeframe, hl or self.hl)
+
+    def get(self, keyword: str, geo: Optional[str] = None, timeframe: Optional[str] = None,
+            hl: Optional[str] = None) -> dict:
+        """keyword의 관련 토픽을 캐시에서 조회하고, 없으면 fetch로 조회합니다.
+        만약 조회에 실패하고 캐시된 결과도 없으면 fetch의 예외가 그대로 발생합니다.
+
+        :param keyword: 조회할 단어
+        :param geo: 지역 (기본값: 캐시 생성 시 지정한 값)
+        :param timeframe: 조회 기간 (기본값: 캐시 생성 시 지정한 값)
+        :param hl: 언어 (기본값: 캐시 생성 시 지정한 값)
+        :return: 관련 토픽 레코드를 포함한 딕셔너리 (fetch_related_topics 참고)
+        """
+        key = self.key(keyword, geo, timeframe, hl)
+        entry = self._lookup(key)
+
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age <= self.ttl:
+                self.hits += 1
+                return entry[1]
+            if age <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._refresh_in_background(key)
+                return entry[1]
+
+        self.misses += 1
+        try:
+            return self._fetch_and_store(key)
+        except Exception:
+            self.errors += 1
+            if entry is not None:
+                return entry[1]
+            raise
+
+    def get_many(self, keywords: list, geo: Optional[str] = None, timeframe: Optional[str] = None,
+                 hl: Optional[str] = None) -> dict:
+        """여러 keyword의 관련 토픽을 캐시에서 조회하고, 캐시에 없는 keyword는 fetch_many로 한 번에 조회합니다.
+        만약 조회에 실패하면 캐시된 결과가 있는 keyword만 반환합니다.
+
+        :param keywords: 조회할 단어 리스트
+        :param geo: 지역 (기본값: 캐시 생성 시 지정한 값)
+        :param timeframe: 조회 기간 (기본값: 캐시 생성 시 지정한 값)
+        :param hl: 언어 (기본값: 캐시 생성 시 지정한 값)
+        :return: keyword별 관련 토픽 레코드를 포함한 딕셔너리
+        """
+        results, expired, stale = {}, {}, []
+
+        for keyword in dict.fromkeys(keywords):
+            key = self.key(keyword, geo, timeframe, hl)
+            entry = self._lookup(key)
+
+            age = time.time() - entry[0] if entry is not None else None
+            if age is not None and age <= self.ttl:
+                self.hits += 1
+                results[keyword] = entry[1]
+            elif age is not None and age <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                stale.append(key)
+                results[keyword] = entry[1]
+            else:
+                self.misses += 1
+                expired[keyword] = entry
+
+        if stale:
+            self._refresh_in_background(*stale)
+
+        if expired:
+            try:
+                results.update(self._fetch_many_and_store([self.key(keyword, geo, timeframe, hl) for keyword in expired]))
+            except Exception:
+                self.errors += 1
+                results.update({keyword: entry[1] for keyword, entry in expired.items() if entry is not None})
+
+        return results
+
+    def put(self, key: tuple, payload: dict, fetched_at: Optional[float] = None):
+        """조회 결과를 두 캐시에 모두 저장합니다.
+        SQLite 저장은 best-effort로, 실패해도(예: 다른 worker가 파일을 잠근 경우) 기록만 하고 예외를 발생시키지 않습니다.
+
+        :param key: (keyword, geo, timeframe, hl) 튜플
+        :param payload: 관련 토픽 레코드를 포함한 딕셔너리
+        :param fetched_at: 조회 시각 (기본값: 현재 시각)
+        """
+        entry = (fetched_at if fetched_at is not None else time.time(), payload)
+        self._memory.set(key, entry)
+
+        if self._db is not None:
+            with self._db_lock:
+                try:
+                    self._db.execute("""
+                        INSERT OR REPLACE INTO trends_cache (keyword, geo, timeframe, hl, fetched_at, payload)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (*key, entry[0], json.dumps(payload, ensure_ascii=False)))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self.disk_errors += 1
+                    logger.warning('[trends] SQLite 캐시 저장 실패 %s: %s', key, e)
+                    try:
+                        self._db.rollback()
+                    except sqlite3.Error:
+                        pass
+
+    def _lookup(self, key: tuple) -> Optional[tuple]:
+        entry = self._memory.get(key)
+        if entry is not None or self._db is None:
+            return entry
+
+        with self._db_lock:
+            row = self._db.execute("""
+                SELECT fetched_at, payload
+                FROM trends_cache
+                WHERE keyword = ? AND geo = ? AND timeframe = ? AND hl = ?
+            """, key).fetchone()
+
+        if row is None:
+            return None
+
+        self.disk_hits += 1
+        entry = (row[0], json.loads(row[1]))
+        self._memory.set(key, entry)
+
+        return entry
+
+    def _fetch_and_store(self, key: tuple) -> dict:
+        payload = self.fetch(*key)
+        self.put(key, payload)
+
+        return payload
+
+    def _fetch_many_and_store(self, keys: list) -> dict:
+        if self.fetch_many is None or len(keys) == 1:
+            return {key[0]: self._fetch_and_store(key) for key in keys}
+
+        # geo, timeframe, hl이 같은 key끼리만 하나의 요청으로 묶을 수 있다.
+        groups = {}
+        for key in keys:
+            groups.setdefault(key[1:], []).append(key[0])
+
+        results = {}
+        for (geo, timeframe, hl), keywords in groups.items():
+            payloads = self.fetch_many(keywords, geo, timeframe, hl)
+            for keyword in keywords:
+                self.put((keyword, geo, timeframe, hl), payloads[keyword])
+                results[keyword] = payloads[keyword]
+
+        return results
+
+    def _refresh_in_background(self, *keys: tuple):
+        with self._refreshing_lock:
+            keys = [key for key in keys if key not in self._refreshing]
+            if not keys:
+                return
+            self._refreshing.update(keys)
+
+        def refresh():
+            try:
+                self._fetch_many_and_store(keys)
+                self.refreshes += len(keys)
+            except Exception:
+                self.errors += 1
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.difference_update(keys)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def stats(self) -> dict:
+        """캐시 사용 정보를 조회합니다.
+
+        :return: 캐시 사용 정보를 포함한 딕셔너리:
+            {
+                'hits': int,        # ttl 이내 결과 적중 횟수
+                'stale_hits': int,  # ttl이 지난 결과를 반환하고 백그라운드로 갱신한 횟수
+                'misses': int,      # 결과가 없어 직접 조회한 횟수
+                'disk_hits': int,   # SQLite 캐시에서 찾은 횟수
+                'disk_errors': int, # SQLite 캐시 저장 실패 횟수
+                'refreshes': int,   # 백그라운드 갱신 성공 횟수
+                'errors': int,      # 조회 실패 횟수
+                'memory': dict      # LRU 캐시 사용 정보
+            }
+        """
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'disk_errors': self.disk_errors,
+            'refreshes': self.refreshes,
+            'errors': self.errors,
+            'memory': self._memory.stats()
+        }
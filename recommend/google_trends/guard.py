@@ -0,0 +1,214 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Callable, Optional
+
+
+class TrendsUnavailableError(RuntimeError):
+    """google trends를 호출할 수 없는 상태(차단기 열림, 동시 호출 초과, 시간 초과)일 때 발생하는 예외입니다."""
+    pass
+
+
+class CircuitBreaker:
+    """연속된 실패가 failure_threshold번 발생하면 열려서(open) reset_timeout 동안 호출을 바로 거절합니다.
+    reset_timeout이 지나면 반쯤 열린(half_open) 상태가 되어 한 번의 시험 호출만 허용하고,
+    시험 호출이 성공하면 닫히고(closed), 실패하면 다시 열립니다.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0, clock: Callable = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probing = False
+            return self._state
+
+    def allow(self) -> bool:
+        """호출을 허용하는지 확인합니다. 반쯤 열린 상태에서는 한 번의 시험 호출만 허용합니다.
+
+        :return: 호출 허용 여부 (True/False)
+        """
+        state = self.state
+        with self._lock:
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def trip(self):
+        """실패 횟수와 관계없이 차단기를 엽니다. (예: HTTP 429 응답)"""
+        with self._lock:
+            self._open()
+
+    def _open(self):
+        if self._state != self.OPEN:
+            self.trips += 1
+        self._state = self.OPEN
+        self._opened_at = self.clock()
+        self._probing = False
+
+    def stats(self) -> dict:
+        """차단기 상태를 조회합니다.
+
+        :return: 차단기 상태를 포함한 딕셔너리:
+            {
+                'state': str,       # closed, open, half_open
+                'failures': int,    # 연속 실패 횟수
+                'trips': int,       # 차단기가 열린 횟수
+                'rejected': int     # 차단기가 거절한 호출 수
+            }
+        """
+        return {
+            'state': self.state,
+            'failures': self._failures,
+            'trips': self.trips,
+            'rejected': self.rejected
+        }
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) == 429
+
+
+class GuardedTrendsClient:
+    """google trends 호출을 시간 제한, 동시 호출 제한, 지수 백오프 재시도, 차단기로 감쌉니다.
+
+    - 각 호출은 timeout초 안에 끝나지 않으면 실패로 처리합니다. (느린 호출이 Flask worker를 붙잡지 않도록)
+    - 동시에 upstream으로 나가는 호출은 max_concurrency개로 제한하고, 자리가 없으면 바로 거절합니다.
+    - 실패하면 backoff_base * 2^n초(최대 backoff_max초)를 기다린 후 max_retries번까지 다시 시도합니다.
+    - HTTP 429 응답을 받으면 차단기를 바로 엽니다. 차단기가 열려 있으면 upstream을 호출하지 않습니다.
+    호출할 수 없으면 TrendsUnavailableError가 발생하고, 호출자(TrendsCache)는 캐시된 결과를 대신 사용합니다.
+    """
+
+    def __init__(self, fetch: Callable, fetch_many: Optional[Callable] = None, timeout: float = 10.0,
+                 max_concurrency: int = 2, max_retries: int = 1, backoff_base: float = 0.5,
+                 backoff_max: float = 5.0, breaker: Optional[CircuitBreaker] = None, sleep: Callable = time.sleep):
+        self._fetch = fetch
+        self._fetch_many = fetch_many
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker if breaker else CircuitBreaker()
+        self.sleep = sleep
+
+        # 시간이 초과된 호출도 끝날 때까지 자리를 차지하므로 실제 upstream 동시 호출 수가 max_concurrency를 넘지 않는다.
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='trends')
+
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.throttled = 0
+        self.rejected = 0
+
+    def fetch(self, keyword: str, geo: str, timeframe: str, hl: str) -> dict:
+        return self._call(self._fetch, keyword, geo, timeframe, hl)
+
+    def fetch_many(self, keywords: list, geo: str, timeframe: str, hl: str) -> dict:
+        if self._fetch_many is None:
+            return {keyword: self.fetch(keyword, geo, timeframe, hl) for keyword in keywords}
+        return self._call(self._fetch_many, keywords, geo, timeframe, hl)
+
+    def _call(self, fn: Callable, *args):
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                if self.breaker.state == CircuitBreaker.OPEN:
+                    break
+                self.retries += 1
+                self.sleep(min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+            if not self._semaphore.acquire(blocking=False):
+                self.rejected += 1
+                raise TrendsUnavailableError('too many concurrent google trends requests')
+
+            if not self.breaker.allow():
+                self._semaphore.release()
+                raise TrendsUnavailableError('google trends circuit breaker is open')
+
+            self.calls += 1
+            future = self._executor.submit(fn, *args)
+            future.add_done_callback(lambda _: self._semaphore.release())
+
+            try:
+                result = future.result(timeout=self.timeout)
+            except TimeoutError:
+                self.timeouts += 1
+                self.failures += 1
+                self.breaker.record_failure()
+                continue
+            except Exception as e:
+                self.failures += 1
+                if _is_rate_limited(e):
+                    self.throttled += 1
+                    self.breaker.trip()
+                    raise TrendsUnavailableError('google trends rate limited') from e
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+                continue
+
+            self.breaker.record_success()
+            return result
+
+        raise TrendsUnavailableError('google trends request failed')
+
+    def stats(self) -> dict:
+        """호출 정보와 차단기 상태를 조회합니다.
+
+        :return: 호출 정보를 포함한 딕셔너리:
+            {
+                'calls': int,       # upstream 호출 수
+                'failures': int,    # 실패한 호출 수
+                'timeouts': int,    # 시간이 초과된 호출 수
+                'retries': int,     # 재시도 횟수
+                'throttled': int,   # HTTP 429 응답 수
+                'rejected': int,    # 동시 호출 제한으로 거절한 호출 수
+                'breaker': dict     # 차단기 상태 (CircuitBreaker.stats 참고)
+            }
+        """
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'timeouts': self.timeouts,
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'rejected': self.rejected,
+            'breaker': self.breaker.stats()
+        }
@@ -0,0 +1,405 @@
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from cache import LRUCache
+
+from .trends import MAX_KEYWORDS_PER_PAYLOAD
+
+logger = logging.getLogger(__name__)
+
+# CSV 덤프의 열 (관련 토픽 한 개가 한 줄, kind는 'top' 또는 'rising')
+CSV_FIELDS = ('keyword', 'kind', 'topic_title', 'topic_type', 'value')
+
+
+class TrendsSnapshotStore:
+    """google trends 관련 토픽을 미리 모아 둔 로컬 저장소입니다.
+    (keyword, geo, timeframe, hl)를 기본 키로 하는 SQLite 테이블에 저장하고, 자주 조회하는 keyword는 LRU 캐시에 둡니다.
+
+    요청 처리 중에는 조회만 하고 네트워크를 사용하지 않습니다.
+    저장소는 TrendsSnapshotImporter가 주기적으로(또는 CSV/JSON 덤프에서) 채웁니다.
+    다른 프로세스(CLI, 다른 worker)가 SQLite에 저장한 결과도 반영되도록 LRU 캐시는 memory_ttl초 후 SQLite에서 다시 읽습니다.
+    """
+
+    def __init__(self, path: str, max_size: int = 4096, geo: str = 'KR', timeframe: str = 'today 5-y', hl: str = 'ko',
+                 memory_ttl: Optional[float] = 5 * 60):
+        self.path = path
+        self.geo = geo
+        self.timeframe = timeframe
+        self.hl = hl
+
+        self._memory = LRUCache(max_size, memory_ttl)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS trends_snapshot (
+                keyword TEXT NOT NULL,
+                geo TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                hl TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (keyword, geo, timeframe, hl)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS trends_snapshot_fetched_at ON trends_snapshot (fetched_at)")
+        self._db.commit()
+
+    def key(self, keyword: str) -> tuple:
+        return (keyword, self.geo, self.timeframe, self.hl)
+
+    def get(self, keyword: str) -> Optional[dict]:
+        """keyword의 관련 토픽을 조회합니다. 저장된 결과가 없으면 None을 반환합니다.
+
+        :param keyword: 조회할 단어
+        :return: 관련 토픽 레코드를 포함한 딕셔너리 (fetch_related_topics 참고) 또는 None
+        """
+        key = self.key(keyword)
+        entry = self._memory.get(key)
+
+        if entry is None:
+            with self._lock:
+                row = self._db.execute("""
+                    SELECT fetched_at, payload
+                    FROM trends_snapshot
+                    WHERE keyword = ? AND geo = ? AND timeframe = ? AND hl = ?
+                """, key).fetchone()
+
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                self._memory.set(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry[1]
+
+    def get_many(self, keywords: Iterable[str]) -> dict:
+        """여러 keyword의 관련 토픽을 조회합니다. 저장된 결과가 없는 keyword는 결과에서 빠집니다.
+
+        :param keywords: 조회할 단어 리스트
+        :return: keyword별 관련 토픽 레코드를 포함한 딕셔너리
+        """
+        results = {}
+        for keyword in dict.fromkeys(keywords):
+            topics = self.get(keyword)
+            if topics is not None:
+                results[keyword] = topics
+
+        return results
+
+    def put_many(self, topics_by_keyword: dict, fetched_at: Optional[float] = None) -> int:
+        """여러 keyword의 관련 토픽을 하나의 트랜잭션으로 저장합니다. 이미 있으면 덮어씁니다.
+
+        :param topics_by_keyword: keyword별 관련 토픽 레코드를 포함한 딕셔너리
+        :param fetched_at: 조회 시각 (기본값: 현재 시각)
+        :return: 저장한 keyword 수
+        """
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        rows = [(*self.key(keyword), fetched_at, json.dumps(topics, ensure_ascii=False))
+                for keyword, topics in topics_by_keyword.items()]
+
+        with self._lock:
+            self._db.executemany("""
+                INSERT OR REPLACE INTO trends_snapshot (keyword, geo, timeframe, hl, fetched_at, payload)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+            self._db.commit()
+
+        for keyword, topics in topics_by_keyword.items():
+            self._memory.set(self.key(keyword), (fetched_at, topics))
+
+        return len(rows)
+
+    def fetched_at(self, keywords: Iterable[str]) -> dict:
+        """저장된 keyword별 조회 시각을 조회합니다. 저장되지 않은 keyword는 결과에서 빠집니다."""
+        keywords = list(dict.fromkeys(keywords))
+        rows = []
+
+        # SQLite의 파라미터 수 제한(999)을 넘지 않도록 나누어 조회한다.
+        with self._lock:
+            for start in range(0, len(keywords), 900):
+                chunk = keywords[start:start + 900]
+                rows += self._db.execute(f"""
+                    SELECT keyword, fetched_at
+                    FROM trends_snapshot
+                    WHERE geo = ? AND timeframe = ? AND hl = ? AND keyword IN ({', '.join('?' * len(chunk))})
+                """, (self.geo, self.timeframe, self.hl, *chunk)).fetchall()
+
+        return dict(rows)
+
+    def stats(self) -> dict:
+        """저장소 사용 정보를 조회합니다.
+
+        :return: 저장소 사용 정보를 포함한 딕셔너리:
+            {
+                'size': int,            # 저장된 keyword 수
+                'oldest': float,        # 가장 오래된 조회 시각 (비어 있으면 None)
+                'newest': float,        # 가장 최근 조회 시각 (비어 있으면 None)
+                'hits': int,            # 조회 성공 횟수
+                'misses': int,          # 저장된 결과가 없던 횟수
+                'memory': dict          # LRU 캐시 사용 정보
+            }
+        """
+        with self._lock:
+            size, oldest, newest = self._db.execute("""
+                SELECT COUNT(*), MIN(fetched_at), MAX(fetched_at)
+                FROM trends_snapshot
+                WHERE geo = ? AND timeframe = ? AND hl = ?
+            """, (self.geo, self.timeframe, self.hl)).fetchone()
+
+        return {
+            'size': size,
+            'oldest': oldest,
+            'newest': newest,
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory': self._memory.stats()
+        }
+
+
+def read_topics_csv(path: str) -> dict:
+    """CSV 덤프를 keyword별 관련 토픽 딕셔너리로 읽습니다.
+    첫 줄은 CSV_FIELDS 헤더이며, 관련 토픽 한 개가 한 줄입니다. (토픽이 없는 keyword는 topic_title을 비워 둔다.)
+
+    :param path: CSV 파일 경로
+    :return: keyword별 관련 토픽 레코드를 포함한 딕셔너리 (fetch_related_topics_batch 참고)
+    """
+    topics_by_keyword = {}
+
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        for row in csv.DictReader(csv_file):
+            topics = topics_by_keyword.setdefault(row['keyword'], {'top': [], 'rising': []})
+            if not row.get('topic_title'):
+                continue
+
+            topics[row['kind']].append({
+                'topic_title': row['topic_title'],
+                'topic_type': row.get('topic_type') or '',
+                'value': int(row['value'])
+            })
+
+    # 같은 keyword의 토픽은 관계 정도가 높은 순서로 둔다. (pytrends 응답과 같은 순서)
+    for topics in topics_by_keyword.values():
+        for records in topics.values():
+            records.sort(key=lambda record: -record['value'])
+
+    return topics_by_keyword
+
+
+def read_topics_json(path: str) -> dict:
+    """fetch_related_topics_batch 결과와 같은 형태의 JSON 덤프를 읽습니다."""
+    with open(path, encoding='utf-8') as json_file:
+        return json.load(json_file)
+
+
+class TrendsSnapshotImporter:
+    """TrendsSnapshotStore를 채웁니다.
+
+    - import_keywords: keyword를 MAX_KEYWORDS_PER_PAYLOAD개씩 묶어서 fetch_many로 조회하고 저장합니다.
+    - import_file: CSV 또는 JSON 덤프를 그대로 저장합니다. (네트워크를 사용하지 않음)
+    - refresh, start: keywords()가 반환하는 keyword(예: pages.keyword) 중 max_age보다 오래되었거나 없는 keyword만
+      주기적으로 다시 조회합니다.
+
+    fetch_many는 fetch_many(keywords, geo, timeframe, hl) 형태의 함수이며,
+    실제 pytrends 대신 fixture를 반환하는 함수를 넘기면 네트워크 없이 사용할 수 있습니다.
+    """
+
+    def __init__(self, store: TrendsSnapshotStore, fetch_many: Callable, keywords: Optional[Callable] = None,
+                 max_age: float = 24 * 60 * 60, batch_size: int = MAX_KEYWORDS_PER_PAYLOAD):
+        self.store = store
+        self.fetch_many = fetch_many
+        self.keywords = keywords
+        self.max_age = max_age
+        self.batch_size = batch_size
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock_file = None
+
+        self.imported = 0
+        self.failed = 0
+        self.runs = 0
+        self.last_run = None
+
+    def import_keywords(self, keywords: Iterable[str]) -> dict:
+        """keyword의 관련 토픽을 조회해서 저장합니다. 실패한 묶음은 건너뛰고 다음 묶음을 조회합니다.
+
+        :param keywords: 조회할 단어 리스트
+        :return: 결과를 포함한 딕셔너리 {'imported': int, 'failed': int}
+        """
+        keywords = [keyword for keyword in dict.fromkeys(keywords) if keyword]
+        imported, failed = 0, 0
+
+        for start in range(0, len(keywords), self.batch_size):
+            batch = keywords[start:start + self.batch_size]
+            try:
+                topics_by_keyword = self.fetch_many(batch, self.store.geo, self.store.timeframe, self.store.hl)
+                imported += self.store.put_many({keyword: topics_by_keyword[keyword] for keyword in batch
+                                                 if keyword in topics_by_keyword})
+                failed += sum(1 for keyword in batch if keyword not in topics_by_keyword)
+            except Exception as e:
+                failed += len(batch)
+                logger.warning('[trends] 스냅샷 조회 실패 %s: %s', batch, e)
+
+        self.imported += imported
+        self.failed += failed
+
+        return {'imported': imported, 'failed': failed}
+
+    def import_file(self, path: str, fetched_at: Optional[float] = None) -> dict:
+        """CSV(.csv) 또는 JSON 덤프의 관련 토픽을 저장합니다.
+
+        :param path: 덤프 파일 경로
+        :param fetched_at: 조회 시각 (기본값: 현재 시각)
+        :return: 결과를 포함한 딕셔너리 {'imported': int, 'failed': int}
+        """
+        if path.endswith('.csv'):
+            topics_by_keyword = read_topics_csv(path)
+        else:
+            topics_by_keyword = read_topics_json(path)
+
+        imported = self.store.put_many(topics_by_keyword, fetched_at)
+        self.imported += imported
+
+        return {'imported': imported, 'failed': 0}
+
+    def stale_keywords(self, keywords: Iterable[str]) -> list:
+        """저장되지 않았거나 max_age보다 오래된 keyword를 반환합니다. (저장되지 않은 keyword를 먼저 둔다.)"""
+        keywords = [keyword for keyword in dict.fromkeys(keywords) if keyword]
+        fetched_at = self.store.fetched_at(keywords)
+        now = time.time()
+
+        missing = [keyword for keyword in keywords if keyword not in fetched_at]
+        expired = sorted((keyword for keyword in keywords
+                          if keyword in fetched_at and now - fetched_at[keyword] > self.max_age),
+                         key=lambda keyword: fetched_at[keyword])
+
+        return missing + expired
+
+    def refresh(self) -> dict:
+        """keywords()의 keyword 중 오래되었거나 없는 keyword만 다시 조회합니다.
+
+        :return: 결과를 포함한 딕셔너리 {'keywords': int, 'stale': int, 'imported': int, 'failed': int}
+        """
+        keywords = list(self.keywords())
+        stale = self.stale_keywords(keywords)
+        result = self.import_keywords(stale)
+
+        self.runs += 1
+        self.last_run = time.time()
+
+        return {'keywords': len(keywords), 'stale': len(stale), **result}
+
+    def _acquire_lock(self, lock_path: str) -> bool:
+        """lock_path 파일 잠금을 잡습니다. 다른 프로세스가 잡고 있으면 False를 반환합니다. (잡은 잠금은 프로세스가 끝날 때 풀린다.)"""
+        if self._lock_file is not None:
+            return True
+
+        import fcntl
+
+        lock_file = open(lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        return True
+
+    def start(self, interval: float, lock_path: Optional[str] = None):
+        """interval초마다 refresh를 실행하는 백그라운드 thread를 시작합니다.
+        lock_path를 지정하면 그 파일 잠금을 잡은 프로세스 하나만 refresh를 실행합니다.
+        (잠금을 잡지 못한 프로세스는 interval마다 다시 시도하므로, 잡고 있던 worker가 끝나면 다른 worker가 이어서 갱신한다.)
+
+        :param interval: refresh 간격 (초)
+        :param lock_path: 여러 worker 프로세스 중 하나만 갱신하기 위한 잠금 파일 경로
+        """
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    if lock_path is None or self._acquire_lock(lock_path):
+                        logger.info('[trends] 스냅샷 갱신: %s', self.refresh())
+                except Exception as e:
+                    logger.warning('[trends] 스냅샷 갱신 실패: %s', e)
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name='trends-snapshot', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        """가져오기 정보를 조회합니다.
+
+        :return: 가져오기 정보를 포함한 딕셔너리:
+            {
+                'imported': int,    # 저장한 keyword 수
+                'failed': int,      # 조회에 실패한 keyword 수
+                'runs': int,        # refresh 실행 횟수
+                'last_run': float   # 마지막 refresh 시각
+            }
+        """
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'runs': self.runs,
+            'last_run': self.last_run
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from .trends import fetch_related_topics_batch
+
+    parser = argparse.ArgumentParser(description='google trends 관련 토픽을 로컬 스냅샷 저장소로 가져옵니다.')
+    parser.add_argument('--path', default='./recommend/google_trends/trends_snapshot.sqlite3')
+    parser.add_argument('--db-url', default=None, help='pages.keyword를 가져올 DB 주소 (예: config.DB_URL)')
+    parser.add_argument('--file', default=None, help='가져올 CSV(.csv) 또는 JSON 덤프 파일')
+    parser.add_argument('--keywords', nargs='*', default=None, help='가져올 단어')
+    parser.add_argument('--max-age', type=float, default=24 * 60 * 60, help='이보다 오래된(초) 결과만 다시 조회')
+    parser.add_argument('--interval', type=float, default=None, help='지정하면 이 간격(초)으로 계속 갱신')
+    args = parser.parse_args()
+
+    store = TrendsSnapshotStore(args.path)
+    keywords = None
+    if args.db_url:
+        from sqlalchemy import create_engine
+        from models import PageDao
+
+        keywords = PageDao(create_engine(args.db_url, encoding='utf-8')).find_distinct_keywords
+    elif args.keywords:
+        keywords = lambda: args.keywords
+
+    importer = TrendsSnapshotImporter(store, fetch_related_topics_batch, keywords, max_age=args.max_age)
+
+    if args.file:
+        print(json.dumps(importer.import_file(args.file), ensure_ascii=False))
+    if keywords is not None:
+        if args.interval:
+            # worker 프로세스(create_app)와 같은 잠금을 사용해서 동시에 갱신하지 않는다.
+            importer.start(args.interval, lock_path=args.path + '.lock')
+            importer._thread.join()
+        else:
+            print(json.dumps(importer.refresh(), ensure_ascii=False))
+    print(json.dumps(store.stats(), ensure_ascii=False))
@@ -1,12 +1,68 @@
 from pytrends.request import TrendReq
 
-def recommend_pytrends(keyword: str) -> list:
-    pytrends = TrendReq(hl='ko', tz=360)
+# pytrends의 build_payload는 한 번에 최대 5개의 키워드를 받는다.
+# 묶어도 related_topics()는 keyword마다 widget 요청을 한 번씩 보내므로 줄어드는 것은 token(explore) 요청뿐이다.
+MAX_KEYWORDS_PER_PAYLOAD = 5
 
-    keyword_list = [keyword]
+def _topic_records(data_frame) -> list:
+    """related_topics()의 DataFrame을 캐시에 저장할 수 있는 레코드 리스트로 변환합니다."""
+    if data_frame is None:
+        return []
 
-    # TODO: timeframe 날짜 변경
-    pytrends.build_payload(keyword_list, cat=0, timeframe='today 5-y', geo='KR')
-    data = pytrends.related_topics()
+    return [{
+        'topic_title': str(record['topic_title']),
+        'topic_type': str(record['topic_type']),
+        'value': int(record['value'])
+    } for record in data_frame.to_dict('records')]
 
-    return data
\ No newline at end of file
+def fetch_related_topics(keyword: str, geo: str = 'KR', timeframe: str = 'today 5-y', hl: str = 'ko') -> dict:
+    """keyword의 google trends 관련 토픽을 조회합니다.
+
+    :param keyword: 조회할 단어
+    :param geo: 지역
+    :param timeframe: 조회 기간
+    :param hl: 언어
+    :return: 관련 토픽 레코드를 포함한 딕셔너리:
+        {
+            'top': [{
+                'topic_title': str, # 토픽 이름
+                'topic_type': str,  # 토픽 종류
+                'value': int        # 관계 정도
+            }],
+            'rising': [...]         # top과 동일
+        }
+    """
+    return fetch_related_topics_batch([keyword], geo, timeframe, hl)[keyword]
+
+def fetch_related_topics_batch(keywords: list, geo: str = 'KR', timeframe: str = 'today 5-y', hl: str = 'ko') -> dict:
+    """여러 keyword의 google trends 관련 토픽을 조회합니다.
+    keyword를 최대 5개씩 묶어서 하나의 payload로 요청하고, 결과를 keyword별로 나눕니다.
+    묶음마다 token 요청 1번과 keyword별 widget 요청 1번씩을 보내므로, keyword n개의 요청 수는
+    n + ceil(n / 5)번입니다. (keyword마다 따로 조회하면 2n번, 5개씩 꽉 찬 묶음이면 약 40% 감소)
+
+    :param keywords: 조회할 단어 리스트
+    :param geo: 지역
+    :param timeframe: 조회 기간
+    :param hl: 언어
+    :return: keyword별 관련 토픽 레코드를 포함한 딕셔너리:
+        {
+            keyword: {'top': [...], 'rising': [...]}  # fetch_related_topics 참고
+        }
+    """
+    keywords = list(dict.fromkeys(keywords))
+    pytrends = TrendReq(hl=hl, tz=360)
+
+    related_topics = {}
+    for start in range(0, len(keywords), MAX_KEYWORDS_PER_PAYLOAD):
+        keyword_list = keywords[start:start + MAX_KEYWORDS_PER_PAYLOAD]
+        pytrends.build_payload(keyword_list, cat=0, timeframe=timeframe, geo=geo)
+        data = pytrends.related_topics()
+
+        for keyword in keyword_list:
+            topics = data.get(keyword) or {}
+            related_topics[keyword] = {
+                'top': _topic_records(topics.get('top')),
+                'rising': _topic_records(topics.get('rising'))
+            }
+
+    return related_topics
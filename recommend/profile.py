@@ -0,0 +1,177 @@
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+from cache import LRUCache
+
+
+class UserProfile:
+    """사용자의 모든 페이지 키워드 벡터의 합입니다. (특정 모델 버전의 벡터로 계산)
+    페이지별 키워드를 함께 보관해서 페이지 생성, 키워드 변경, 삭제를 전체 재계산 없이 반영합니다.
+    """
+
+    def __init__(self, model_version: int, vector_size: int):
+        self.model_version = model_version
+        self.total = np.zeros(vector_size, dtype=np.float32)
+        self.page_keywords = {}
+        self._vector = None
+
+    @property
+    def vector(self) -> np.ndarray:
+        """정규화된 프로필 벡터 (단어 사전에 있는 키워드가 없으면 0 벡터)"""
+        if self._vector is None:
+            norm = np.linalg.norm(self.total)
+            self._vector = self.total / norm if norm > 0 else np.zeros_like(self.total)
+
+        return self._vector
+
+    def add(self, page_id: int, keyword: str, vector: Optional[np.ndarray]):
+        self.page_keywords[page_id] = (keyword, vector)
+        if vector is not None:
+            self.total += vector
+            self._vector = None
+
+    def remove(self, page_id: int):
+        _, vector = self.page_keywords.pop(page_id, (None, None))
+        if vector is not None:
+            self.total -= vector
+            self._vector = None
+
+
+class UserProfiles:
+    """사용자별 키워드 프로필 벡터를 캐시하고, 추천 후보를 프로필과의 유사도로 다시 정렬합니다.
+
+    프로필은 사용자의 모든 노트에 있는 페이지 키워드의 정규화 벡터 합이며, 처음 필요할 때 load_keywords로 한 번 만들고
+    이후에는 페이지 이벤트(on_page_keyword_changed, on_page_deleted)로 갱신합니다.
+    모델 버전이 바뀌면 다시 만듭니다. 페이지의 소유자는 만든 프로필에서 기억하고, 모르는 페이지만 find_owner로 조회합니다.
+
+    다시 정렬한 점수는 score * (1 + weight * max(0, 후보와 프로필의 코사인 유사도)) 입니다.
+    """
+
+    def __init__(self, load_keywords: Callable, find_owner: Callable, weight: float = 0.5,
+                 max_size: int = 10000, ttl: Optional[float] = 60 * 60, max_pages: int = 100000):
+        """
+        :param load_keywords: 사용자 id로 [{'page_id': int, 'keyword': str}] 를 반환하는 함수
+        :param find_owner: 페이지 id로 소유자(사용자) id를 반환하는 함수 (없으면 -1)
+        :param weight: 프로필 유사도의 가중치
+        :param max_size: 캐시할 사용자 수
+        :param ttl: 프로필을 다시 만들기까지의 시간 (이벤트를 놓친 경우를 대비)
+        :param max_pages: 소유자를 기억할 페이지 수
+        """
+        self.load_keywords = load_keywords
+        self.find_owner = find_owner
+        self.weight = weight
+
+        self._profiles = LRUCache(max_size, ttl)
+        self._owners = LRUCache(max_pages)
+        self._lock = threading.Lock()
+
+        self.builds = 0
+        self.updates = 0
+
+    def owner(self, page_id: int) -> int:
+        """페이지의 소유자(사용자) id를 조회합니다. 페이지가 없으면 -1을 반환합니다."""
+        page_id = int(page_id)
+        user_id = self._owners.get(page_id)
+        if user_id is None:
+            user_id = self.find_owner(page_id)
+            if user_id != -1:
+                self._owners.set(page_id, user_id)
+
+        return user_id
+
+    def get(self, user_id: int, current) -> UserProfile:
+        """사용자의 프로필을 조회합니다. 없거나 다른 모델 버전으로 만들었으면 새로 만듭니다.
+
+        :param user_id: 사용자 id
+        :param current: 활성 모델 버전 (ModelRegistry.current)
+        :return: 사용자 프로필
+        """
+        profile = self._profiles.get(user_id)
+        if profile is not None and profile.model_version == current.version:
+            return profile
+
+        page_list = self.load_keywords(user_id)
+        keywords = [page['keyword'] for page in page_list]
+        positions, _, vectors = current.model.get_normed_vectors(keywords)
+        vector_by_position = dict(zip(positions, vectors))
+
+        profile = UserProfile(current.version, current.model.wv.vector_size)
+        for position, page in enumerate(page_list):
+            profile.add(page['page_id'], page['keyword'], vector_by_position.get(position))
+            self._owners.set(page['page_id'], user_id)
+
+        self._profiles.set(user_id, profile)
+        self.builds += 1
+
+        return profile
+
+    def on_page_keyword_changed(self, page_id: int, keyword: str, current):
+        """페이지 생성, 키워드 변경을 캐시된 프로필에 반영합니다.
+        프로필이 캐시되지 않았거나 다른 모델 버전으로 만들었으면 아무것도 하지 않습니다. (다음 조회 때 새로 만든다.)
+
+        :param page_id: 페이지 id
+        :param keyword: 페이지의 새 키워드
+        :param current: 활성 모델 버전 (ModelRegistry.current)
+        """
+        page_id = int(page_id)
+        user_id = self.owner(page_id)
+        profile = self._profiles.get(user_id) if user_id != -1 else None
+        if profile is None or profile.model_version != current.version:
+            return
+
+        _, _, vectors = current.model.get_normed_vectors([keyword])
+        with self._lock:
+            profile.remove(page_id)
+            profile.add(page_id, keyword, vectors[0] if len(vectors) else None)
+        self.updates += 1
+
+    def on_page_deleted(self, page_id: int):
+        """페이지 삭제를 캐시된 프로필에 반영합니다. 페이지는 이미 삭제되었으므로 기억한 소유자만 사용합니다."""
+        page_id = int(page_id)
+        user_id = self._owners.get(page_id)
+        profile = self._profiles.get(user_id) if user_id is not None else None
+        self._owners.delete(page_id)
+        if profile is None:
+            return
+
+        with self._lock:
+            profile.remove(page_id)
+        self.updates += 1
+
+    def rerank(self, scores: np.ndarray, vectors: np.ndarray, profile: Optional[UserProfile],
+               positions: Optional[list] = None) -> np.ndarray:
+        """추천 후보 점수를 프로필과의 유사도로 조정합니다. (한 번의 행렬-벡터 곱)
+
+        :param scores: (N,) 후보 점수 배열
+        :param vectors: (K, D) 후보의 정규화된 벡터
+        :param profile: 사용자 프로필 (None이면 scores를 그대로 반환)
+        :param positions: vectors가 scores의 일부 후보만 있을 때 각 벡터의 위치 (기본값: 모든 후보)
+        :return: (N,) 조정된 점수 배열
+        """
+        if profile is None or len(vectors) == 0:
+            return scores
+
+        affinity = np.zeros(len(scores), dtype=np.float64)
+        affinity[positions if positions is not None else slice(None)] = np.clip(vectors @ profile.vector, 0, None)
+
+        return scores * (1 + self.weight * affinity)
+
+    def stats(self) -> dict:
+        """프로필 캐시 사용 정보를 조회합니다.
+
+        :return: 프로필 캐시 사용 정보를 포함한 딕셔너리:
+            {
+                'builds': int,      # 프로필을 새로 만든 횟수
+                'updates': int,     # 이벤트로 프로필을 갱신한 횟수
+                'profiles': dict,   # 프로필 LRU 캐시 사용 정보
+                'owners': dict      # 페이지 소유자 LRU 캐시 사용 정보
+            }
+        """
+        return {
+            'builds': self.builds,
+            'updates': self.updates,
+            'profiles': self._profiles.stats(),
+            'owners': self._owners.stats()
+        }
@@ -0,0 +1,85 @@
+import zlib
+from typing import Optional
+
+import numpy as np
+
+SELECTION_MODES = ('sample', 'top_k')
+
+
+def selection_seed(*parts) -> int:
+    """요청 정보(keyword, page_id 등)로 프로세스와 관계없이 항상 같은 난수 시드를 만듭니다.
+    (파이썬 hash는 프로세스마다 달라지므로 사용하지 않습니다.)
+
+    :param parts: 시드를 만들 값
+    :return: 32bit 난수 시드
+    """
+    return zlib.crc32('\x1f'.join(str(part) for part in parts).encode('utf-8'))
+
+
+def top_k(scores: np.ndarray, k: int, exclude_mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """점수가 높은 k개의 위치를 점수 내림차순으로 고릅니다.
+
+    :param scores: (N,) 점수 배열
+    :param k: 고를 개수
+    :param exclude_mask: (N,) 고르지 않을 위치 mask
+    :return: 선택된 위치 배열 (후보가 k개보다 적으면 후보 수만큼)
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if exclude_mask is not None:
+        scores = np.where(exclude_mask, -np.inf, scores)
+
+    k = min(k, int(np.count_nonzero(scores > -np.inf)))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    best = np.argpartition(-scores, k - 1)[:k]
+
+    return best[np.argsort(-scores[best], kind='stable')]
+
+
+def gumbel_top_k(scores: np.ndarray, k: int, seed: int, exclude_mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """점수에 비례하는 확률로 k개의 위치를 중복 없이 고릅니다.
+    log(점수)에 Gumbel 잡음을 더한 값의 상위 k개를 고르는 것은 np.random.choice(replace=False, p=점수/합)와
+    같은 분포이며, 시드가 같으면 항상 같은 결과를 반환합니다. 점수가 0 이하인 위치는 고르지 않습니다.
+
+    :param scores: (N,) 점수 배열 (관계 정도, 유사도)
+    :param k: 고를 개수
+    :param seed: 난수 시드 (selection_seed 참고)
+    :param exclude_mask: (N,) 고르지 않을 위치 mask
+    :return: 선택된 위치 배열 (선택 순서대로)
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logits = np.where(scores > 0, np.log(scores), -np.inf)
+
+    gumbel = np.random.default_rng(seed).gumbel(size=logits.shape[0])
+
+    return top_k(logits + gumbel, k, exclude_mask)
+
+
+class Selector:
+    """추천 후보에서 응답에 담을 단어를 고릅니다.
+
+    - 'sample': (keyword, page_id)로 만든 시드로 점수에 비례하여 무작위로 고릅니다.
+                같은 요청에는 항상 같은 결과를 반환하므로 응답을 캐시할 수 있습니다.
+    - 'top_k': 점수가 높은 순서대로 고릅니다.
+    """
+
+    def __init__(self, mode: str = 'sample', k: int = 5):
+        if mode not in SELECTION_MODES:
+            raise ValueError(f'unsupported selection mode: {mode}')
+
+        self.mode = mode
+        self.k = k
+
+    def select(self, scores: np.ndarray, exclude_mask: Optional[np.ndarray] = None, seed_parts: tuple = ()) -> np.ndarray:
+        """후보 점수 배열에서 k개의 위치를 고릅니다.
+
+        :param scores: (N,) 후보 점수 배열
+        :param exclude_mask: (N,) 고르지 않을 위치 mask (노트에 이미 있는 키워드 등)
+        :param seed_parts: 'sample' 모드의 시드를 만들 요청 정보
+        :return: 선택된 위치 배열
+        """
+        if self.mode == 'top_k':
+            return top_k(scores, self.k, exclude_mask)
+        return gumbel_top_k(scores, self.k, selection_seed(*seed_parts), exclude_mask)
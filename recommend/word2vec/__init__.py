@@ -0,0 +1,12 @@
+from .model import Word2VecModel, export_keyed_vectors
+from .registry import ModelRegistry, ModelLoadingError
+from .pool import SimilarityPool, PoolOverloadedError
+
+__all__ = [
+    "Word2VecModel",
+    "export_keyed_vectors",
+    "ModelRegistry",
+    "ModelLoadingError",
+    "SimilarityPool",
+    "PoolOverloadedError"
+]
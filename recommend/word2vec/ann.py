@@ -0,0 +1,287 @@
+import json
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray, block_size: int = 65536) -> np.ndarray:
+    """행 단위로 L2 정규화한 float32 배열을 만듭니다.
+    큰 배열도 블록 단위로 처리해서 임시 배열이 블록 크기를 넘지 않습니다.
+
+    :param vectors: (N, D) 벡터 배열
+    :param block_size: 한 번에 처리할 행 수
+    :return: 정규화된 (N, D) float32 배열
+    """
+    normalized = np.empty(vectors.shape, dtype=np.float32)
+    for start in range(0, vectors.shape[0], block_size):
+        block = np.asarray(vectors[start:start + block_size], dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        np.divide(block, norms, out=normalized[start:start + block_size])
+
+    return normalized
+
+
+def _topk(scores: np.ndarray, topn: int) -> np.ndarray:
+    """점수가 높은 순서로 정렬된 상위 topn개의 위치를 반환합니다."""
+    if topn >= scores.shape[0]:
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, topn)[:topn]
+
+    return candidates[np.argsort(-scores[candidates])]
+
+
+class IVFIndex:
+    """정규화된 단어 벡터에 대한 IVF(inverted file) 근사 최근접 이웃 인덱스입니다.
+
+    단어 벡터를 spherical k-means로 n_lists개의 클러스터로 나누고, 검색할 때는 질의 벡터와
+    가장 가까운 n_probe개의 클러스터 안에서만 내적을 계산합니다.
+    n_probe를 늘리면 recall이 올라가고 검색 시간이 늘어나며, n_probe >= n_lists이면 전체 검색과 같습니다.
+
+    인덱스는 디렉터리에 .npy 파일로 저장되어 mmap으로 불러올 수 있습니다:
+        centroids.npy   # (n_lists, D) 클러스터 중심
+        offsets.npy     # (n_lists + 1,) 클러스터별 시작 위치
+        ids.npy         # (N,) 클러스터 순서로 정렬된 단어 id
+        vectors.npy     # (N, D) 클러스터 순서로 정렬된 정규화 벡터
+        meta.json       # 인덱스 정보
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, ids: np.ndarray, vectors: np.ndarray,
+                 default_n_probe: Optional[int] = None):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.vectors = vectors
+        self.default_n_probe = default_n_probe if default_n_probe else max(1, self.n_lists // 8)
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    def __len__(self) -> int:
+        return self.ids.shape[0]
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_lists: Optional[int] = None, n_iter: int = 10,
+              sample_size: Optional[int] = None, seed: int = 0, block_size: int = 65536) -> 'IVFIndex':
+        """단어 벡터로 IVF 인덱스를 생성합니다.
+
+        :param vectors: (N, D) 단어 벡터 (정규화 전이어도 됨)
+        :param n_lists: 클러스터 수 (기본값: sqrt(N)의 4배)
+        :param n_iter: k-means 반복 횟수
+        :param sample_size: k-means 학습에 사용할 벡터 수 (기본값: 클러스터당 256개)
+        :param seed: 난수 시드
+        :param block_size: 클러스터 할당 시 한 번에 처리할 행 수
+        :return: 생성된 IVF 인덱스
+        """
+        normalized = normalize_rows(vectors, block_size)
+        n = normalized.shape[0]
+        if n_lists is None:
+            n_lists = int(4 * np.sqrt(n))
+        n_lists = max(1, min(n_lists, n))
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(n, sample_size if sample_size else 256 * n_lists)
+        sample = normalized[rng.choice(n, size=sample_size, replace=False)]
+
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assignment = cls._assign(sample, centroids, block_size)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=n_lists)
+
+            # 비어있는 클러스터는 임의의 벡터로 다시 초기화한다.
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums)
+
+        assignment = cls._assign(normalized, centroids, block_size)
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+
+        return cls(centroids, offsets, order.astype(np.int32), normalized[order])
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray, block_size: int) -> np.ndarray:
+        assignment = np.empty(vectors.shape[0], dtype=np.int64)
+        for start in range(0, vectors.shape[0], block_size):
+            assignment[start:start + block_size] = np.argmax(vectors[start:start + block_size] @ centroids.T, axis=1)
+
+        return assignment
+
+    def save(self, path: str) -> str:
+        """인덱스를 디렉터리에 저장합니다.
+
+        :param path: 저장할 디렉터리 경로
+        :return: 저장된 디렉터리 경로
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'centroids.npy'), self.centroids)
+        np.save(os.path.join(path, 'offsets.npy'), self.offsets)
+        np.save(os.path.join(path, 'ids.npy'), self.ids)
+        np.save(os.path.join(path, 'vectors.npy'), self.vectors)
+        with open(os.path.join(path, 'meta.json'), 'w') as meta:
+            json.dump({
+                'n_lists': self.n_lists,
+                'size': len(self),
+                'vector_size': int(self.vectors.shape[1]),
+                'default_n_probe': self.default_n_probe
+            }, meta)
+
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'IVFIndex':
+        """저장된 인덱스를 불러옵니다. 큰 배열은 mmap으로 불러옵니다.
+
+        :param path: 인덱스 디렉터리 경로
+        :param mmap_mode: numpy mmap 모드
+        :return: 불러온 IVF 인덱스
+        """
+        with open(os.path.join(path, 'meta.json')) as meta:
+            default_n_probe = json.load(meta).get('default_n_probe')
+
+        return cls(
+            np.load(os.path.join(path, 'centroids.npy')),
+            np.load(os.path.join(path, 'offsets.npy')),
+            np.load(os.path.join(path, 'ids.npy'), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, 'vectors.npy'), mmap_mode=mmap_mode),
+            default_n_probe
+        )
+
+    def search(self, query: np.ndarray, topn: int = 50, n_probe: Optional[int] = None,
+               exclude: Optional[int] = None) -> tuple:
+        """질의 벡터와 가장 유사한 단어를 근사 검색합니다.
+
+        :param query: (D,) 질의 벡터
+        :param topn: 찾을 단어 수
+        :param n_probe: 탐색할 클러스터 수 (recall/지연시간 조절값, 기본값: default_n_probe)
+        :param exclude: 결과에서 제외할 단어 id (질의 단어 자신)
+        :return: (단어 id 배열, 코사인 유사도 배열) 튜플
+        """
+        n_probe = min(n_probe if n_probe else self.default_n_probe, self.n_lists)
+        if n_probe >= self.n_lists:
+            return self.search_exact(query, topn, exclude)
+
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        probes = _topk(self.centroids @ query, n_probe)
+        ids = np.concatenate([self.ids[self.offsets[l]:self.offsets[l + 1]] for l in probes])
+        scores = np.concatenate([self.vectors[self.offsets[l]:self.offsets[l + 1]] @ query for l in probes])
+
+        return self._select(ids, scores, topn, exclude)
+
+    def search_exact(self, query: np.ndarray, topn: int = 50, exclude: Optional[int] = None) -> tuple:
+        """인덱스의 모든 벡터와 내적을 계산하는 전체 검색입니다.
+
+        :param query: (D,) 질의 벡터
+        :param topn: 찾을 단어 수
+        :param exclude: 결과에서 제외할 단어 id
+        :return: (단어 id 배열, 코사인 유사도 배열) 튜플
+        """
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        return self._select(np.asarray(self.ids), self.vectors @ query, topn, exclude)
+
+    @staticmethod
+    def _select(ids: np.ndarray, scores: np.ndarray, topn: int, exclude: Optional[int]) -> tuple:
+        if exclude is not None:
+            keep = ids != exclude
+            ids, scores = ids[keep], scores[keep]
+        best = _topk(scores, topn)
+
+        return ids[best], scores[best]
+
+
+def benchmark(wv, index: IVFIndex, n_probes: list, queries: int = 200, topn: int = 50, seed: int = 0) -> list:
+    """IVF 인덱스와 KeyedVectors.most_similar의 recall@topn과 검색 시간을 비교합니다.
+
+    :param wv: 비교할 KeyedVectors
+    :param index: 비교할 IVF 인덱스
+    :param n_probes: 측정할 n_probe 목록
+    :param queries: 질의 단어 수
+    :param topn: recall을 계산할 단어 수
+    :param seed: 질의 단어를 고르는 난수 시드
+    :return: 측정 결과 리스트:
+        [{
+            'method': str,          # 'most_similar' 또는 'ivf'
+            'n_probe': int,         # 탐색한 클러스터 수
+            'recall': float,        # most_similar 대비 recall@topn
+            'p50_ms': float,        # 검색 시간 중앙값 (ms)
+            'p95_ms': float         # 검색 시간 95 백분위수 (ms)
+        }]
+    """
+    rng = np.random.default_rng(seed)
+    query_ids = rng.choice(len(wv.index_to_key), size=min(queries, len(wv.index_to_key)), replace=False)
+
+    truth, elapsed = [], []
+    for query_id in query_ids:
+        start = time.perf_counter()
+        result = wv.most_similar(wv.index_to_key[query_id], topn=topn)
+        elapsed.append(time.perf_counter() - start)
+        truth.append({wv.key_to_index[key] for key, _ in result})
+
+    reports = [{
+        'method': 'most_similar',
+        'n_probe': None,
+        'recall': 1.0,
+        'p50_ms': float(np.percentile(elapsed, 50) * 1000),
+        'p95_ms': float(np.percentile(elapsed, 95) * 1000)
+    }]
+
+    for n_probe in n_probes:
+        hits, elapsed = 0, []
+        for query_id, expected in zip(query_ids, truth):
+            start = time.perf_counter()
+            ids, _ = index.search(wv.vectors[query_id], topn, n_probe, exclude=int(query_id))
+            elapsed.append(time.perf_counter() - start)
+            hits += len(expected.intersection(ids.tolist()))
+
+        reports.append({
+            'method': 'ivf',
+            'n_probe': n_probe,
+            'recall': hits / max(1, sum(len(expected) for expected in truth)),
+            'p50_ms': float(np.percentile(elapsed, 50) * 1000),
+            'p95_ms': float(np.percentile(elapsed, 95) * 1000)
+        })
+
+    return reports
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from .model import Word2VecModel
+
+    parser = argparse.ArgumentParser(description='Word2Vec 단어 벡터의 IVF 인덱스를 생성하거나 벤치마크합니다.')
+    parser.add_argument('command', choices=['build', 'bench'])
+    parser.add_argument('--model', default='./recommend/w2v_model/w2v_sg.model')
+    parser.add_argument('--output', default=None, help='인덱스 디렉터리 (기본값: 모델 경로 옆의 .ivf)')
+    parser.add_argument('--lists', type=int, default=None)
+    parser.add_argument('--iter', type=int, default=10)
+    parser.add_argument('--n-probe', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    model = Word2VecModel(args.model, ann_path=args.output)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        built = IVFIndex.build(model.wv.vectors, args.lists, args.iter)
+        built.save(model.ann_path)
+        print(json.dumps({
+            'path': model.ann_path,
+            'n_lists': built.n_lists,
+            'size': len(built),
+            'build_time': time.perf_counter() - start
+        }))
+    else:
+        for report in benchmark(model.wv, IVFIndex.load(model.ann_path), args.n_probe, args.queries):
+            print(json.dumps(report))
@@ -0,0 +1,290 @@
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from gensim.models import KeyedVectors, Word2Vec
+
+from .ann import IVFIndex
+from .neighbors import NeighborTable, blocked_topk
+from .quantize import QuantizedVectors
+
+
+def _resident_size() -> int:
+    """현재 프로세스의 상주 메모리(RSS) 크기를 byte 단위로 조회합니다.
+    /proc 을 사용할 수 없는 환경에서는 최대 상주 메모리 크기를 반환합니다.
+
+    :return: 상주 메모리 크기 (byte)
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def export_keyed_vectors(model_path: str, kv_path: str) -> str:
+    """Word2Vec 모델에서 KeyedVectors만 분리하여 저장합니다.
+    벡터 배열은 별도의 .npy 파일로 저장되어 mmap으로 불러올 수 있습니다.
+
+    :param model_path: Word2Vec 모델 경로
+    :param kv_path: 저장할 KeyedVectors 경로
+    :return: 저장된 KeyedVectors 경로
+    """
+    model = Word2Vec.load(model_path, mmap='r')
+    model.wv.save(kv_path, sep_limit=0)
+
+    return kv_path
+
+
+class Word2VecModel:
+    """Word2Vec 모델의 KeyedVectors를 프로세스당 한 번만 불러와서 보관합니다.
+
+    벡터는 읽기 전용 mmap으로 불러오기 때문에 같은 파일을 여는 모든 worker 프로세스가
+    같은 물리 페이지를 공유합니다. 모델 경로 옆에 KeyedVectors 파일(.kv)이 있으면 그것을 사용하고,
+    없으면 Word2Vec 모델을 불러와 KeyedVectors만 남깁니다. (prune.py로 만든 .kv 경로를 모델 경로로 지정해도 됩니다.)
+
+    유사 단어 검색은 다음 순서로 합니다.
+        1. 모델 경로 옆에 미리 계산한 이웃 표(.neighbors)가 있고 단어가 표에 있으면 표에서 바로 조회합니다.
+        2. IVF 인덱스 디렉터리(.ivf)가 있으면 인덱스로 근사 검색합니다. (n_probe가 0이면 사용하지 않음)
+        3. quantized('float16' 또는 'int8')를 지정했고 양자화 벡터 디렉터리(.float16, .int8)가 있으면
+           양자화된 벡터로 전체 검색합니다. 이때 float32 벡터는 mmap만 되고 읽지 않으므로 메모리에 올라오지 않습니다.
+        4. 그 외에는 전체 검색(most_similar)을 합니다.
+    """
+
+    def __init__(self, model_path: str, kv_path: Optional[str] = None, mmap: Optional[str] = 'r',
+                 ann_path: Optional[str] = None, n_probe: Optional[int] = None,
+                 neighbors_path: Optional[str] = None, quantized: Optional[str] = None,
+                 quantized_path: Optional[str] = None):
+        base_path = os.path.splitext(model_path)[0]
+
+        self.model_path = model_path
+        self.kv_path = kv_path if kv_path else base_path + '.kv'
+        self.ann_path = ann_path if ann_path else base_path + '.ivf'
+        self.neighbors_path = neighbors_path if neighbors_path else base_path + '.neighbors'
+        self.quantized = quantized
+        self.quantized_path = quantized_path if quantized_path else (base_path + '.' + quantized if quantized else None)
+        self.mmap = mmap
+        self.n_probe = n_probe
+
+        self._wv = None
+        self._ann_index = None
+        self._neighbor_table = None
+        self._quantized_vectors = None
+        self._lock = threading.Lock()
+        self._load_time = None
+        self._resident_size = None
+
+    def load(self) -> KeyedVectors:
+        """KeyedVectors를 불러옵니다. 이미 불러왔다면 보관 중인 KeyedVectors를 반환합니다.
+        모델 파일이 존재하지 않으면 'FileNotFoundError' 예외가 발생합니다.
+
+        :return: 불러온 KeyedVectors
+        """
+        if self._wv is not None:
+            return self._wv
+
+        with self._lock:
+            if self._wv is None:
+                start = time.perf_counter()
+
+                if os.path.exists(self.kv_path):
+                    wv = KeyedVectors.load(self.kv_path, mmap=self.mmap)
+                else:
+                    wv = Word2Vec.load(self.model_path, mmap=self.mmap).wv
+
+                if self.n_probe != 0 and os.path.isdir(self.ann_path):
+                    ann_index = IVFIndex.load(self.ann_path, mmap_mode=self.mmap)
+                    if len(ann_index) != len(wv.index_to_key):
+                        raise ValueError(f'IVF index size mismatch: {self.ann_path}')
+                    self._ann_index = ann_index
+
+                if os.path.isdir(self.neighbors_path):
+                    neighbor_table = NeighborTable.load(self.neighbors_path, mmap_mode=self.mmap)
+                    if neighbor_table.vocab_size != len(wv.index_to_key):
+                        raise ValueError(f'neighbor table size mismatch: {self.neighbors_path}')
+                    self._neighbor_table = neighbor_table
+
+                if self.quantized_path and os.path.isdir(self.quantized_path):
+                    quantized_vectors = QuantizedVectors.load(self.quantized_path, mmap_mode=self.mmap)
+                    if len(quantized_vectors) != len(wv.index_to_key):
+                        raise ValueError(f'quantized vectors size mismatch: {self.quantized_path}')
+                    self._quantized_vectors = quantized_vectors
+
+                self._load_time = time.perf_counter() - start
+                self._wv = wv
+
+        return self._wv
+
+    @property
+    def wv(self) -> KeyedVectors:
+        return self.load()
+
+    @property
+    def ann_index(self) -> Optional[IVFIndex]:
+        self.load()
+        return self._ann_index
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._wv is not None
+
+    def warm_up(self) -> dict:
+        """모델을 불러오고 norm을 미리 계산해서 첫 요청이 모델 로딩 비용을 치르지 않도록 합니다.
+
+        :return: 모델 로딩 시간과 상주 메모리 크기를 포함한 딕셔너리 (stats 참고)
+        """
+        wv = self.load()
+        if self._quantized_vectors is None:
+            wv.fill_norms()
+        if len(wv.index_to_key) > 0:
+            self.most_similar(wv.index_to_key[0], topn=1)
+
+        self._resident_size = _resident_size()
+
+        return self.stats()
+
+    def most_similar_ids(self, keyword: str, topn: int = 50) -> tuple:
+        """keyword와 가장 유사한 단어의 id와 유사도를 찾습니다.
+        만약 keyword가 단어 사전에 없으면 'KeyError' 예외가 발생합니다.
+
+        :param keyword: 찾을 단어
+        :param topn: 찾을 단어 수
+        :return: (단어 id 배열, 유사도 배열) 튜플 (유사도 내림차순)
+        """
+        wv = self.wv
+        index = wv.key_to_index[keyword]
+
+        if self._neighbor_table is not None and self._neighbor_table.covers(index, topn):
+            return self._neighbor_table.lookup(index, topn)
+        elif self._ann_index is not None:
+            return self._ann_index.search(wv.vectors[index], topn, self.n_probe, exclude=index)
+        elif self._quantized_vectors is not None:
+            query = self._quantized_vectors.get_vector(index)
+            return self._quantized_vectors.most_similar(query, topn, exclude=index)
+
+        # 노름이 0인 벡터로 나누지 않도록 get_normed_vectors_by_ids, similar_by_vectors와 같이 0을 1로 바꿔서 나눈다.
+        wv.fill_norms()
+        query = self.get_normed_vectors_by_ids(np.array([index], dtype=np.int64))[0]
+        scores = (wv.vectors @ query) / np.where(wv.norms == 0, 1.0, wv.norms)
+        scores[index] = -np.inf
+
+        topn = min(topn, scores.shape[0] - 1)
+        best = np.argpartition(-scores, topn - 1)[:topn]
+        best = best[np.argsort(-scores[best])]
+
+        return best, scores[best]
+
+    def most_similar(self, keyword: str, topn: int = 50) -> list:
+        """keyword와 가장 유사한 단어를 찾습니다.
+        만약 keyword가 단어 사전에 없으면 'KeyError' 예외가 발생합니다.
+
+        :param keyword: 찾을 단어
+        :param topn: 찾을 단어 수
+        :return: (단어, 유사도) 튜플 리스트
+        """
+        ids, scores = self.most_similar_ids(keyword, topn)
+        index_to_key = self.wv.index_to_key
+
+        return [(index_to_key[i], float(score)) for i, score in zip(ids.tolist(), scores.tolist())]
+
+    def get_normed_vectors(self, keywords: list) -> tuple:
+        """단어 사전에 있는 keyword의 정규화된 벡터를 조회합니다.
+
+        :param keywords: 조회할 단어 리스트
+        :return: (단어 사전에 있는 keyword의 위치 리스트, 단어 id 배열, (K, D) 정규화된 벡터 배열) 튜플
+        """
+        wv = self.wv
+        positions = [position for position, keyword in enumerate(keywords) if keyword in wv.key_to_index]
+        ids = np.array([wv.key_to_index[keywords[position]] for position in positions], dtype=np.int64)
+
+        return positions, ids, self.get_normed_vectors_by_ids(ids)
+
+    def get_normed_vectors_by_ids(self, ids: np.ndarray) -> np.ndarray:
+        """단어 id의 정규화된 벡터를 조회합니다.
+
+        :param ids: (K,) 단어 id 배열
+        :return: (K, D) 정규화된 벡터 배열
+        """
+        # 전체 단어를 정규화한 배열(wv.get_normed_vectors())을 만들지 않고 필요한 행만 fancy indexing으로 꺼낸다.
+        ids = np.asarray(ids, dtype=np.int64)
+        if self._quantized_vectors is not None:
+            vectors = self._quantized_vectors.get_vectors(ids)
+        else:
+            vectors = self.wv.vectors[ids].astype(np.float32)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        return vectors / norms
+
+    def similar_by_vectors(self, queries: np.ndarray, topn: int = 50, exclude_mask: Optional[np.ndarray] = None) -> tuple:
+        """여러 질의 벡터와 가장 유사한 단어를 한 번의 (블록 단위) 행렬 곱으로 찾습니다.
+
+        :param queries: (Q, D) 정규화된 질의 벡터
+        :param topn: 질의마다 찾을 단어 수
+        :param exclude_mask: (N,) 결과에서 제외할 단어 mask
+        :return: ((Q, topn) 단어 id 배열, (Q, topn) 코사인 유사도 배열) 튜플
+        """
+        wv = self.wv
+        if self._quantized_vectors is not None:
+            vectors, row_scales = self._quantized_vectors.data, self._quantized_vectors.scales
+        else:
+            wv.fill_norms()
+            vectors, row_scales = wv.vectors, 1.0 / np.where(wv.norms == 0, 1.0, wv.norms)
+
+        return blocked_topk(vectors, np.asarray(queries, dtype=np.float32), topn,
+                            exclude_mask=exclude_mask, row_scales=row_scales)
+
+    def stats(self) -> dict:
+        """모델의 로딩 정보를 조회합니다.
+
+        :return: 모델 로딩 정보를 포함한 딕셔너리:
+            {
+                'loaded': bool,         # 로딩 여부
+                'path': str,            # 모델 경로
+                'load_time': float,     # 로딩 시간 (초)
+                'vocab_size': int,      # 단어 사전 크기
+                'vector_size': int,     # 벡터 차원
+                'vectors_bytes': int,   # 벡터 배열 크기 (byte)
+                'resident_size': int,   # 워밍업 후 프로세스 상주 메모리 크기 (byte)
+                'ann_lists': int,       # IVF 인덱스 클러스터 수 (인덱스가 없으면 None)
+                'ann_n_probe': int,     # IVF 인덱스 탐색 클러스터 수 (인덱스가 없으면 None)
+                'neighbors_size': int,  # 이웃 표에 있는 단어 수 (표가 없으면 None)
+                'neighbors_topn': int,  # 이웃 표의 단어당 이웃 수 (표가 없으면 None)
+                'quantized': str,       # 양자화 타입 (양자화 벡터가 없으면 None)
+                'quantized_bytes': int  # 양자화 벡터 크기 (byte)
+            }
+        """
+        wv = self._wv
+
+        return {
+            'loaded': wv is not None,
+            'path': self.kv_path if os.path.exists(self.kv_path) else self.model_path,
+            'load_time': self._load_time,
+            'vocab_size': len(wv.index_to_key) if wv is not None else 0,
+            'vector_size': wv.vector_size if wv is not None else 0,
+            'vectors_bytes': int(wv.vectors.nbytes) if wv is not None else 0,
+            'resident_size': self._resident_size,
+            'ann_lists': self._ann_index.n_lists if self._ann_index is not None else None,
+            'ann_n_probe': (self.n_probe or self._ann_index.default_n_probe) if self._ann_index is not None else None,
+            'neighbors_size': self._neighbor_table.size if self._neighbor_table is not None else None,
+            'neighbors_topn': self._neighbor_table.topn if self._neighbor_table is not None else None,
+            'quantized': self._quantized_vectors.dtype if self._quantized_vectors is not None else None,
+            'quantized_bytes': self._quantized_vectors.nbytes if self._quantized_vectors is not None else None
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Word2Vec 모델에서 mmap용 KeyedVectors를 분리합니다.')
+    parser.add_argument('--model', default='./recommend/w2v_model/w2v_sg.model')
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    model = Word2VecModel(args.model, args.output)
+    export_keyed_vectors(model.model_path, model.kv_path)
+    print(Word2VecModel(args.model, args.output).warm_up())
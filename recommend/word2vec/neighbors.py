@@ -0,0 +1,221 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from .ann import normalize_rows
+
+
+def _merge_topk(ids: np.ndarray, scores: np.ndarray, topn: int) -> tuple:
+    """(Q, M) 후보에서 행마다 점수가 높은 순서로 정렬된 상위 topn개를 고릅니다."""
+    if scores.shape[1] > topn:
+        part = np.argpartition(-scores, topn - 1, axis=1)[:, :topn]
+        ids = np.take_along_axis(ids, part, axis=1)
+        scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-scores, axis=1)
+
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def blocked_topk(vectors: np.ndarray, queries: np.ndarray, topn: int, block_size: int = 65536,
+                 query_offset: Optional[int] = None, exclude_mask: Optional[np.ndarray] = None,
+                 row_scales: Optional[np.ndarray] = None) -> tuple:
+    """질의 벡터마다 vectors에서 내적이 가장 큰 topn개의 id와 점수를 찾습니다.
+    vectors를 block_size 행씩 나누어 곱하고 블록마다 상위 topn개만 남기므로
+    임시 배열은 (질의 수, block_size) 크기를 넘지 않습니다.
+
+    :param vectors: (N, D) 정규화된 단어 벡터
+    :param queries: (Q, D) 정규화된 질의 벡터
+    :param topn: 찾을 단어 수
+    :param block_size: 한 번에 곱할 단어 수
+    :param query_offset: 질의가 vectors[query_offset:query_offset + Q]이면 자기 자신을 결과에서 제외
+    :param exclude_mask: (N,) 결과에서 제외할 단어 mask
+    :param row_scales: (N,) 단어별로 점수에 곱할 값 (정규화되지 않은 벡터의 1/norm, int8 벡터의 scale 등)
+    :return: ((Q, topn) 단어 id 배열, (Q, topn) 점수 배열) 튜플
+    """
+    n_queries = queries.shape[0]
+    best_ids = np.empty((n_queries, 0), dtype=np.int64)
+    best_scores = np.empty((n_queries, 0), dtype=np.float32)
+
+    for start in range(0, vectors.shape[0], block_size):
+        block = np.asarray(vectors[start:start + block_size], dtype=np.float32)
+        scores = queries @ block.T
+        if row_scales is not None:
+            scores *= row_scales[start:start + block.shape[0]]
+
+        if query_offset is not None:
+            rows = np.arange(n_queries)
+            cols = rows + query_offset - start
+            inside = (cols >= 0) & (cols < block.shape[0])
+            scores[rows[inside], cols[inside]] = -np.inf
+        if exclude_mask is not None:
+            scores[:, exclude_mask[start:start + block.shape[0]]] = -np.inf
+
+        k = min(topn, block.shape[0])
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        block_scores = np.take_along_axis(scores, part, axis=1)
+
+        best_ids, best_scores = _merge_topk(
+            np.concatenate([best_ids, part + start], axis=1),
+            np.concatenate([best_scores, block_scores], axis=1),
+            topn
+        )
+
+    return best_ids, best_scores
+
+
+def build_neighbor_table(vectors: np.ndarray, path: str, topn: int = 50, limit: Optional[int] = None,
+                         query_block_size: int = 1024, block_size: int = 65536,
+                         n_jobs: Optional[int] = None) -> dict:
+    """모든 단어(또는 빈도 상위 limit개 단어)의 상위 topn 이웃 id와 점수를 계산해서 저장합니다.
+    질의 단어를 query_block_size개씩 나누어 여러 thread에서 행렬 곱으로 계산하고,
+    결과는 mmap으로 바로 불러올 수 있는 .npy 파일로 씁니다.
+
+    :param vectors: (N, D) 단어 벡터 (gensim 단어 사전 순서, 빈도 내림차순)
+    :param path: 저장할 디렉터리 경로
+    :param topn: 단어당 저장할 이웃 수
+    :param limit: 이웃을 계산할 단어 수 (기본값: 전체)
+    :param query_block_size: 한 번에 계산할 질의 단어 수
+    :param block_size: 한 번에 곱할 단어 수
+    :param n_jobs: 사용할 thread 수 (기본값: CPU 코어 수)
+    :return: 생성 정보를 포함한 딕셔너리 (meta.json과 동일)
+    """
+    start_time = time.perf_counter()
+    normalized = normalize_rows(vectors)
+    size = min(limit, normalized.shape[0]) if limit else normalized.shape[0]
+    topn = min(topn, normalized.shape[0] - 1)
+
+    os.makedirs(path, exist_ok=True)
+    ids = np.lib.format.open_memmap(os.path.join(path, 'ids.npy'), mode='w+', dtype=np.int32, shape=(size, topn))
+    scores = np.lib.format.open_memmap(os.path.join(path, 'scores.npy'), mode='w+', dtype=np.float32, shape=(size, topn))
+
+    def compute(start: int):
+        end = min(start + query_block_size, size)
+        block_ids, block_scores = blocked_topk(normalized, normalized[start:end], topn, block_size, query_offset=start)
+        ids[start:end] = block_ids
+        scores[start:end] = block_scores
+
+    with ThreadPoolExecutor(max_workers=n_jobs if n_jobs else os.cpu_count()) as executor:
+        list(executor.map(compute, range(0, size, query_block_size)))
+
+    ids.flush()
+    scores.flush()
+
+    meta = {
+        'size': size,
+        'vocab_size': int(normalized.shape[0]),
+        'topn': topn,
+        'build_time': time.perf_counter() - start_time,
+        'bytes': int(ids.nbytes + scores.nbytes)
+    }
+    with open(os.path.join(path, 'meta.json'), 'w') as meta_file:
+        json.dump(meta, meta_file)
+
+    return meta
+
+
+class NeighborTable:
+    """build_neighbor_table로 미리 계산한 단어별 상위 이웃 표입니다.
+    mmap으로 불러오기 때문에 조회는 배열의 한 행을 읽는 O(1) 연산입니다.
+    빈도 상위 size개의 단어만 표에 있을 수 있으므로, 표에 없는 단어는 호출자가 직접 검색해야 합니다.
+    """
+
+    def __init__(self, ids: np.ndarray, scores: np.ndarray, vocab_size: int):
+        self.ids = ids
+        self.scores = scores
+        self.vocab_size = vocab_size
+
+    @property
+    def size(self) -> int:
+        return self.ids.shape[0]
+
+    @property
+    def topn(self) -> int:
+        return self.ids.shape[1]
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'NeighborTable':
+        with open(os.path.join(path, 'meta.json')) as meta:
+            vocab_size = json.load(meta)['vocab_size']
+
+        return cls(
+            np.load(os.path.join(path, 'ids.npy'), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, 'scores.npy'), mmap_mode=mmap_mode),
+            vocab_size
+        )
+
+    def covers(self, index: int, topn: int) -> bool:
+        return index < self.size and topn <= self.topn
+
+    def lookup(self, index: int, topn: int) -> tuple:
+        """단어 id의 상위 topn 이웃을 조회합니다.
+
+        :param index: 단어 id
+        :param topn: 조회할 이웃 수
+        :return: (단어 id 배열, 코사인 유사도 배열) 튜플
+        """
+        return self.ids[index, :topn], self.scores[index, :topn]
+
+
+def benchmark(wv, table: NeighborTable, queries: int = 200, topn: int = 50, seed: int = 0) -> dict:
+    """이웃 표 조회와 KeyedVectors.most_similar의 검색 시간과 결과 일치율을 비교합니다.
+
+    :param wv: 비교할 KeyedVectors
+    :param table: 비교할 이웃 표
+    :param queries: 질의 단어 수
+    :param topn: 비교할 이웃 수
+    :param seed: 질의 단어를 고르는 난수 시드
+    :return: 측정 결과를 포함한 딕셔너리
+    """
+    rng = np.random.default_rng(seed)
+    query_ids = rng.choice(table.size, size=min(queries, table.size), replace=False)
+
+    live, lookup, overlap = [], [], 0
+    for query_id in query_ids:
+        start = time.perf_counter()
+        expected = wv.most_similar(wv.index_to_key[query_id], topn=topn)
+        live.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ids, _ = table.lookup(int(query_id), topn)
+        lookup.append(time.perf_counter() - start)
+
+        overlap += len({wv.key_to_index[key] for key, _ in expected}.intersection(ids.tolist()))
+
+    return {
+        'size': table.size,
+        'topn': table.topn,
+        'bytes': int(table.ids.nbytes + table.scores.nbytes),
+        'overlap': overlap / max(1, len(query_ids) * topn),
+        'most_similar_p50_ms': float(np.percentile(live, 50) * 1000),
+        'most_similar_p99_ms': float(np.percentile(live, 99) * 1000),
+        'lookup_p50_ms': float(np.percentile(lookup, 50) * 1000),
+        'lookup_p99_ms': float(np.percentile(lookup, 99) * 1000)
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from .model import Word2VecModel
+
+    parser = argparse.ArgumentParser(description='Word2Vec 단어별 상위 이웃 표를 생성하거나 벤치마크합니다.')
+    parser.add_argument('command', choices=['build', 'bench'])
+    parser.add_argument('--model', default='./recommend/w2v_model/w2v_sg.model')
+    parser.add_argument('--output', default=None, help='이웃 표 디렉터리 (기본값: 모델 경로 옆의 .neighbors)')
+    parser.add_argument('--topn', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=None, help='이웃을 계산할 빈도 상위 단어 수')
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    model = Word2VecModel(args.model, neighbors_path=args.output)
+
+    if args.command == 'build':
+        print(json.dumps(build_neighbor_table(model.wv.vectors, model.neighbors_path, args.topn, args.limit,
+                                              n_jobs=args.jobs)))
+    else:
+        print(json.dumps(benchmark(model.wv, NeighborTable.load(model.neighbors_path), args.queries, args.topn)))
@@ -0,0 +1,170 @@
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from .model import Word2VecModel
+
+# worker 프로세스마다 모델 경로별로 불러온 모델 (모델 교체 직후에는 이전 버전과 새 버전이 함께 있을 수 있다.)
+_worker_models = {}
+_worker_model_kwargs = {}
+
+# worker 프로세스마다 보관하는 최대 모델 수
+MAX_WORKER_MODELS = 2
+
+
+class PoolOverloadedError(RuntimeError):
+    """대기 중인 계산이 max_pending개를 넘어서 요청을 거절할 때 발생하는 예외입니다."""
+    pass
+
+
+def _worker_model(model_path: str) -> Word2VecModel:
+    model = _worker_models.get(model_path)
+    if model is None:
+        model = Word2VecModel(model_path, **_worker_model_kwargs)
+        model.warm_up()
+        _worker_models[model_path] = model
+        while len(_worker_models) > MAX_WORKER_MODELS:
+            del _worker_models[next(iter(_worker_models))]
+
+    return model
+
+
+def _init_worker(model_path: str, model_kwargs: dict):
+    _worker_model_kwargs.update(model_kwargs)
+    _worker_model(model_path)
+
+
+def _most_similar_ids(model_path: str, keyword: str, topn: int) -> tuple:
+    started_at = time.time()
+    result = _worker_model(model_path).most_similar_ids(keyword, topn)
+
+    return result, started_at, time.time()
+
+
+def _percentiles(samples: deque) -> dict:
+    if not samples:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+
+    p50, p95, p99 = np.percentile(np.array(samples), [50, 95, 99]) * 1000
+
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99)}
+
+
+class SimilarityPool:
+    """유사 단어 검색을 별도의 worker 프로세스에서 실행합니다.
+    검색 계산이 GIL을 오래 잡아 같은 Flask worker의 다른 요청 thread가 멈추는 것을 막습니다.
+
+    - worker는 Word2VecModel로 같은 벡터 파일을 읽기 전용 mmap으로 열기 때문에 프로세스마다 복사본이 생기지 않습니다.
+    - 작업은 모델 경로와 함께 전달하므로 ModelRegistry로 모델이 교체되면 worker도 새 경로의 모델을 사용합니다.
+    - 처리 중이거나 대기 중인 작업이 max_pending개를 넘으면 기다리지 않고 PoolOverloadedError를 발생시킵니다.
+    - 작업마다 대기 시간(제출 ~ worker 시작)과 계산 시간(worker 시작 ~ 종료)을 기록합니다.
+
+    worker는 spawn으로 만들기 때문에 실행한 스크립트(__main__)를 다시 import합니다.
+    그러므로 실행한 스크립트가 __mp_main__으로 import될 때는 앱(과 이 pool)을 만들지 않아야 합니다. (app.py 끝 참고)
+    """
+
+    def __init__(self, model_path: str, max_workers: int = 2, max_pending: Optional[int] = None,
+                 model_kwargs: Optional[dict] = None, window: int = 1024):
+        """
+        :param model_path: worker가 미리 불러올 모델 경로
+        :param max_workers: worker 프로세스 수
+        :param max_pending: 처리 중이거나 대기 중인 최대 작업 수 (기본값: max_workers * 4)
+        :param model_kwargs: Word2VecModel 생성 인자 (n_probe, quantized 등)
+        :param window: 지연 시간 통계를 계산할 최근 작업 수
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending if max_pending else max_workers * 4
+
+        # Flask worker의 thread와 lock 상태를 물려받지 않도록 fork 대신 spawn으로 worker를 만든다.
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(model_path, model_kwargs or {})
+        )
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._queue_wait = deque(maxlen=window)
+        self._compute = deque(maxlen=window)
+
+        self.submitted = 0
+        self.completed = 0
+        self.shed = 0
+        self.errors = 0
+
+    def most_similar_ids(self, model_path: str, keyword: str, topn: int = 50, timeout: Optional[float] = None) -> tuple:
+        """worker 프로세스에서 keyword와 가장 유사한 단어의 id와 유사도를 찾습니다.
+        대기 중인 작업이 너무 많으면 'PoolOverloadedError' 예외가 발생합니다.
+
+        :param model_path: 사용할 모델 경로
+        :param keyword: 검색할 단어
+        :param topn: 찾을 단어 수
+        :param timeout: 결과를 기다릴 최대 시간 (초)
+        :return: (단어 id 배열, 유사도 배열) 튜플 (Word2VecModel.most_similar_ids 참고)
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.shed += 1
+            raise PoolOverloadedError('similarity pool is overloaded')
+
+        with self._lock:
+            self.submitted += 1
+
+        submitted_at = time.time()
+        try:
+            future = self._executor.submit(_most_similar_ids, model_path, keyword, topn)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result, started_at, finished_at = future.result(timeout=timeout)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+            self._queue_wait.append(max(0.0, started_at - submitted_at))
+            self._compute.append(finished_at - started_at)
+
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """작업 처리 정보를 조회합니다.
+
+        :return: 작업 처리 정보를 포함한 딕셔너리:
+            {
+                'workers': int,         # worker 프로세스 수
+                'max_pending': int,     # 처리 중이거나 대기 중인 최대 작업 수
+                'submitted': int,       # 제출한 작업 수
+                'completed': int,       # 완료한 작업 수
+                'shed': int,            # 대기 작업이 많아 거절한 요청 수
+                'errors': int,          # 실패한 작업 수
+                'queue_wait': dict,     # 최근 작업의 대기 시간 (p50_ms, p95_ms, p99_ms)
+                'compute': dict         # 최근 작업의 계산 시간 (p50_ms, p95_ms, p99_ms)
+            }
+        """
+        with self._lock:
+            queue_wait, compute = deque(self._queue_wait), deque(self._compute)
+
+        return {
+            'workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'shed': self.shed,
+            'errors': self.errors,
+            'queue_wait': _percentiles(queue_wait),
+            'compute': _percentiles(compute)
+        }
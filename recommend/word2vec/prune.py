@@ -0,0 +1,181 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+import numpy as np
+from gensim.models import KeyedVectors
+
+from .model import Word2VecModel, _resident_size
+
+
+def prune_keyed_vectors(wv: KeyedVectors, top_n: int, allow_list: Iterable[str] = ()) -> KeyedVectors:
+    """빈도 상위 top_n개 단어와 allow_list에 있는 단어만 남긴 KeyedVectors를 만듭니다.
+    남은 단어는 원래 순서(빈도 내림차순)를 유지하므로 빈도 상위 단어를 기준으로 하는 이웃 표 등을 그대로 만들 수 있습니다.
+
+    :param wv: 원본 KeyedVectors
+    :param top_n: 남길 빈도 상위 단어 수
+    :param allow_list: 빈도와 관계없이 남길 단어 (단어 사전에 없는 단어는 무시)
+    :return: 줄인 KeyedVectors
+    """
+    keep = np.zeros(len(wv.index_to_key), dtype=bool)
+    keep[:top_n] = True
+    for keyword in allow_list:
+        index = wv.key_to_index.get(keyword)
+        if index is not None:
+            keep[index] = True
+    indices = np.flatnonzero(keep)
+
+    pruned = KeyedVectors(wv.vector_size, dtype=wv.vectors.dtype)
+    pruned.index_to_key = [wv.index_to_key[i] for i in indices]
+    pruned.key_to_index = {key: i for i, key in enumerate(pruned.index_to_key)}
+    pruned.vectors = np.array(wv.vectors[indices])
+    for attr, values in wv.expandos.items():
+        pruned.expandos[attr] = np.array(values[indices])
+
+    return pruned
+
+
+def prune_model(model_path: str, output_path: str, top_n: int, allow_list: Iterable[str] = ()) -> dict:
+    """모델의 단어 사전을 줄여서 mmap으로 불러올 수 있는 KeyedVectors(.kv)로 저장합니다.
+    저장한 경로를 W2V_MODEL_PATH(또는 /recommend/admin/model/reload 의 modelPath)로 지정하면 바로 사용할 수 있습니다.
+
+    :param model_path: 원본 모델 경로 (.model 또는 .kv)
+    :param output_path: 저장할 KeyedVectors 경로 (.kv)
+    :param top_n: 남길 빈도 상위 단어 수
+    :param allow_list: 빈도와 관계없이 남길 단어
+    :return: 원본과 결과의 단어 수를 포함한 딕셔너리
+    """
+    allow_list = set(allow_list)
+    wv = Word2VecModel(model_path).wv
+    pruned = prune_keyed_vectors(wv, top_n, allow_list)
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    pruned.save(output_path, sep_limit=0)
+
+    return {
+        'path': output_path,
+        'vocab_size': len(wv.index_to_key),
+        'pruned_vocab_size': len(pruned.index_to_key),
+        'allow_list_size': len(allow_list),
+        'allow_list_in_vocab': sum(1 for keyword in allow_list if keyword in pruned.key_to_index)
+    }
+
+
+def _file_size(path: str) -> int:
+    directory = os.path.dirname(path) or '.'
+    name = os.path.basename(path)
+
+    return sum(os.path.getsize(os.path.join(directory, file)) for file in os.listdir(directory) if file.startswith(name))
+
+
+def _measure_load(model_path: str) -> dict:
+    # 다른 모델이 올라와 있지 않은 새 프로세스에서 실행해야 로딩 시간과 메모리를 따로 잴 수 있다.
+    before = _resident_size()
+    stats = Word2VecModel(model_path).warm_up()
+
+    return {
+        'load_time': stats['load_time'],
+        'vocab_size': stats['vocab_size'],
+        'vectors_bytes': stats['vectors_bytes'],
+        'resident_delta': stats['resident_size'] - before
+    }
+
+
+def compare_models(original_path: str, pruned_path: str, queries: Optional[list] = None, n_queries: int = 200,
+                   topn: int = 50, seed: int = 0) -> dict:
+    """원본 모델과 줄인 모델의 로딩 시간, 메모리, 추천 결과 일치율을 비교합니다.
+    로딩 시간과 메모리는 모델마다 새 프로세스에서 측정합니다.
+
+    :param original_path: 원본 모델 경로
+    :param pruned_path: 줄인 모델 경로
+    :param queries: 비교할 질의 단어 (기본값: 줄인 모델에서 n_queries개를 무작위로 선택)
+    :param n_queries: 무작위로 선택할 질의 단어 수
+    :param topn: 비교할 추천 단어 수
+    :param seed: 질의 단어를 고르는 난수 시드
+    :return: 비교 결과를 포함한 딕셔너리:
+        {
+            'original': dict,           # 원본 모델의 로딩 시간, 단어 수, 벡터 크기, 상주 메모리 증가량
+            'pruned': dict,             # 줄인 모델의 로딩 시간, 단어 수, 벡터 크기, 상주 메모리 증가량
+            'disk_bytes': dict,         # 모델 파일 크기 (original, pruned)
+            'queries': int,             # 비교한 질의 단어 수
+            'overlap': float,           # 원본 상위 topn과 줄인 모델 상위 topn이 겹치는 비율
+            'kept_overlap': float       # 원본 상위 topn 중 줄인 모델에 남은 단어만 기준으로 한 겹치는 비율
+        }
+    """
+    original_path = Word2VecModel(original_path).stats()['path']
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        original_stats = executor.submit(_measure_load, original_path).result()
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        pruned_stats = executor.submit(_measure_load, pruned_path).result()
+
+    original, pruned = Word2VecModel(original_path), Word2VecModel(pruned_path)
+
+    if queries is None:
+        rng = np.random.default_rng(seed)
+        vocab = pruned.wv.index_to_key
+        queries = [vocab[i] for i in rng.choice(len(vocab), size=min(n_queries, len(vocab)), replace=False)]
+    queries = [query for query in queries if query in pruned.wv.key_to_index]
+
+    overlap, kept_overlap = [], []
+    for query in queries:
+        expected = [word for word, _ in original.most_similar(query, topn)]
+        actual = {word for word, _ in pruned.most_similar(query, topn)}
+        kept = [word for word in expected if word in pruned.wv.key_to_index]
+
+        overlap.append(len(actual.intersection(expected)) / max(1, len(expected)))
+        kept_overlap.append(len(actual.intersection(kept)) / max(1, len(kept)))
+
+    return {
+        'original': original_stats,
+        'pruned': pruned_stats,
+        'disk_bytes': {'original': _file_size(original_path), 'pruned': _file_size(pruned_path)},
+        'queries': len(queries),
+        'overlap': float(np.mean(overlap)) if overlap else None,
+        'kept_overlap': float(np.mean(kept_overlap)) if kept_overlap else None
+    }
+
+
+def _load_allow_list(path: Optional[str], db_url: Optional[str]) -> list:
+    allow_list = []
+
+    if path:
+        with open(path, encoding='utf-8') as allow_file:
+            allow_list += [line.strip() for line in allow_file if line.strip()]
+
+    if db_url:
+        from sqlalchemy import create_engine
+        from models import PageDao
+
+        allow_list += PageDao(create_engine(db_url, encoding='utf-8')).find_distinct_keywords()
+
+    return allow_list
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Word2Vec 모델의 단어 사전을 빈도 상위 단어와 페이지 키워드만 남기도록 줄입니다.')
+    parser.add_argument('--model', default='./recommend/w2v_model/w2v_sg.model')
+    parser.add_argument('--output', default='./recommend/w2v_model/w2v_sg_pruned.kv')
+    parser.add_argument('--top-n', type=int, default=100000, help='남길 빈도 상위 단어 수')
+    parser.add_argument('--allow-list', default=None, help='남길 단어 목록 파일 (한 줄에 한 단어)')
+    parser.add_argument('--db-url', default=None, help='pages.keyword를 남길 단어로 추가할 DB 주소 (예: config.DB_URL)')
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    allow_list = _load_allow_list(args.allow_list, args.db_url)
+
+    start = time.perf_counter()
+    result = prune_model(args.model, args.output, args.top_n, allow_list)
+    result['prune_time'] = time.perf_counter() - start
+
+    # 사용자가 실제로 요청하는 페이지 키워드를 우선 비교하고, 없으면 무작위 단어로 비교한다.
+    result['report'] = compare_models(args.model, args.output, queries=allow_list[:args.queries] or None,
+                                      n_queries=args.queries)
+
+    print(json.dumps(result, ensure_ascii=False))
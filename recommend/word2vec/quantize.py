@@ -0,0 +1,192 @@
+import json
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+from .ann import normalize_rows
+
+QUANTIZED_DTYPES = ('float16', 'int8')
+
+
+class QuantizedVectors:
+    """정규화된 단어 벡터를 float16 또는 행 단위 scale을 가진 int8로 저장합니다.
+
+    - float16: 원소당 2byte (float32의 1/2)
+    - int8: 원소당 1byte + 행당 float32 scale 하나 (float32의 약 1/4)
+    유사도는 양자화된 배열을 block_size 행씩 float32로 바꿔가며 계산하므로
+    전체 float32 배열을 다시 만들지 않습니다.
+    """
+
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.data = data
+        self.scales = scales
+
+    @property
+    def dtype(self) -> str:
+        return 'int8' if self.scales is not None else 'float16'
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    @classmethod
+    def quantize(cls, vectors: np.ndarray, dtype: str = 'int8', block_size: int = 65536) -> 'QuantizedVectors':
+        """단어 벡터를 정규화한 후 양자화합니다.
+
+        :param vectors: (N, D) 단어 벡터
+        :param dtype: 'float16' 또는 'int8'
+        :param block_size: 한 번에 처리할 행 수
+        :return: 양자화된 벡터
+        """
+        if dtype not in QUANTIZED_DTYPES:
+            raise ValueError(f'unsupported dtype: {dtype}')
+
+        normalized = normalize_rows(vectors, block_size)
+        if dtype == 'float16':
+            return cls(normalized.astype(np.float16))
+
+        scales = np.abs(normalized).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        data = np.empty(normalized.shape, dtype=np.int8)
+        for start in range(0, normalized.shape[0], block_size):
+            block = normalized[start:start + block_size] / scales[start:start + block_size, None]
+            data[start:start + block_size] = np.clip(np.rint(block), -127, 127)
+
+        return cls(data, scales.astype(np.float32))
+
+    def get_vector(self, index: int) -> np.ndarray:
+        """단어 id의 벡터를 float32로 복원합니다.
+
+        :param index: 단어 id
+        :return: (D,) 벡터
+        """
+        vector = self.data[index].astype(np.float32)
+        return vector * self.scales[index] if self.scales is not None else vector
+
+    def get_vectors(self, ids: np.ndarray) -> np.ndarray:
+        """여러 단어 id의 벡터를 한 번에 float32로 복원합니다.
+
+        :param ids: (K,) 단어 id 배열
+        :return: (K, D) 벡터 배열
+        """
+        vectors = self.data[ids].astype(np.float32)
+        return vectors * self.scales[ids, None] if self.scales is not None else vectors
+
+    def similarity(self, query: np.ndarray, block_size: int = 65536) -> np.ndarray:
+        """질의 벡터와 모든 단어의 코사인 유사도를 계산합니다.
+
+        :param query: (D,) 질의 벡터
+        :param block_size: 한 번에 float32로 바꿀 행 수
+        :return: (N,) 유사도 배열
+        """
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        scores = np.empty(self.data.shape[0], dtype=np.float32)
+        for start in range(0, self.data.shape[0], block_size):
+            scores[start:start + block_size] = self.data[start:start + block_size].astype(np.float32) @ query
+        if self.scales is not None:
+            scores *= self.scales
+
+        return scores
+
+    def most_similar(self, query: np.ndarray, topn: int = 50, exclude: Optional[int] = None) -> tuple:
+        """질의 벡터와 가장 유사한 단어를 찾습니다.
+
+        :param query: (D,) 질의 벡터
+        :param topn: 찾을 단어 수
+        :param exclude: 결과에서 제외할 단어 id (질의 단어 자신)
+        :return: (단어 id 배열, 코사인 유사도 배열) 튜플
+        """
+        scores = self.similarity(query)
+        if exclude is not None:
+            scores[exclude] = -np.inf
+
+        topn = min(topn, scores.shape[0] - (1 if exclude is not None else 0))
+        best = np.argpartition(-scores, topn - 1)[:topn]
+        best = best[np.argsort(-scores[best])]
+
+        return best, scores[best]
+
+    def save(self, path: str) -> str:
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'vectors.npy'), self.data)
+        if self.scales is not None:
+            np.save(os.path.join(path, 'scales.npy'), self.scales)
+        with open(os.path.join(path, 'meta.json'), 'w') as meta:
+            json.dump({'dtype': self.dtype, 'size': len(self), 'vector_size': int(self.data.shape[1])}, meta)
+
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> 'QuantizedVectors':
+        scales_path = os.path.join(path, 'scales.npy')
+
+        return cls(
+            np.load(os.path.join(path, 'vectors.npy'), mmap_mode=mmap_mode),
+            np.load(scales_path) if os.path.exists(scales_path) else None
+        )
+
+
+def accuracy_report(wv, quantized: QuantizedVectors, queries: int = 200, topn: int = 50, seed: int = 0) -> dict:
+    """양자화된 벡터의 상위 topn 결과가 float32 모델의 most_similar와 얼마나 겹치는지 측정합니다.
+
+    :param wv: 비교할 float32 KeyedVectors
+    :param quantized: 비교할 양자화된 벡터
+    :param queries: 질의 단어 수
+    :param topn: 비교할 단어 수
+    :param seed: 질의 단어를 고르는 난수 시드
+    :return: 측정 결과를 포함한 딕셔너리
+    """
+    rng = np.random.default_rng(seed)
+    query_ids = rng.choice(len(quantized), size=min(queries, len(quantized)), replace=False)
+
+    overlaps, elapsed, reference = [], [], []
+    for query_id in query_ids:
+        start = time.perf_counter()
+        expected = wv.most_similar(wv.index_to_key[query_id], topn=topn)
+        reference.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ids, _ = quantized.most_similar(quantized.get_vector(int(query_id)), topn, exclude=int(query_id))
+        elapsed.append(time.perf_counter() - start)
+
+        overlaps.append(len({wv.key_to_index[key] for key, _ in expected}.intersection(ids.tolist())) / topn)
+
+    return {
+        'dtype': quantized.dtype,
+        'float32_bytes': int(wv.vectors.shape[0] * wv.vectors.shape[1] * 4),
+        'quantized_bytes': quantized.nbytes,
+        'overlap_mean': float(np.mean(overlaps)),
+        'overlap_min': float(np.min(overlaps)),
+        'float32_p50_ms': float(np.percentile(reference, 50) * 1000),
+        'quantized_p50_ms': float(np.percentile(elapsed, 50) * 1000)
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from .model import Word2VecModel
+
+    parser = argparse.ArgumentParser(description='Word2Vec 단어 벡터를 양자화하거나 정확도를 측정합니다.')
+    parser.add_argument('command', choices=['build', 'report'])
+    parser.add_argument('--model', default='./recommend/w2v_model/w2v_sg.model')
+    parser.add_argument('--dtype', choices=QUANTIZED_DTYPES, default='int8')
+    parser.add_argument('--output', default=None, help='양자화 벡터 디렉터리 (기본값: 모델 경로 옆의 .int8 / .float16)')
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    model = Word2VecModel(args.model, quantized=args.dtype, quantized_path=args.output)
+
+    if args.command == 'build':
+        built = QuantizedVectors.quantize(model.wv.vectors, args.dtype)
+        built.save(model.quantized_path)
+        print(json.dumps({'path': model.quantized_path, 'dtype': built.dtype, 'bytes': built.nbytes}))
+    else:
+        print(json.dumps(accuracy_report(model.wv, QuantizedVectors.load(model.quantized_path), args.queries)))
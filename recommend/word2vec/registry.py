@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from .model import Word2VecModel
+
+
+class ModelLoadingError(RuntimeError):
+    """이미 다른 모델 버전을 불러오는 중이거나 되돌릴 버전이 없을 때 발생하는 예외입니다."""
+    pass
+
+
+class ModelVersion:
+    """레지스트리에 등록된 모델 버전 하나입니다."""
+
+    def __init__(self, version: int, model: Word2VecModel):
+        self.version = version
+        self.model = model
+        self.activated_at = None
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> str:
+        """프로세스나 재시작과 관계없이 같은 모델 파일이면 같은 값 (경로와 수정 시각)
+        version은 프로세스마다 1부터 다시 세므로 DB 등 프로세스 밖에 저장할 때는 이 값을 사용한다.
+        """
+        if self._fingerprint is None:
+            path = self.model.stats()['path']
+            self._fingerprint = f'{path}@{int(os.path.getmtime(path))}'
+        return self._fingerprint
+
+    def to_dict(self) -> dict:
+        stats = self.model.stats()
+
+        return {
+            'version': self.version,
+            'path': stats['path'],
+            'loaded': stats['loaded'],
+            'load_time': stats['load_time'],
+            'vocab_size': stats['vocab_size'],
+            'activated_at': self.activated_at
+        }
+
+
+def validate_model(model: Word2VecModel, sample_size: int = 100) -> None:
+    """새 모델 버전을 사용할 수 있는지 검증합니다. 문제가 있으면 'ValueError' 예외가 발생합니다.
+
+    - 단어 사전이 비어 있지 않아야 합니다.
+    - 빈도 상위 sample_size개 단어의 벡터가 모두 유한한 값이어야 합니다.
+    - 유사 단어 검색이 결과를 반환해야 합니다.
+
+    :param model: 검증할 모델 (이미 불러온 상태)
+    :param sample_size: 검사할 단어 수
+    """
+    wv = model.wv
+    if len(wv.index_to_key) < 2:
+        raise ValueError('empty vocabulary')
+    if not np.all(np.isfinite(wv.vectors[:sample_size])):
+        raise ValueError('non-finite vectors')
+    if not model.most_similar(wv.index_to_key[0], topn=1):
+        raise ValueError('most_similar returned no result')
+
+
+class ModelRegistry:
+    """추천에 사용하는 Word2Vec 모델의 버전을 관리합니다.
+
+    새 버전은 백그라운드 thread에서 불러오고 워밍업, 검증까지 마친 후에 활성 버전과 교체하므로
+    교체 중에도 요청은 기존 버전으로 처리됩니다. 교체는 참조 하나를 바꾸는 것이므로
+    요청은 처리 시작 시 active를 한 번만 읽어서 끝까지 같은 버전을 사용해야 합니다.
+    직전 버전은 되돌릴 수 있도록 keep개까지 보관합니다.
+
+    모델 파일을 같은 경로에 덮어쓰면 이미 mmap으로 열려 있는 기존 버전이 깨질 수 있으므로,
+    새 버전은 다른 경로에 저장한 후 그 경로로 reload 해야 합니다.
+    """
+
+    def __init__(self, model: Word2VecModel, model_factory: Callable = Word2VecModel,
+                 validate: Callable = validate_model, keep: int = 2):
+        """
+        :param model: 처음 활성화할 모델 (불러오지 않은 상태여도 됨)
+        :param model_factory: 경로를 받아 새 모델을 만드는 함수 (예: n_probe, quantized 설정을 유지)
+        :param validate: 불러온 모델을 검증하는 함수
+        :param keep: 보관할 버전 수 (활성 버전 포함)
+        """
+        self.model_factory = model_factory
+        self.validate = validate
+        self.keep = max(1, keep)
+
+        self._lock = threading.Lock()
+        self._next_version = 1
+        self._versions = []
+        self._loading = None
+        self.last_error = None
+
+        self._activate(self._register(model))
+
+    @property
+    def current(self) -> ModelVersion:
+        """활성 버전 (버전 번호와 모델을 함께 읽어야 할 때 사용)"""
+        return self._versions[-1]
+
+    @property
+    def active(self) -> Word2VecModel:
+        return self._versions[-1].model
+
+    def _register(self, model: Word2VecModel) -> ModelVersion:
+        with self._lock:
+            version = ModelVersion(self._next_version, model)
+            self._next_version += 1
+
+        return version
+
+    def _activate(self, version: ModelVersion):
+        version.activated_at = time.time()
+        with self._lock:
+            # 리스트를 새로 만들어서 교체하므로 읽는 쪽은 lock 없이 항상 완전한 리스트를 본다.
+            self._versions = (self._versions + [version])[-self.keep:]
+
+    def reload(self, model_path: Optional[str] = None, background: bool = True) -> int:
+        """새 모델 버전을 불러와서 검증한 후 활성 버전과 교체합니다.
+        이미 다른 버전을 불러오는 중이면 'ModelLoadingError' 예외가 발생합니다.
+
+        :param model_path: 새 모델 경로 (기본값: 활성 버전의 모델 경로)
+        :param background: True이면 백그라운드 thread에서 불러오고 바로 반환
+        :return: 새 버전 번호
+        """
+        model_path = model_path if model_path else self.active.model_path
+
+        with self._lock:
+            if self._loading is not None:
+                raise ModelLoadingError('another model version is loading')
+            # 모델 객체는 만들기만 하고 실제로 불러오는 것은 load()에서 한다.
+            self._loading = ModelVersion(self._next_version, self.model_factory(model_path))
+            self._next_version += 1
+            version = self._loading
+
+        def load():
+            try:
+                version.model.warm_up()
+                self.validate(version.model)
+                self._activate(version)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f'version {version.version}: {e!r}'
+                if not background:
+                    raise
+            finally:
+                with self._lock:
+                    self._loading = None
+
+        if background:
+            threading.Thread(target=load, name=f'model-registry-{version.version}', daemon=True).start()
+        else:
+            load()
+
+        return version.version
+
+    def rollback(self) -> int:
+        """활성 버전을 버리고 직전 버전을 다시 활성화합니다.
+        되돌릴 버전이 없으면 'ModelLoadingError' 예외가 발생합니다.
+
+        :return: 다시 활성화된 버전 번호
+        """
+        with self._lock:
+            if len(self._versions) < 2:
+                raise ModelLoadingError('no previous model version')
+            self._versions = self._versions[:-1]
+            self._versions[-1].activated_at = time.time()
+
+            return self._versions[-1].version
+
+    def stats(self) -> dict:
+        """모델 버전 정보를 조회합니다.
+
+        :return: 모델 버전 정보를 포함한 딕셔너리:
+            {
+                'active': dict,         # 활성 버전 정보 (version, path, loaded, load_time, vocab_size, activated_at)
+                'previous': list,       # 되돌릴 수 있는 이전 버전 정보 리스트 (최신순)
+                'loading': int,         # 불러오는 중인 버전 번호 (없으면 None)
+                'last_error': str       # 마지막으로 실패한 버전과 오류 (없으면 None)
+            }
+        """
+        versions = self._versions
+        loading = self._loading
+
+        return {
+            'active': versions[-1].to_dict(),
+            'previous': [version.to_dict() for version in reversed(versions[:-1])],
+            'loading': loading.version if loading is not None else None,
+            'last_error': self.last_error
+        }
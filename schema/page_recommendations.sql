@@ -0,0 +1,13 @@
+-- 페이지 키워드별로 미리 계산한 추천 후보를 저장하는 테이블 (models/recommendation_dao.py)
+-- google trends 후보('trend')는 RECOMMEND_STORE_TTL초 동안, Word2Vec 후보('association')는 같은 모델 파일인 동안 사용한다.
+
+CREATE TABLE IF NOT EXISTS page_recommendations (
+    page_id INT NOT NULL,
+    source VARCHAR(20) NOT NULL,            -- 'trend' 또는 'association'
+    keyword VARCHAR(255) NOT NULL,          -- 후보를 계산한 페이지 키워드
+    model_version VARCHAR(512) NULL,        -- 후보를 계산한 모델 (association)
+    candidates JSON NOT NULL,               -- 추천 후보
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (page_id, source),
+    FOREIGN KEY (page_id) REFERENCES pages(id) ON DELETE CASCADE
+);
@@ -1,3 +1,5 @@
+from .event_bus import EventBus
+from .authorization_cache import AuthorizationCache
 from .jwt_service import JWTService
 from .auth_service import AuthService
 from .user_service import UserService
@@ -8,6 +10,8 @@ from .tag_service import TagService
 from .recommend_service import RecommendService
 
 __all__ = [
+    "EventBus",
+    "AuthorizationCache",
     "JWTService",
     "AuthService",
     "UserService",
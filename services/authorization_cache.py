@@ -0,0 +1,198 @@
+from typing import Optional
+
+from cache import LRUCache
+from .event_bus import NOTE_CREATED, NOTE_UPDATED, NOTE_DELETED, PAGE_CREATED, PAGE_DELETED
+
+
+def _key(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class AuthorizationCache:
+    """confirm_auth 데코레이터가 사용하는 권한 정보를 캐시합니다.
+        - 페이지 id -> 노트 id
+        - 노트 id -> 소유주(사용자) id
+        - 노트 id -> 공유 권한
+    노트의 소유주와 페이지가 속한 노트는 바뀌지 않으므로 삭제 이벤트로만 지우고,
+    공유 권한은 노트 수정 이벤트로 갱신합니다. 이벤트는 같은 프로세스에서만 전달되므로
+    다른 프로세스에서 바꾼 공유 권한은 ttl이 지나야 반영됩니다.
+    존재하지 않는 페이지, 노트(-1)는 캐시하지 않습니다.
+    """
+
+    def __init__(self, note_dao, page_dao, event_bus, max_size: int = 100000, ttl: Optional[float] = 60):
+        self.note_dao = note_dao
+        self.page_dao = page_dao
+
+        self._page_note = LRUCache(max_size)
+        self._note_owner = LRUCache(max_size)
+        self._note_permission = LRUCache(max_size, ttl)
+
+        event_bus.subscribe(NOTE_CREATED, self._on_note_created)
+        event_bus.subscribe(NOTE_UPDATED, self._on_note_updated)
+        event_bus.subscribe(NOTE_DELETED, self._on_note_deleted)
+        event_bus.subscribe(PAGE_CREATED, self._on_page_created)
+        event_bus.subscribe(PAGE_DELETED, self._on_page_deleted)
+
+    def _on_note_created(self, note_id: int, user_id: int, shared_permission: int = None, **payload):
+        self._note_owner.set(_key(note_id), user_id)
+        if shared_permission is not None:
+            self._note_permission.set(_key(note_id), shared_permission)
+
+    def _on_note_updated(self, note_id: int, shared_permission: int = None, **payload):
+        if shared_permission is not None:
+            self._note_permission.set(_key(note_id), shared_permission)
+        else:
+            self._note_permission.delete(_key(note_id))
+
+    def _on_note_deleted(self, note_id: int, **payload):
+        # 삭제된 노트의 페이지(page_note)는 남아 있어도 note_owner에서 -1(존재하지 않음)이 된다.
+        self._note_permission.delete(_key(note_id))
+        self._note_owner.delete(_key(note_id))
+
+    def _on_page_created(self, page_id: int, note_id: int = None, **payload):
+        if note_id is not None:
+            self._page_note.set(_key(page_id), _key(note_id))
+
+    def _on_page_deleted(self, page_id: int, **payload):
+        self._page_note.delete(_key(page_id))
+
+    def note_owner(self, note_id) -> int:
+        """노트의 소유주(사용자) id를 조회합니다. 노트가 없으면 -1을 반환합니다.
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+        """
+        note_id = _key(note_id)
+        if note_id is None:
+            return -1
+
+        user_id = self._note_owner.get(note_id)
+        if user_id is None:
+            user_id = self.note_dao.find_user_id_by_note_id(note_id)
+            if user_id != -1:
+                self._note_owner.set(note_id, user_id)
+
+        return user_id
+
+    def note_permission(self, note_id) -> int:
+        """노트의 공유 권한을 조회합니다. 노트가 없으면 -1을 반환합니다.
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+        """
+        note_id = _key(note_id)
+        if note_id is None:
+            return -1
+
+        permission = self._note_permission.get(note_id)
+        if permission is None:
+            permission = self.note_dao.find_shared_permission_by_note_id(note_id)
+            if permission != -1:
+                self._note_permission.set(note_id, permission)
+
+        return permission
+
+    def page_note(self, page_id) -> int:
+        """페이지가 속한 노트 id를 조회합니다. 페이지가 없으면 -1을 반환합니다.
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+        """
+        page_id = _key(page_id)
+        if page_id is None:
+            return -1
+
+        note_id = self._page_note.get(page_id)
+        if note_id is None:
+            # 노트 id와 소유주를 한 번에 조회해서 두 캐시를 함께 채운다.
+            row = self.page_dao.find_note_id_and_owner_id_by_page_id(page_id)
+            if row is None:
+                return -1
+
+            note_id = row['note_id']
+            self._page_note.set(page_id, note_id)
+            self._note_owner.set(note_id, row['user_id'])
+
+        return note_id
+
+    def page_notes(self, page_ids) -> dict:
+        """여러 페이지가 속한 노트 id와 소유주(사용자) id를 조회합니다.
+        캐시에 없는 페이지만 하나의 쿼리로 조회합니다.
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param page_ids: 조회할 페이지 id
+        :return: 페이지 id를 key로 하는 딕셔너리 (존재하지 않는 페이지는 포함하지 않음):
+            {
+                page_id: {
+                    'note_id': int,     # 노트 id
+                    'owner_id': int     # 노트 소유주(사용자) id
+                }
+            }
+        """
+        found, missing = {}, []
+        for page_id in {_key(page_id) for page_id in page_ids} - {None}:
+            note_id = self._page_note.get(page_id)
+            owner_id = self._note_owner.get(note_id) if note_id is not None else None
+            if owner_id is None:
+                missing.append(page_id)
+            else:
+                found[page_id] = {'note_id': note_id, 'owner_id': owner_id}
+
+        for page_id, row in self.page_dao.find_note_id_and_owner_id_by_page_ids(missing).items():
+            self._page_note.set(page_id, row['note_id'])
+            self._note_owner.set(row['note_id'], row['user_id'])
+            found[page_id] = {'note_id': row['note_id'], 'owner_id': row['user_id']}
+
+        return found
+
+    def page_owner(self, page_id) -> int:
+        """페이지가 속한 노트의 소유주(사용자) id를 조회합니다. 페이지가 없으면 -1을 반환합니다.
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+        """
+        note_id = self.page_note(page_id)
+        return self.note_owner(note_id) if note_id != -1 else -1
+
+    def _remember_access(self, note_id: int, access: Optional[dict]):
+        if access is not None and access['owner_id'] != -1:
+            self._note_owner.set(note_id, access['owner_id'])
+            self._note_permission.set(note_id, access['shared_permission'])
+
+    def note_access(self, note_id, user_id: int) -> Optional[dict]:
+        """사용자의 존재 여부와 노트의 권한 정보를 하나의 쿼리로 조회하고 캐시를 채웁니다.
+        (로그인 확인에서 사용자 캐시가 없을 때 사용)
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :return: 사용자가 존재하지 않으면 None, 존재하면 NoteDao.find_note_access 참고
+        """
+        access = self.note_dao.find_note_access(_key(note_id), user_id)
+        self._remember_access(access['note_id'] if access else None, access)
+
+        return access
+
+    def page_access(self, page_id, user_id: int) -> Optional[dict]:
+        """사용자의 존재 여부와 페이지가 속한 노트의 권한 정보를 하나의 쿼리로 조회하고 캐시를 채웁니다.
+        (로그인 확인에서 사용자 캐시가 없을 때 사용)
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :return: 사용자가 존재하지 않으면 None, 존재하면 PageDao.find_page_access 참고
+        """
+        page_id = _key(page_id)
+        access = self.page_dao.find_page_access(page_id, user_id)
+        if access is not None and access['note_id'] != -1:
+            self._page_note.set(page_id, access['note_id'])
+            self._remember_access(access['note_id'], access)
+
+        return access
+
+    def stats(self) -> dict:
+        """권한 캐시 사용 정보를 조회합니다.
+
+        :return: 권한 캐시 사용 정보를 포함한 딕셔너리 (각 항목은 LRUCache.stats 참고):
+            {
+                'page_note': dict,          # 페이지 id -> 노트 id
+                'note_owner': dict,         # 노트 id -> 소유주 id
+                'note_permission': dict     # 노트 id -> 공유 권한
+            }
+        """
+        return {
+            'page_note': self._page_note.stats(),
+            'note_owner': self._note_owner.stats(),
+            'note_permission': self._note_permission.stats()
+        }
@@ -0,0 +1,71 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable
+
+# 이벤트 이름
+NOTE_CREATED = 'note.created'
+NOTE_UPDATED = 'note.updated'
+NOTE_DELETED = 'note.deleted'
+PAGE_CREATED = 'page.created'
+PAGE_UPDATED = 'page.updated'
+PAGE_DELETED = 'page.deleted'
+LINK_CREATED = 'link.created'
+LINK_DELETED = 'link.deleted'
+USER_UPDATED = 'user.updated'
+USER_DELETED = 'user.deleted'
+
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """서비스 간에 데이터 변경 이벤트를 전달합니다.
+    이벤트를 발행한 thread에서 구독한 함수를 순서대로 호출하며,
+    구독한 함수에서 예외가 발생해도 발행한 쪽(데이터 변경)은 실패하지 않습니다.
+    """
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+        self._lock = threading.Lock()
+        self.published = 0
+        self.errors = 0
+
+    def subscribe(self, event: str, handler: Callable):
+        """이벤트를 구독합니다.
+
+        :param event: 이벤트 이름
+        :param handler: 이벤트 정보를 keyword 인자로 받는 함수
+        """
+        with self._lock:
+            self._handlers[event].append(handler)
+
+    def publish(self, event: str, **payload):
+        """이벤트를 발행합니다.
+
+        :param event: 이벤트 이름
+        :param payload: 이벤트 정보 (page_id, note_id 등)
+        """
+        with self._lock:
+            handlers = list(self._handlers[event])
+        self.published += 1
+
+        for handler in handlers:
+            try:
+                handler(**payload)
+            except Exception as e:
+                self.errors += 1
+                logger.warning('[event] %s 처리 실패: %s', event, e)
+
+    def stats(self) -> dict:
+        """이벤트 발행 정보를 조회합니다.
+
+        :return: 이벤트 발행 정보를 포함한 딕셔너리:
+            {
+                'published': int,   # 발행한 이벤트 수
+                'errors': int       # 구독한 함수에서 발생한 예외 수
+            }
+        """
+        return {
+            'published': self.published,
+            'errors': self.errors
+        }
@@ -1,20 +1,91 @@
 from flask import request, Response, g
 from functools import wraps
+from typing import Optional
 from datetime import datetime, timedelta
+import hmac
 import jwt
 import json
 
-from data import response_from_message, ResponseText, JwtMessage, UserMessage
+from cache import LRUCache
+from data import response_from_message, ResponseText, JwtMessage, UserMessage, AuthMessage
+from .event_bus import USER_UPDATED, USER_DELETED
 
 class JWTService:
-    def __init__(self, user_dao, config):
+    def __init__(self, user_dao, config, event_bus):
         self.user_dao = user_dao
         self.config = config
 
+        # 존재가 확인된 사용자 id를 AUTH_USER_CACHE_TTL초 동안 캐시해서 요청마다 users를 조회하지 않는다.
+        # 탈퇴는 users 행 삭제로 모든 프로세스가 공유하므로, 다른 worker에서 탈퇴한 사용자의 토큰도
+        # 캐시가 만료되는 AUTH_USER_CACHE_TTL초 안에 거절된다. (0이면 캐시하지 않고 요청마다 조회)
+        self.user_cache_ttl = config.get('AUTH_USER_CACHE_TTL', 5)
+        self.user_cache = LRUCache(config.get('AUTH_USER_CACHE_SIZE', 10000), self.user_cache_ttl or None)
+        # 이 프로세스에서 탈퇴한 사용자 id (캐시 만료를 기다리지 않고 바로 거절한다.
+        # 이미 발급된 토큰이 만료될 때까지만 보관하면 된다.)
+        self.revoked_users = LRUCache(config.get('AUTH_REVOKED_USERS_SIZE', 100000), config.get('JWT_EXP_DELTA_SECONDS'))
+
+        self.user_checks = 0
+        self.revoked_rejections = 0
+
+        event_bus.subscribe(USER_UPDATED, self._on_user_updated)
+        event_bus.subscribe(USER_DELETED, self._on_user_deleted)
+
+    def _on_user_updated(self, user_id: int, **payload):
+        self.user_cache.delete(user_id)
+
+    def _on_user_deleted(self, user_id: int, **payload):
+        self.revoked_users.set(user_id, True)
+        self.user_cache.delete(user_id)
+
+    def cached_user_exists(self, user_id: int) -> Optional[bool]:
+        """users를 조회하지 않고 토큰의 사용자가 존재하는지 확인합니다.
+
+        :param user_id: 사용자 id
+        :return: 존재 여부 (True/False), 캐시만으로 알 수 없으면 None
+        """
+        if user_id in self.revoked_users:
+            self.revoked_rejections += 1
+            return False
+        if self.user_cache.get(user_id):
+            return True
+
+        return None
+
+    def confirm_user(self, user_id: int, exists: bool) -> bool:
+        """users를 조회한 결과(다른 쿼리와 함께 조회한 결과 포함)를 사용자 캐시에 반영합니다.
+
+        :param user_id: 사용자 id
+        :param exists: 존재 여부
+        :return: 존재 여부 (True/False)
+        """
+        self.user_checks += 1
+        if exists and self.user_cache_ttl:
+            self.user_cache.set(user_id, True)
+
+        return exists
+
+    def user_exists(self, user_id: int) -> bool:
+        """토큰의 사용자가 아직 존재하는지 확인합니다.
+        탈퇴한 사용자는 바로 거절하고, 캐시에 없을 때만 users를 조회합니다.
+        만약 에러가 발생하면 'RuntimeError' 예외가 발생합니다.
+
+        :param user_id: 사용자 id
+        :return: 존재 여부 (True/False)
+        """
+        exists = self.cached_user_exists(user_id)
+        if exists is None:
+            exists = self.confirm_user(user_id, self.user_dao.exists_user(user_id))
+
+        return exists
+
 
     # TODO: 이후 refresh-token도 추가할 것
     # 로그인 인증 데코레이터
+    # 바로 안쪽 데코레이터가 권한 확인 쿼리에서 사용자 존재 여부도 함께 확인하면(verifies_user)
+    # 캐시만 확인하고, 캐시로 알 수 없으면 g.user_verified = False로 넘겨서 DB 왕복을 한 번으로 줄인다.
     def login_required(self, f):
+        verifies_user = getattr(f, 'verifies_user', False)
+
         @wraps(f)
         def decorated_function(*args, **kwargs):
             access_token = request.headers.get('accessToken')
@@ -29,13 +100,15 @@ class JWTService:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, JwtMessage.FAIL_NOT_INVALID.value)), status=401)
 
                 try:
-                    if not self.user_dao.get_user_info(payload['user_id']):
+                    exists = self.cached_user_exists(payload['user_id']) if verifies_user else self.user_exists(payload['user_id'])
+                    if exists is False:
                         return Response(json.dumps(response_from_message(ResponseText.FAIL.value, UserMessage.FAIL_NOT_EMAIL.value)), status=401)
                 except:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, JwtMessage.ERROR.value)), status=500)
 
                 user_id = payload['user_id']
                 g.user_id = user_id
+                g.user_verified = exists is True
             else:
                 return Response(json.dumps(response_from_message(ResponseText.FAIL.value, JwtMessage.FAIL_NOT_EXISTS.value)), status=401)
 
@@ -43,6 +116,19 @@ class JWTService:
         return decorated_function
 
 
+    # 요청 헤더의 adminToken이 설정의 ADMIN_TOKEN과 같은지 확인하는 데코레이터 (설정이 없으면 항상 거절)
+    def admin_required(self, f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            admin_token = self.config.get('ADMIN_TOKEN')
+            request_token = request.headers.get('adminToken')
+
+            if not admin_token or not request_token or not hmac.compare_digest(admin_token, request_token):
+                return Response(json.dumps(response_from_message(ResponseText.FAIL.value, AuthMessage.FAIL_NOT_PERMISSION.value)), status=401)
+            return f(*args, **kwargs)
+        return decorated_function
+
+
     # access token 발급
     def generate_access_token(self, user_id: int) -> str:
         """ access token 생성
@@ -57,3 +143,21 @@ class JWTService:
         token = jwt.encode(payload, self.config['JWT_SECRET_KEY'], 'HS256')
 
         return token
+
+    def stats(self) -> dict:
+        """인증 캐시 사용 정보를 조회합니다.
+
+        :return: 인증 캐시 사용 정보를 포함한 딕셔너리:
+            {
+                'user_cache_ttl': float,    # 사용자 캐시 유지 시간 (초, 다른 프로세스의 탈퇴가 반영되는 최대 시간)
+                'user_checks': int,         # users를 조회한 횟수
+                'revoked_rejections': int,  # 탈퇴한 사용자의 토큰을 거절한 횟수
+                'user_cache': dict          # 사용자 캐시 사용 정보 (LRUCache.stats 참고)
+            }
+        """
+        return {
+            'user_cache_ttl': self.user_cache_ttl,
+            'user_checks': self.user_checks,
+            'revoked_rejections': self.revoked_rejections,
+            'user_cache': self.user_cache.stats()
+        }
@@ -1,10 +1,56 @@
-from typing import Union
+import threading
+from collections import Counter
+from typing import Optional, Union
 
+import numpy as np
+
+from cache import LRUCache
 from data import LinkMessage
+from .event_bus import PAGE_CREATED, PAGE_UPDATED, PAGE_DELETED, LINK_CREATED, LINK_DELETED
+
+# 노트마다 캐시해 두는 최대 연결 제안 수
+MAX_SUGGESTED_LINKS = 100
 
 class LinkService:
-    def __init__(self, link_dao):
+    def __init__(self, link_dao, page_dao, model_registry, event_bus, suggestion_cache_size: int = 256,
+                 suggestion_ttl: Optional[float] = 60):
         self.link_dao = link_dao
+        self.page_dao = page_dao
+        self.model_registry = model_registry
+        self.event_bus = event_bus
+
+        # 노트 id별 연결 제안 캐시와, 이벤트의 페이지 id로 캐시를 지우기 위한 페이지 id -> 노트 id 역색인
+        # 이벤트는 같은 프로세스에서만 전달되므로 다른 프로세스에서 바꾼 페이지, 연결은 suggestion_ttl초가 지나야 반영된다.
+        # 역색인은 캐시에 있거나 계산 중인 노트의 페이지만 가지고 있다. (캐시에서 밀려나거나 만료된 노트는 다음 계산 때 정리)
+        self._suggestions = LRUCache(suggestion_cache_size, suggestion_ttl)
+        self._note_by_page = {}
+        self._pages_by_note = {}
+        self._computing = Counter()
+        self._note_by_page_lock = threading.Lock()
+
+        event_bus.subscribe(PAGE_CREATED, self._invalidate_suggestions)
+        event_bus.subscribe(PAGE_UPDATED, self._invalidate_suggestions)
+        event_bus.subscribe(PAGE_DELETED, self._invalidate_suggestions)
+        event_bus.subscribe(LINK_CREATED, self._invalidate_suggestions)
+        event_bus.subscribe(LINK_DELETED, self._invalidate_suggestions)
+
+    def _invalidate_suggestions(self, page_id: int = None, linked_page_id: int = None, note_id: int = None, **payload):
+        """페이지나 연결이 바뀐 노트의 연결 제안 캐시를 지웁니다."""
+        note_ids = {int(note_id)} if note_id is not None else set()
+        with self._note_by_page_lock:
+            for changed_page_id in (page_id, linked_page_id):
+                if changed_page_id is not None and int(changed_page_id) in self._note_by_page:
+                    note_ids.add(self._note_by_page[int(changed_page_id)])
+
+            for changed_note_id in note_ids:
+                self._suggestions.delete(changed_note_id)
+                self._forget_note(changed_note_id)
+
+    def _forget_note(self, note_id: int):
+        # _note_by_page_lock을 잡은 상태에서 호출한다.
+        for page_id in self._pages_by_note.pop(note_id, ()):
+            if self._note_by_page.get(page_id) == note_id:
+                del self._note_by_page[page_id]
 
     # create
     def create_new_link(self, new_link: dict) -> Union[bool, LinkMessage]:
@@ -30,6 +76,9 @@ class LinkService:
         except Exception as e:
             return LinkMessage.ERROR
 
+        if is_created:
+            self.event_bus.publish(LINK_CREATED, page_id=new_link['page_id'], linked_page_id=new_link['linked_page_id'])
+
         return is_created
 
 
@@ -79,6 +128,101 @@ class LinkService:
 
         return link_list
 
+    def suggest_links(self, note_id: int, k: int = 10) -> Union[list[dict], LinkMessage]:
+        """노트 내에서 아직 연결되지 않은 페이지 쌍 중 키워드가 가장 유사한 k개를 제안합니다.
+        노트의 모든 페이지 키워드 벡터로 코사인 유사도 행렬을 한 번에 계산하고,
+        결과는 노트의 페이지나 연결이 바뀌거나 ttl이 지날 때까지 캐시합니다.
+        만약 k가 1보다 작거나 에러가 발생하면 LinkMessage를 반환합니다.
+
+        :param note_id: 노트 id
+        :param k: 제안할 연결 수 (1 이상, MAX_SUGGESTED_LINKS보다 크면 MAX_SUGGESTED_LINKS개)
+        :return: 제안하는 연결 정보를 포함한 리스트 (유사도 내림차순):
+            [{
+                'page_id': int,         # 페이지 id
+                'linked_page_id': int,  # 연결할 페이지 id
+                'linkage': double       # 제안하는 연결 강도 (키워드 코사인 유사도, 0 ~ 1)
+            }]
+        """
+        if k is None or k < 1:
+            return LinkMessage.FAIL_INVALID_REQUEST
+
+        note_id = int(note_id)
+        current = self.model_registry.current
+
+        try:
+            # 모델 버전이 바뀌었으면 캐시된 제안은 사용하지 않는다.
+            cached = self._suggestions.get(note_id)
+            if cached is not None and cached[0] == current.version:
+                suggestions = cached[1]
+            else:
+                suggestions = self._compute_suggestions(note_id, current)
+        except Exception as e:
+            return LinkMessage.ERROR
+
+        return suggestions[:min(k, MAX_SUGGESTED_LINKS)]
+
+    def _compute_suggestions(self, note_id: int, current) -> list:
+        page_list = self.page_dao.find_page_id_and_keyword_by_note_id(note_id)
+        link_list = self.link_dao.find_link_list_by_note_id(note_id)
+        page_ids = [page['page_id'] for page in page_list]
+
+        # 캐시를 채우기 전에 역색인을 먼저 등록해야 계산 중에 발생한 변경 이벤트로 캐시가 지워진다.
+        with self._note_by_page_lock:
+            for page_id in page_ids:
+                self._note_by_page[page_id] = note_id
+            self._pages_by_note.setdefault(note_id, set()).update(page_ids)
+            self._computing[note_id] += 1
+
+        suggestions = None
+        try:
+            suggestions = self._rank_suggestions(page_list, link_list, page_ids, current)
+        finally:
+            with self._note_by_page_lock:
+                self._computing[note_id] -= 1
+                if self._computing[note_id] == 0:
+                    del self._computing[note_id]
+
+                if suggestions is not None and all(self._note_by_page.get(page_id) == note_id for page_id in page_ids):
+                    self._suggestions.set(note_id, (current.version, suggestions))
+
+                # 캐시에서 밀려나거나 만료된 노트의 역색인을 정리한다.
+                for cached_note_id in [key for key in self._pages_by_note
+                                       if key not in self._computing and key not in self._suggestions]:
+                    self._forget_note(cached_note_id)
+
+        return suggestions
+
+    def _rank_suggestions(self, page_list: list, link_list: list, page_ids: list, current) -> list:
+        positions, _, vectors = current.model.get_normed_vectors([page['keyword'] for page in page_list])
+        suggestions = []
+
+        if len(positions) > 1:
+            similarity = vectors @ vectors.T
+
+            # 같은 쌍을 두 번 세지 않도록 위쪽 삼각 행렬만 사용하고, 이미 연결된 쌍은 제외한다.
+            index_by_page = {page_ids[position]: i for i, position in enumerate(positions)}
+            candidates = np.triu(np.ones(similarity.shape, dtype=bool), k=1)
+            for link in link_list:
+                i, j = index_by_page.get(link['page_id']), index_by_page.get(link['linked_page_id'])
+                if i is not None and j is not None:
+                    candidates[min(i, j), max(i, j)] = False
+
+            rows, cols = np.nonzero(candidates)
+            scores = similarity[rows, cols]
+            if len(scores) > MAX_SUGGESTED_LINKS:
+                best = np.argpartition(-scores, MAX_SUGGESTED_LINKS - 1)[:MAX_SUGGESTED_LINKS]
+            else:
+                best = np.arange(len(scores))
+            best = best[np.argsort(-scores[best], kind='stable')]
+
+            suggestions = [{
+                'page_id': page_ids[positions[rows[i]]],
+                'linked_page_id': page_ids[positions[cols[i]]],
+                'linkage': float(np.clip(scores[i], 0.0, 1.0))
+            } for i in best]
+
+        return suggestions
+
 
     # delete
     def delete_link(self, link: dict) -> Union[bool, LinkMessage]:
@@ -98,4 +242,7 @@ class LinkService:
         except Exception as e:
             return LinkMessage.ERROR
 
+        if is_deleted:
+            self.event_bus.publish(LINK_DELETED, page_id=link['page_id'], linked_page_id=link['linked_page_id'])
+
         return is_deleted
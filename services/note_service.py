@@ -3,11 +3,15 @@ from functools import wraps
 import json
 from typing import Union
 
-from data import response_from_message, ResponseText, NoteMessage
+from data import response_from_message, ResponseText, NoteMessage, UserMessage
+from .event_bus import NOTE_CREATED, NOTE_UPDATED, NOTE_DELETED
 
 class NoteService:
-    def __init__(self, note_dao):
+    def __init__(self, note_dao, event_bus, authorization_cache, jwt_service):
         self.note_dao = note_dao
+        self.jwt_service = jwt_service
+        self.event_bus = event_bus
+        self.authorization_cache = authorization_cache
 
     # verify
     # 요청한 사용자와 노트 소유주(사용자)와 같은 사용자인지 확인하는 데코레이터
@@ -22,7 +26,15 @@ class NoteService:
 
             if note_id is not None:
                 try:
-                    note_owner_id = self.note_dao.find_user_id_by_note_id(note_id)
+                    if g.get('user_verified', True):
+                        note_owner_id = self.authorization_cache.note_owner(note_id)
+                    else:
+                        # 로그인 확인(사용자 존재 여부)과 노트 권한 확인을 하나의 쿼리로 처리한다.
+                        access = self.authorization_cache.note_access(note_id, g.user_id)
+                        if not self.jwt_service.confirm_user(g.user_id, access is not None):
+                            return Response(json.dumps(response_from_message(ResponseText.FAIL.value, UserMessage.FAIL_NOT_EMAIL.value)), status=401)
+                        note_owner_id = access['owner_id']
+                        g.user_verified = True
                 except Exception as e:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, NoteMessage.ERROR.value)), status=500)
 
@@ -30,13 +42,21 @@ class NoteService:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, NoteMessage.FAIL_NOT_EXISTS.value)), status=400)
                 elif note_owner_id != g.user_id:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, NoteMessage.FAIL_NOT_PERMISSION.value)), status=401)
+
+                # 확인한 권한 정보를 핸들러에서 다시 조회하지 않도록 g에 저장한다.
+                g.note_id = int(note_id)
+                g.note_owner_id = note_owner_id
             else:
                 return Response(json.dumps(response_from_message(ResponseText.FAIL.value, NoteMessage.FAIL_NOT_EXISTS.value)),status=400)
             return f(*args, **kwargs)
+
+        # login_required가 users 조회를 이 데코레이터의 쿼리에 맡기도록 표시한다.
+        decorated_function.verifies_user = True
         return decorated_function
 
     # 노트의 공유 권한을 확인하는 데코레이터
     def confirm_note_permission(self, f):
+        @wraps(f)
         def decorated_function(*args, **kwargs):
             if request.method == 'GET':
                 note_id = request.args.get('noteId')
@@ -46,7 +66,7 @@ class NoteService:
 
             if note_id is not None:
                 try:
-                    note_permission = self.note_dao.find_shared_permission_by_note_id(note_id)
+                    note_permission = self.authorization_cache.note_permission(note_id)
                 except Exception as e:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, NoteMessage.ERROR.value)), status=500)
 
@@ -84,6 +104,10 @@ class NoteService:
         except Exception as e:
             return NoteMessage.ERROR
 
+        if note_id:
+            self.event_bus.publish(NOTE_CREATED, note_id=note_id, user_id=new_note['user_id'],
+                                   shared_permission=new_note['shared_permission'])
+
         return note_id if note_id else NoteMessage.ERROR
 
 
@@ -156,11 +180,13 @@ class NoteService:
             if not is_updated:
                 return NoteMessage.ERROR
 
-            updated_note = self.note_dao.get_note_info(note['note_id'])
+            self.event_bus.publish(NOTE_UPDATED, note_id=note['note_id'], shared_permission=note['shared_permission'])
+
+            updated_at = self.note_dao.find_updated_at_by_note_id(note['note_id'])
         except Exception as e:
             return NoteMessage.ERROR
 
-        return updated_note['updated_at'] if updated_note else NoteMessage.ERROR
+        return updated_at if updated_at else NoteMessage.ERROR
 
 
     # delete
@@ -177,4 +203,7 @@ class NoteService:
         except Exception as e:
             return NoteMessage.ERROR
 
+        if is_deleted:
+            self.event_bus.publish(NOTE_DELETED, note_id=note_id)
+
         return is_deleted
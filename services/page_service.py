@@ -3,11 +3,15 @@ from functools import wraps
 from typing import Union
 import json
 
-from data import response_from_message, ResponseText, PageMessage
+from data import response_from_message, ResponseText, PageMessage, UserMessage
+from .event_bus import PAGE_CREATED, PAGE_UPDATED, PAGE_DELETED
 
 class PageService:
-    def __init__(self, page_dao):
+    def __init__(self, page_dao, event_bus, authorization_cache, jwt_service):
         self.page_dao = page_dao
+        self.jwt_service = jwt_service
+        self.event_bus = event_bus
+        self.authorization_cache = authorization_cache
 
     # verify
     # 요청한 사용자와 페이지 소유자(사용자)가 같은 사용자인지 확인하는 데코레이터
@@ -22,7 +26,17 @@ class PageService:
 
             if page_id is not None:
                 try:
-                    page_owner_id = self.page_dao.find_page_owner_id_by_page_id(page_id)
+                    if g.get('user_verified', True):
+                        note_id = self.authorization_cache.page_note(page_id)
+                        page_owner_id = self.authorization_cache.note_owner(note_id) if note_id != -1 else -1
+                    else:
+                        # 로그인 확인(사용자 존재 여부)과 페이지 권한 확인, 노트 id 조회를 하나의 쿼리로 처리한다.
+                        access = self.authorization_cache.page_access(page_id, g.user_id)
+                        if not self.jwt_service.confirm_user(g.user_id, access is not None):
+                            return Response(json.dumps(response_from_message(ResponseText.FAIL.value, UserMessage.FAIL_NOT_EMAIL.value)), status=401)
+                        note_id = access['note_id']
+                        page_owner_id = access['owner_id']
+                        g.user_verified = True
                 except Exception as e:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, PageMessage.ERROR.value)), status=500)
 
@@ -30,33 +44,57 @@ class PageService:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, PageMessage.FAIL_NOT_EXISTS.value)), status=400)
                 elif page_owner_id != g.user_id:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, PageMessage.FAIL_NOT_PERMISSION.value)), status=401)
+
+                # 확인한 권한 정보를 핸들러에서 다시 조회하지 않도록 g에 저장한다.
+                g.page_id = int(page_id)
+                g.note_id = note_id
+                g.note_owner_id = page_owner_id
             else:
                 return Response(json.dumps(response_from_message(ResponseText.FAIL.value, PageMessage.FAIL_NOT_EXISTS.value)), status=400)
             return f(*args, **kwargs)
+
+        # login_required가 users 조회를 이 데코레이터의 쿼리에 맡기도록 표시한다.
+        decorated_function.verifies_user = True
         return decorated_function
 
-    # def is_included_same_note(self, page_id: int, page_id_to_compare: int) -> Union[bool, PageMessage]:
-    #     """두 개의 페이지가 같은 노트에 포함되어 있는지 검증합니다.
-    #     만약 에러가 발생하면 PageMessage를 반환합니다.
-    #
-    #     :param page_id: 페이지 id
-    #     :param page_id_to_compare: 검증할 페이지 id
-    #     :return: 같은 노트에 포함되어 있는지 (True/False)
-    #     """
-    #     try:
-    #         note_id = self.page_dao.find_note_id_by_page_id(page_id)
-    #         note_id_to_compare = self.page_dao.find_note_id_by_page_id(page_id_to_compare)
-    #     except Exception as e:
-    #         return PageMessage.ERROR
-    #     finally:
-    #         if note_id is None or note_id_to_compare is None:
-    #             return PageMessage.ERROR
-    #         elif note_id == -1 or note_id_to_compare == -1:
-    #             return PageMessage.FAIL_NOT_EXISTS
-    #
-    #     return True if note_id == note_id_to_compare else False
-
-    # 두 개의 페이지가 같은 노트에 포함되어 있는지 확인하는 데코레이터
+    def confirm_same_note_pairs(self, page_pairs: list, user_id: int) -> Union[dict, PageMessage]:
+        """페이지 쌍마다 두 페이지가 같은 노트에 포함되어 있고 그 노트의 소유주가 요청한 사용자인지 검증합니다.
+        모든 페이지를 하나의 쿼리로 조회합니다. (캐시에 있는 페이지는 조회하지 않음)
+        그리고 검증한 페이지의 노트 id와 소유주 id를 반환합니다.
+        만약 검증에 실패하거나 에러가 발생하면 PageMessage를 반환합니다.
+
+        :param page_pairs: (페이지 id, 연결할 페이지 id) 튜플 리스트
+        :param user_id: 요청한 사용자 id
+        :return: 페이지 id를 key로 하는 딕셔너리 (AuthorizationCache.page_notes 참고):
+            {
+                page_id: {
+                    'note_id': int,     # 노트 id
+                    'owner_id': int     # 노트 소유주(사용자) id
+                }
+            }
+        """
+        try:
+            pages = self.authorization_cache.page_notes([page_id for pair in page_pairs for page_id in pair])
+        except Exception as e:
+            return PageMessage.ERROR
+
+        for page_id, linked_page_id in page_pairs:
+            try:
+                page = pages.get(int(page_id))
+                linked_page = pages.get(int(linked_page_id))
+            except (TypeError, ValueError):
+                return PageMessage.FAIL_NOT_EXISTS
+
+            if page is None or linked_page is None:
+                return PageMessage.FAIL_NOT_EXISTS
+            if page['note_id'] != linked_page['note_id']:
+                return PageMessage.FAIL_NOT_SAME_NOTE
+            if page['owner_id'] != user_id:
+                return PageMessage.FAIL_NOT_PERMISSION
+
+        return pages
+
+    # 두 개의 페이지가 같은 노트에 포함되어 있고, 요청한 사용자가 노트의 소유주인지 확인하는 데코레이터
     def is_included_same_note(self, f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -69,16 +107,19 @@ class PageService:
                 linked_page_id = body['linkedPageId']
 
             if page_id is not None and linked_page_id is not None:
-                try:
-                    note_id = self.page_dao.find_note_id_by_page_id(page_id)
-                    note_id_to_compare = self.page_dao.find_note_id_by_page_id(linked_page_id)
-                except Exception as e:
+                # 두 페이지의 노트 id와 소유주를 한 번에 조회해서 소유주 확인(confirm_auth)까지 함께 처리한다.
+                result = self.confirm_same_note_pairs([(page_id, linked_page_id)], g.user_id)
+
+                if result == PageMessage.ERROR:
                     return Response(json.dumps(response_from_message(ResponseText.FAIL.value, PageMessage.ERROR.value)), status=500)
+                elif result == PageMessage.FAIL_NOT_PERMISSION:
+                    return Response(json.dumps(response_from_message(ResponseText.FAIL.value, PageMessage.FAIL_NOT_PERMISSION.value)), status=401)
+                elif isinstance(result, PageMessage):
+                    return Response(json.dumps(response_from_message(ResponseText.FAIL.value, result.value)), status=400)
 
-                if note_id == -1 or note_id_to_compare == -1:
-                    return Response(json.dumps(response_from_message(ResponseText.FAIL.value, PageMessage.FAIL_NOT_EXISTS.value)), status=400)
-                if note_id != note_id_to_compare:
-                    return Response(json.dumps(response_from_message(ResponseText.FAIL.value, PageMessage.FAIL_NOT_SAME_NOTE.value)), status=400)
+                # 검증에 사용한 조회 결과에서 노트 id를 꺼내 다시 조회하지 않는다.
+                g.page_id = int(page_id)
+                g.note_id = result[g.page_id]['note_id']
             else:
                 return Response(json.dumps(response_from_message(ResponseText.FAIL.value, PageMessage.FAIL_NOT_EXISTS.value)), status=400)
             return f(*args, **kwargs)
@@ -104,6 +145,9 @@ class PageService:
         except Exception as e:
             return PageMessage.ERROR
 
+        if page_id:
+            self.event_bus.publish(PAGE_CREATED, page_id=page_id, note_id=new_page['note_id'], keyword=new_page['keyword'])
+
         return page_id if page_id else PageMessage.ERROR
 
 
@@ -193,11 +237,13 @@ class PageService:
             if not is_updated:
                 return PageMessage.ERROR
 
-            updated_page = self.page_dao.get_page_info(page['page_id'])
+            self.event_bus.publish(PAGE_UPDATED, page_id=page['page_id'], keyword=page['keyword'])
+
+            updated_at = self.page_dao.find_updated_at_by_page_id(page['page_id'])
         except Exception as e:
             return PageMessage.ERROR
 
-        return updated_page['updated_at'] if updated_page else PageMessage.ERROR
+        return updated_at if updated_at else PageMessage.ERROR
 
     def update_content(self, page: dict) -> Union[str, PageMessage]:
         """페이지 내용을 받아 페이지 정보를 수정합니다.
@@ -217,11 +263,11 @@ class PageService:
             if not is_updated:
                 return PageMessage.ERROR
 
-            updated_page = self.page_dao.get_page_info(page['page_id'])
+            updated_at = self.page_dao.find_updated_at_by_page_id(page['page_id'])
         except Exception as e:
             return PageMessage.ERROR
 
-        return updated_page['updated_at'] if updated_page else PageMessage.ERROR
+        return updated_at if updated_at else PageMessage.ERROR
 
 
     # delete
@@ -238,4 +284,7 @@ class PageService:
         except Exception as e:
             return PageMessage.ERROR
 
+        if is_deleted:
+            self.event_bus.publish(PAGE_DELETED, page_id=page_id)
+
         return is_deleted
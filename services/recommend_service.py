@@ -1,17 +1,283 @@
-import numpy as np
+from typing import Optional, Union
 
-from gensim.models import Word2Vec
+import numpy as np
 
-from recommend import recommend_pytrends
+from recommend import TrendsUnavailableError, ModelLoadingError, PoolOverloadedError
 from data import RecommendMessage
+from .event_bus import PAGE_CREATED, PAGE_UPDATED, PAGE_DELETED
+
+# page_recommendations 테이블의 추천 종류
+TREND = 'trend'
+ASSOCIATION = 'association'
+
+# 페이지마다 저장하는 Word2Vec 추천 후보 수
+CANDIDATE_SIZE = 50
 
 class RecommendService:
-    def __init__(self, page_dao):
+    def __init__(self, page_dao, recommendation_dao, model_registry, trends_cache, single_flight, trends_client,
+                 executor, store_executor, selector, event_bus, similarity_pool=None, store_ttl: float = 24 * 60 * 60,
+                 trends_snapshot=None, snapshot_only: bool = False, user_profiles=None, autocomplete=None):
         self.page_dao = page_dao
+        # 페이지 키워드가 바뀔 때 미리 계산한 추천 후보를 저장하는 테이블
+        # google trends 후보는 store_ttl초 동안, Word2Vec 후보는 같은 모델 파일인 동안 사용한다.
+        self.recommendation_dao = recommendation_dao
+        self.store_ttl = store_ttl
+        # 모델은 요청마다 model_registry.current를 한 번만 읽어서 사용한다. (요청 중에 모델이 교체되어도 같은 버전을 사용)
+        self.model_registry = model_registry
+        self.trends_cache = trends_cache
+        # 주기적으로 미리 모아 둔 google trends 로컬 저장소 (None이면 사용하지 않음)
+        # snapshot_only이면 저장소와 저장된 후보에 없는 keyword도 google trends를 호출하지 않고 빈 추천 결과를 반환한다.
+        self.trends_snapshot = trends_snapshot
+        self.snapshot_only = snapshot_only
+        # 같은 keyword에 대한 동시 요청은 한 번만 계산하고 결과를 공유한다.
+        # 노트별 키워드 제외는 공유한 결과로 각 요청에서 따로 한다.
+        self.single_flight = single_flight
+        self.trends_client = trends_client
+        # 서로 의존하지 않는 원격 호출과 DB 조회를 동시에 실행하는 공유 thread pool
+        self.executor = executor
+        # 추천 후보에서 응답에 담을 단어를 고르는 방법 (seed를 고정한 무작위 선택 또는 상위 k개)
+        self.selector = selector
+        # 유사 단어 검색을 실행할 worker 프로세스 pool (None이면 현재 프로세스에서 계산)
+        self.similarity_pool = similarity_pool
+        # 추천 후보를 미리 계산해서 저장하는 백그라운드 thread pool (요청 처리와 thread를 나누어 쓴다.)
+        self.store_executor = store_executor
+        # 사용자의 모든 페이지 키워드로 만든 프로필로 추천 후보를 다시 정렬한다. (None이면 사용하지 않음)
+        self.user_profiles = user_profiles
+        # 단어 사전과 사용자 키워드의 접두사 색인으로 키워드를 자동 완성한다. (None이면 사용하지 않음)
+        self.autocomplete = autocomplete
+
+        self.store_hits = 0
+        self.store_misses = 0
+        self.store_writes = 0
+        self.store_errors = 0
+
+        event_bus.subscribe(PAGE_CREATED, self._on_page_keyword_changed)
+        event_bus.subscribe(PAGE_UPDATED, self._on_page_keyword_changed)
+        event_bus.subscribe(PAGE_DELETED, self._on_page_deleted)
+
+
+    def _stage(self, *calls: tuple) -> list:
+        """서로 의존하지 않는 작업들을 동시에 실행하고, 모두 끝날 때까지 기다립니다.
+        첫 번째 작업은 현재 thread에서 실행하고, 나머지는 공유 thread pool에서 실행합니다.
+        만약 작업 중 하나라도 예외가 발생하면 그 예외가 그대로 발생합니다.
+
+        :param calls: (함수, 인자...) 튜플
+        :return: 작업 순서대로 정렬된 결과 리스트
+        """
+        futures = [self.executor.submit(fn, *args) for fn, *args in calls[1:]]
+
+        fn, *args = calls[0]
+        results = [fn(*args)]
+
+        return results + [future.result() for future in futures]
+
+    def _find_note_keywords(self, page_id: int) -> set:
+        """페이지가 포함된 노트의 모든 페이지 키워드를 조회합니다.
+
+        :param page_id: 페이지 id
+        :return: 노트 내 페이지 키워드 집합
+        """
+        note_id = self.page_dao.find_note_id_by_page_id(page_id)
+        page_list = self.page_dao.find_page_id_and_keyword_by_note_id(note_id)
+
+        return set([page['keyword'] for page in page_list])
+
+    def _find_note_keywords_by_page(self, page_ids: list) -> dict:
+        """여러 페이지에 대해 페이지가 포함된 노트의 모든 페이지 키워드를 조회합니다.
+
+        :param page_ids: 페이지 id 리스트
+        :return: 페이지 id별 노트 내 페이지 키워드 집합을 포함한 딕셔너리
+        """
+        note_keywords_by_page = {}
+        for page_id in page_ids:
+            if page_id not in note_keywords_by_page:
+                note_keywords_by_page[page_id] = self._find_note_keywords(page_id)
+
+        return note_keywords_by_page
+
+    def _on_page_keyword_changed(self, page_id: int, keyword: str, **payload):
+        self.store_executor.submit(self.precompute_recommendations, page_id, keyword)
+        if self.user_profiles is not None:
+            self.store_executor.submit(self.user_profiles.on_page_keyword_changed, page_id, keyword,
+                                       self.model_registry.current)
+        if self.autocomplete is not None:
+            self.store_executor.submit(self._invalidate_autocomplete, page_id)
+
+    def _invalidate_autocomplete(self, page_id: int):
+        if self.user_profiles is not None:
+            user_id = self.user_profiles.owner(page_id)
+        else:
+            user_id = self.page_dao.find_page_owner_id_by_page_id(page_id)
+
+        if user_id != -1:
+            self.autocomplete.invalidate_user(user_id)
+
+    def _on_page_deleted(self, page_id: int, **payload):
+        self.store_executor.submit(self.recommendation_dao.delete_recommendations_by_page_id, page_id)
+        if self.user_profiles is not None:
+            self.user_profiles.on_page_deleted(page_id)
+
+    def _find_profile(self, current, page_id: int):
+        """페이지 소유자의 키워드 프로필을 조회합니다. (프로필을 사용하지 않거나 페이지가 없으면 None)"""
+        if self.user_profiles is None:
+            return None
+
+        # 프로필을 조회할 수 없으면 다시 정렬하지 않고 추천한다.
+        try:
+            user_id = self.user_profiles.owner(page_id)
+            return self.user_profiles.get(user_id, current) if user_id != -1 else None
+        except Exception as e:
+            return None
+
+    def _find_profiles_by_page(self, current, page_ids: list) -> dict:
+        return {page_id: self._find_profile(current, page_id) for page_id in dict.fromkeys(page_ids)}
+
+    def precompute_recommendations(self, page_id: int, keyword: str):
+        """페이지 키워드의 google trends, Word2Vec 추천 후보를 계산해서 저장합니다.
+        페이지 생성, 헤더 수정 이벤트가 발생하면 백그라운드에서 실행되며, 실패한 후보는 저장하지 않습니다.
+        (요청 시에 저장된 후보가 없으면 다시 계산한다.)
+
+        :param page_id: 페이지 id
+        :param keyword: 페이지 키워드
+        """
+        current = self.model_registry.current
+
+        try:
+            ids, scores = self._most_similar_ids(current.model, keyword, CANDIDATE_SIZE)
+            self._store(page_id, ASSOCIATION, keyword, current.fingerprint, {'ids': ids.tolist(), 'scores': scores.tolist()})
+        except Exception as e:
+            self.store_errors += 1
+
+        try:
+            topics = self._find_snapshot(keyword)
+            if topics is None:
+                topics = self._fetch_topics(keyword)
+            self._store(page_id, TREND, keyword, None, {'top': topics['top']})
+        except Exception as e:
+            self.store_errors += 1
+
+    def _store(self, page_id: int, source: str, keyword: str, model_version, candidates: dict, verify: bool = False):
+        # 요청으로 들어온 keyword는 페이지의 실제 키워드와 다를 수 있으므로, 요청 중에 계산한 후보는 확인 후 저장한다.
+        if verify:
+            page = self.page_dao.get_page_info(page_id)
+            if page is None or page['keyword'] != keyword:
+                return
+
+        self.recommendation_dao.upsert_recommendation({
+            'page_id': page_id,
+            'source': source,
+            'keyword': keyword,
+            'model_version': model_version,
+            'candidates': candidates
+        })
+        self.store_writes += 1
+
+    def _store_in_background(self, *args):
+        def store():
+            try:
+                self._store(*args, verify=True)
+            except Exception as e:
+                self.store_errors += 1
+
+        self.store_executor.submit(store)
+
+    def _find_stored(self, page_id: int, source: str, keyword: str, model_version=None):
+        """저장된 추천 후보를 조회합니다. 후보가 없거나, 다른 키워드(모델)로 계산했거나, 오래되었으면 None을 반환합니다."""
+        try:
+            stored = self.recommendation_dao.find_recommendation(page_id, source)
+        except Exception as e:
+            self.store_errors += 1
+            stored = None
+
+        if stored is None or stored['keyword'] != keyword or stored['model_version'] != model_version \
+                or (source == TREND and stored['age'] > self.store_ttl):
+            self.store_misses += 1
+            return None
+
+        self.store_hits += 1
+        return stored['candidates']
+
+    def _find_snapshot(self, keyword: str) -> Optional[dict]:
+        if self.trends_snapshot is None:
+            return None
+        return self.trends_snapshot.get(keyword)
+
+    def _fetch_topics(self, keyword: str) -> dict:
+        if self.snapshot_only:
+            raise TrendsUnavailableError('keyword is not in the google trends snapshot')
+        return self.single_flight.do(('trends', keyword), self.trends_cache.get, keyword)
+
+    def _find_topics(self, keyword: str, page_id: int) -> dict:
+        # 로컬 스냅샷 -> 저장된 후보 -> 캐시(또는 google trends) 순서로 조회한다.
+        topics = self._find_snapshot(keyword)
+        if topics is not None:
+            return topics
+
+        topics = self._find_stored(page_id, TREND, keyword)
+        if topics is None:
+            topics = self._fetch_topics(keyword)
+            self._store_in_background(page_id, TREND, keyword, None, {'top': topics['top']})
+
+        return topics
+
+    def _find_topics_by_item(self, items: list) -> list:
+        topics_list = []
+        for item in items:
+            topics = self._find_snapshot(item['keyword'])
+            if topics is None:
+                topics = self._find_stored(item['page_id'], TREND, item['keyword'])
+            topics_list.append(topics)
+
+        return topics_list
+
+    def _find_similar_ids(self, current, keyword: str, page_id: int) -> tuple:
+        candidates = self._find_stored(page_id, ASSOCIATION, keyword, current.fingerprint)
+        if candidates is not None:
+            return np.array(candidates['ids'], dtype=np.int64), np.array(candidates['scores'], dtype=np.float64)
+
+        ids, scores = self.single_flight.do(('w2v', current.version, keyword), self._most_similar_ids,
+                                            current.model, keyword, CANDIDATE_SIZE)
+        self._store_in_background(page_id, ASSOCIATION, keyword, current.fingerprint,
+                                  {'ids': ids.tolist(), 'scores': scores.tolist()})
 
+        return ids, scores
+
+    def _select_keywords(self, words: list, scores: np.ndarray, exclude_mask: np.ndarray, seed_parts: tuple,
+                         ids: np.ndarray = None, ranking_scores: np.ndarray = None) -> list:
+        """추천 후보에서 노트에 이미 있는 키워드를 제외하고 5개를 고릅니다.
+        후보가 없거나 모두 제외되면 빈 리스트를 반환합니다.
+
+        :param words: 후보 단어 리스트 (ids가 있으면 단어 사전의 index_to_key)
+        :param scores: (N,) 후보의 관계 정도 배열
+        :param exclude_mask: (N,) 노트에 이미 있는 후보 mask
+        :param seed_parts: 무작위 선택의 시드를 만들 요청 정보 (keyword, page_id)
+        :param ids: (N,) 후보의 단어 id 배열 (선택된 후보만 단어로 바꾼다.)
+        :param ranking_scores: (N,) 선택에 사용할 점수 (사용자 프로필로 조정한 점수, 기본값: scores)
+        :return: 선택된 (단어, 관계 정도) 튜플 리스트
+        """
+        ranking_scores = ranking_scores if ranking_scores is not None else scores
+        selected = self.selector.select(ranking_scores, exclude_mask, seed_parts).tolist()
+
+        if ids is not None:
+            return [(words[int(ids[i])], float(scores[i])) for i in selected]
+        return [(words[i], float(scores[i])) for i in selected]
+
+    def _select_topics(self, topics: dict, note_keywords: set, seed_parts: tuple, current=None, profile=None) -> list:
+        titles = [top['topic_title'] for top in topics['top']]
+        values = np.fromiter((top['value'] for top in topics['top']), dtype=np.float64, count=len(titles))
+        exclude_mask = np.fromiter((title in note_keywords for title in titles), dtype=bool, count=len(titles))
+
+        ranking_values = None
+        if profile is not None:
+            # 단어 사전에 없는 토픽은 프로필 유사도 0으로 조정하지 않는다.
+            positions, _, vectors = current.model.get_normed_vectors(titles)
+            ranking_values = self.user_profiles.rerank(values, vectors, profile, positions)
+
+        return self._select_keywords(titles, values, exclude_mask, seed_parts, ranking_scores=ranking_values)
 
     def recommend_googletrends(self, keyword: str, page_id: int) -> list:
         """keyword를 google trends로 추천합니다.
+        로컬 스냅샷 저장소에 있는 keyword는 네트워크를 사용하지 않고 추천합니다.
 
         :param keyword: 추천할 단어, page_id: 추천할 id
         :return: 추천된 단어를 포함한 리스트:
@@ -21,42 +287,81 @@ class RecommendService:
             }]
         """
         try:
-            data = recommend_pytrends(keyword)
+            # 저장된 후보(없으면 원격 호출), 노트 키워드, 사용자 프로필 조회를 동시에 실행한다.
+            current = self.model_registry.current
+            topics, page_keywords_set, profile = self._stage(
+                (self._find_topics, keyword, page_id),
+                (self._find_note_keywords, page_id),
+                (self._find_profile, current, page_id)
+            )
 
-            # rising_data = data[keyword]['rising'].to_dict('records')
-            top_data = data[keyword]['top'].to_dict('records')
-
-            pytrends_topics_data = {'pytrends_topics_rising': {}, 'pytrends_topics_top': {}}
-            # for rising in rising_data:
-            #     rising_form = {'value': rising['value'], 'topic_type': rising['topic_type']}
-            #     pytrends_topics_data['pytrends_topics_rising'][rising['topic_title']] = rising_form
-            for top in top_data:
-                top_form = {'value': str(top['value']), 'topic_type': top['topic_type']}
-                pytrends_topics_data['pytrends_topics_top'][top['topic_title']] = top_form
+            return self._select_topics(topics, page_keywords_set, (keyword, page_id), current, profile)
+        except TrendsUnavailableError as e:
+            # google trends를 호출할 수 없고 캐시된 결과도 없으면 빈 추천 결과를 반환한다.
+            return []
+        except Exception as e:
+            return RecommendMessage.ERROR
 
-            recommend_keywords = []
+    def recommend_googletrends_batch(self, items: list) -> list:
+        """여러 (keyword, page_id) 쌍을 google trends로 한 번에 추천합니다.
+        캐시에 없는 keyword는 최대 5개씩 묶어서 조회합니다.
+        만약 에러가 발생하면 RecommendMessage를 반환하고,
+        일부 keyword만 실패하면 해당 항목의 추천 결과로 RecommendMessage를 반환합니다.
+        google trends를 호출할 수 없어 결과가 없는 keyword는 빈 리스트를 반환합니다.
 
+        :param items: 추천할 단어와 페이지 id를 포함한 리스트:
+            [{
+                'keyword': str, # 추천할 단어
+                'page_id': int  # 추천할 페이지 id
+            }]
+        :return: 항목별 추천 결과 리스트 (recommend_googletrends 참고)
+        """
+        try:
+            current = self.model_registry.current
+            stored_topics, note_keywords_by_page, profiles_by_page = self._stage(
+                (self._find_topics_by_item, items),
+                (self._find_note_keywords_by_page, [item['page_id'] for item in items]),
+                (self._find_profiles_by_page, current, [item['page_id'] for item in items])
+            )
 
-            for category, topics in pytrends_topics_data.items():
-                for topic, details in topics.items():
-                    recommend_keywords.append((topic, float(details['value'])))
+            # 스냅샷과 저장된 후보에 모두 없는 항목만 캐시(또는 google trends)에서 한 번에 조회한다.
+            missing = [item for item, topics in zip(items, stored_topics) if topics is None]
+            topics_by_keyword = {}
+            if missing and not self.snapshot_only:
+                topics_by_keyword = self.trends_cache.get_many([item['keyword'] for item in missing])
+        except Exception as e:
+            return RecommendMessage.ERROR
 
-            note_id = self.page_dao.find_note_id_by_page_id(page_id)
-            page_list = self.page_dao.find_page_id_and_keyword_by_note_id(note_id)
+        for item in missing:
+            if item['keyword'] in topics_by_keyword:
+                self._store_in_background(item['page_id'], TREND, item['keyword'], None,
+                                          {'top': topics_by_keyword[item['keyword']]['top']})
 
+        recommend_list = []
+        for item, topics in zip(items, stored_topics):
+            if topics is None:
+                topics = topics_by_keyword.get(item['keyword'])
+            if topics is None:
+                recommend_list.append([])
+                continue
 
-            # 중복되는 키워드는 삭제한다.
-            page_keywords_set = set([page['keyword'] for page in page_list])
-            recommend_keywords = [(topic, value) for topic, value in recommend_keywords if topic not in page_keywords_set]
+            try:
+                recommend_list.append(self._select_topics(
+                    topics,
+                    note_keywords_by_page[item['page_id']],
+                    (item['keyword'], item['page_id']),
+                    current,
+                    profiles_by_page[item['page_id']]
+                ))
+            except Exception as e:
+                recommend_list.append(RecommendMessage.ERROR)
 
-            # 5개의 토픽만 남기고 나머지는 삭제한다.
-            topics, values = zip(*recommend_keywords)
-            probabilities = np.array(values) / sum(values)
-            selected_indices = np.random.choice(len(topics), size=min(5, len(topics)), replace=False, p=probabilities)
-        except Exception as e:
-            return RecommendMessage.ERROR
+        return recommend_list
 
-        return [recommend_keywords[index] for index in selected_indices]
+    def _most_similar_ids(self, model, keyword: str, topn: int) -> tuple:
+        if self.similarity_pool is None:
+            return model.most_similar_ids(keyword, topn)
+        return self.similarity_pool.most_similar_ids(model.model_path, keyword, topn)
 
     def recommend_w2v(self, keyword: str, page_id: int) -> list:
         """keyword를 Word2Vec로 추천합니다.
@@ -68,24 +373,174 @@ class RecommendService:
                 'value': int    # 관계 정도
             }]
         """
-        loaded_model = Word2Vec.load('./recommend/w2v_model/w2v_sg.model')
-
         try:
-            recommend_keywords = loaded_model.wv.most_similar(keyword, topn=50)
+            current = self.model_registry.current
+            (ids, scores), page_keywords_set, profile = self._stage(
+                (self._find_similar_ids, current, keyword, page_id),
+                (self._find_note_keywords, page_id),
+                (self._find_profile, current, page_id)
+            )
+
+            # 노트 키워드를 단어 id로 바꿔서 후보 id 배열과 한 번에 비교한다.
+            wv = current.model.wv
+            note_ids = [wv.key_to_index[word] for word in page_keywords_set if word in wv.key_to_index]
+            exclude_mask = np.isin(ids, note_ids)
 
-            note_id = self.page_dao.find_note_id_by_page_id(page_id)
+            ranking_scores = None
+            if profile is not None:
+                ranking_scores = self.user_profiles.rerank(scores, current.model.get_normed_vectors_by_ids(ids), profile)
+
+            return self._select_keywords(wv.index_to_key, scores, exclude_mask, (keyword, page_id), ids, ranking_scores)
+        except PoolOverloadedError as e:
+            # 계산 대기열이 가득 차면 기다리지 않고 바로 실패시킨다.
+            return RecommendMessage.FAIL_OVERLOADED
+        except Exception as e:
+            return RecommendMessage.ERROR
+
+    def recommend_note(self, note_id: int, topn: int = 5) -> dict:
+        """노트의 모든 페이지 키워드를 Word2Vec로 한 번에 추천합니다.
+        페이지 키워드 벡터와 노트 중심 벡터를 하나의 행렬로 묶어 단어 사전 전체와 한 번의 행렬 곱으로 계산하고,
+        노트에 이미 있는 키워드는 미리 만든 mask로 제외합니다.
+
+        :param note_id: 추천할 노트 id
+        :param topn: 페이지마다 추천할 단어 수
+        :return: 추천된 단어를 포함한 딕셔너리:
+            {
+                'page_list': [{
+                    'page_id': int,     # 페이지 id
+                    'keyword': str,     # 페이지 키워드
+                    'recommend': list   # (단어, 유사도) 튜플 리스트 (키워드가 단어 사전에 없으면 빈 리스트)
+                }],
+                'note': list            # 노트 중심 벡터의 (단어, 유사도) 튜플 리스트
+            }
+        """
+        try:
             page_list = self.page_dao.find_page_id_and_keyword_by_note_id(note_id)
+            keywords = [page['keyword'] for page in page_list]
 
-            # 중복되는 키워드는 삭제한다.
-            page_keywords_set = set([page['keyword'] for page in page_list])
-            recommend_keywords = [(topic, value) for topic, value in recommend_keywords if topic not in page_keywords_set]
+            # 모델은 요청마다 한 번만 읽어서 계산이 끝날 때까지 같은 버전을 사용한다.
+            current = self.model_registry.current
+            w2v_model = current.model
+            positions, ids, vectors = w2v_model.get_normed_vectors(keywords)
+            recommend_list = [[] for _ in page_list]
+            note_recommend = []
 
-            # 5개의 키워드만 남기고 나머지는 삭제한다.
-            topics, values = zip(*recommend_keywords)
-            probabilities = np.array(values) / sum(values)
-            selected_indices = np.random.choice(len(topics), size=min(5, len(topics)), replace=False, p=probabilities)
+            if len(ids) > 0:
+                wv = w2v_model.wv
+                exclude_mask = np.zeros(len(wv.index_to_key), dtype=bool)
+                exclude_mask[ids] = True
 
+                centroid = vectors.mean(axis=0)
+                centroid /= np.linalg.norm(centroid) or 1.0
+                queries = np.vstack([vectors, centroid[None, :]])
+
+                topn = min(topn, len(wv.index_to_key) - int(exclude_mask.sum()))
+                if topn > 0:
+                    best_ids, best_scores = w2v_model.similar_by_vectors(queries, topn, exclude_mask)
+                    results = [
+                        [(wv.index_to_key[i], float(score)) for i, score in zip(row_ids, row_scores)]
+                        for row_ids, row_scores in zip(best_ids.tolist(), best_scores.tolist())
+                    ]
+
+                    for position, result in zip(positions, results):
+                        recommend_list[position] = result
+                    note_recommend = results[-1]
+
+            return {
+                'page_list': [{
+                    'page_id': page['page_id'],
+                    'keyword': page['keyword'],
+                    'recommend': recommend
+                } for page, recommend in zip(page_list, recommend_list)],
+                'note': note_recommend
+            }
+        except Exception as e:
+            return RecommendMessage.ERROR
+
+    def complete_keyword(self, prefix: str, user_id: int, limit: int = 10) -> list:
+        """접두사로 시작하는 페이지 키워드를 자동 완성합니다.
+        사용자가 이미 사용한 키워드를 먼저, 단어 사전의 단어를 빈도가 높은 순서로 반환합니다.
+        한글은 자모로 분해해서 비교하므로 입력 중인 글자('삭')로도 완성된 단어('사과')를 찾습니다.
+        만약 자동 완성을 사용하지 않거나 에러가 발생하면 RecommendMessage를 반환합니다.
+
+        :param prefix: 접두사
+        :param user_id: 사용자 id
+        :param limit: 찾을 키워드 수
+        :return: (키워드, 출처) 튜플 리스트 (출처는 'user' 또는 'vocabulary')
+        """
+        if self.autocomplete is None:
+            return RecommendMessage.FAIL_INVALID_REQUEST
+
+        try:
+            return self.autocomplete.complete(prefix, self.model_registry.current, user_id, limit)
         except Exception as e:
             return RecommendMessage.ERROR
 
-        return [recommend_keywords[index] for index in selected_indices]
+    def get_model_versions(self) -> dict:
+        """추천 모델의 버전 정보를 조회합니다.
+
+        :return: 모델 버전 정보를 포함한 딕셔너리 (ModelRegistry.stats 참고)
+        """
+        return self.model_registry.stats()
+
+    def reload_model(self, model_path: str = None) -> Union[int, RecommendMessage]:
+        """새 추천 모델 버전을 백그라운드에서 불러오고, 검증에 성공하면 활성 버전과 교체합니다.
+        만약 이미 다른 버전을 불러오는 중이면 RecommendMessage를 반환합니다.
+
+        :param model_path: 새 모델 경로 (기본값: 활성 버전의 모델 경로)
+        :return: 불러오기 시작한 버전 번호
+        """
+        try:
+            return self.model_registry.reload(model_path)
+        except ModelLoadingError as e:
+            return RecommendMessage.FAIL_MODEL_LOADING
+        except Exception as e:
+            return RecommendMessage.ERROR
+
+    def rollback_model(self) -> Union[int, RecommendMessage]:
+        """활성 추천 모델을 직전 버전으로 되돌립니다.
+        만약 되돌릴 버전이 없으면 RecommendMessage를 반환합니다.
+
+        :return: 다시 활성화된 버전 번호
+        """
+        try:
+            return self.model_registry.rollback()
+        except ModelLoadingError as e:
+            return RecommendMessage.FAIL_NO_PREVIOUS_MODEL
+        except Exception as e:
+            return RecommendMessage.ERROR
+
+    def get_metrics(self) -> dict:
+        """추천 모델과 캐시의 상태를 조회합니다.
+
+        :return: 상태 정보를 포함한 딕셔너리:
+            {
+                'model': dict,          # 활성 Word2Vec 모델 로딩 정보
+                'model_registry': dict, # 모델 버전 정보
+                'trends_cache': dict,   # google trends 캐시 사용 정보
+                'trends_client': dict,  # google trends 호출 정보와 차단기 상태
+                'single_flight': dict,  # 동시 요청 합치기 정보
+                'similarity_pool': dict,        # 유사 단어 검색 프로세스 pool 정보 (사용하지 않으면 None)
+                'trends_snapshot': dict,        # google trends 로컬 저장소 정보 (사용하지 않으면 None)
+                'user_profiles': dict,          # 사용자 프로필 캐시 정보 (사용하지 않으면 None)
+                'autocomplete': dict,           # 자동 완성 색인 정보 (사용하지 않으면 None)
+                'recommendation_store': dict    # 저장된 추천 후보 사용 정보 (hits, misses, writes, errors)
+            }
+        """
+        return {
+            'model': self.model_registry.current.model.stats(),
+            'model_registry': self.model_registry.stats(),
+            'trends_cache': self.trends_cache.stats(),
+            'trends_client': self.trends_client.stats(),
+            'single_flight': self.single_flight.stats(),
+            'similarity_pool': self.similarity_pool.stats() if self.similarity_pool is not None else None,
+            'trends_snapshot': self.trends_snapshot.stats() if self.trends_snapshot is not None else None,
+            'user_profiles': self.user_profiles.stats() if self.user_profiles is not None else None,
+            'autocomplete': self.autocomplete.stats() if self.autocomplete is not None else None,
+            'recommendation_store': {
+                'hits': self.store_hits,
+                'misses': self.store_misses,
+                'writes': self.store_writes,
+                'errors': self.store_errors
+            }
+        }
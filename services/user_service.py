@@ -2,10 +2,12 @@ import bcrypt
 from typing import Union
 
 from data import UserMessage
+from .event_bus import USER_UPDATED, USER_DELETED
 
 class UserService:
-    def __init__(self, user_dao):
+    def __init__(self, user_dao, event_bus):
         self.user_dao = user_dao
+        self.event_bus = event_bus
 
     # create
     def create_new_user(self, user: dict) -> Union[int, UserMessage]:
@@ -80,11 +82,13 @@ class UserService:
             if not is_updated:
                 return UserMessage.ERROR
 
-            updated_user = self.user_dao.get_user_info(user['user_id'])
+            self.event_bus.publish(USER_UPDATED, user_id=user['user_id'])
+
+            updated_at = self.user_dao.find_updated_at_by_user_id(user['user_id'])
         except Exception as e:
             return UserMessage.ERROR
 
-        return updated_user['updated_at'] if updated_user else UserMessage.ERROR
+        return updated_at if updated_at else UserMessage.ERROR
 
 
     # delete
@@ -101,4 +105,7 @@ class UserService:
         except Exception as e:
             return UserMessage.ERROR
 
+        if is_deleted:
+            self.event_bus.publish(USER_DELETED, user_id=user_id)
+
         return is_deleted
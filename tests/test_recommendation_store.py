@@ -0,0 +1,180 @@
+import json
+import unittest
+
+from models.recommendation_dao import RecommendationDao
+from services.event_bus import EventBus
+from services.recommend_service import RecommendService, TREND, ASSOCIATION
+
+
+class FakeResult:
+    def __init__(self, rowcount: int = 0, row: dict = None):
+        self.rowcount = rowcount
+        self.row = row
+
+    def fetchone(self):
+        return self.row
+
+
+class FakeDatabase:
+    """sqlalchemy engine 대신 실행한 쿼리와 인자만 기록한다."""
+
+    def __init__(self, result: FakeResult = None, error: Exception = None):
+        self.result = result or FakeResult()
+        self.error = error
+        self.executed = []
+
+    def execute(self, query, params=None):
+        if self.error is not None:
+            raise self.error
+        self.executed.append((str(query), params))
+        return self.result
+
+
+class FakeRecommendationDao:
+    """page_recommendations 테이블 대신 (page_id, source)를 key로 하는 딕셔너리에 저장한다."""
+
+    def __init__(self):
+        self.rows = {}
+        self.error = None
+
+    def upsert_recommendation(self, recommendation: dict) -> bool:
+        self.rows[(recommendation['page_id'], recommendation['source'])] = dict(recommendation, age=0)
+        return True
+
+    def find_recommendation(self, page_id: int, source: str):
+        if self.error is not None:
+            raise self.error
+        return self.rows.get((page_id, source))
+
+
+class FakePageDao:
+    def __init__(self, pages: dict):
+        self.pages = pages
+
+    def get_page_info(self, page_id: int):
+        return self.pages.get(page_id)
+
+
+class ImmediateExecutor:
+    def submit(self, fn, *args):
+        return fn(*args)
+
+
+class RecommendationDaoTest(unittest.TestCase):
+    recommendation = {
+        'page_id': 1,
+        'source': TREND,
+        'keyword': '사과',
+        'model_version': None,
+        'candidates': {'top': [{'topic_title': '배', 'value': 100}]}
+    }
+
+    def test_upsert_overwrites_on_duplicate_key(self):
+        database = FakeDatabase(FakeResult(rowcount=2))
+
+        self.assertTrue(RecommendationDao(database).upsert_recommendation(self.recommendation))
+
+        query, params = database.executed[0]
+        self.assertIn('ON DUPLICATE KEY UPDATE', query)
+        self.assertIn('updated_at = CURRENT_TIMESTAMP', query)
+        self.assertEqual(params['page_id'], 1)
+        self.assertEqual(params['source'], TREND)
+        self.assertEqual(json.loads(params['candidates']), self.recommendation['candidates'])
+        self.assertIn('배', params['candidates'])
+
+    def test_upsert_without_changed_rows(self):
+        database = FakeDatabase(FakeResult(rowcount=0))
+
+        self.assertFalse(RecommendationDao(database).upsert_recommendation(self.recommendation))
+
+    def test_upsert_database_error(self):
+        database = FakeDatabase(error=Exception('connection lost'))
+
+        with self.assertRaises(RuntimeError):
+            RecommendationDao(database).upsert_recommendation(self.recommendation)
+
+    def test_find_recommendation_decodes_candidates(self):
+        database = FakeDatabase(FakeResult(row={
+            'page_id': 1,
+            'source': TREND,
+            'keyword': '사과',
+            'model_version': None,
+            'candidates': json.dumps(self.recommendation['candidates'], ensure_ascii=False),
+            'age': 30
+        }))
+
+        stored = RecommendationDao(database).find_recommendation(1, TREND)
+
+        self.assertEqual(stored['candidates'], self.recommendation['candidates'])
+        self.assertEqual(stored['age'], 30)
+
+
+class RecommendStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.recommendation_dao = FakeRecommendationDao()
+        self.page_dao = FakePageDao({1: {'page_id': 1, 'keyword': '사과'}})
+        self.service = RecommendService(
+            self.page_dao, self.recommendation_dao, None, None, None, None,
+            None, ImmediateExecutor(), None, EventBus(), store_ttl=60
+        )
+
+    def store(self, source: str, keyword: str = '사과', model_version=None, age: int = 0):
+        self.recommendation_dao.upsert_recommendation({
+            'page_id': 1,
+            'source': source,
+            'keyword': keyword,
+            'model_version': model_version,
+            'candidates': {'top': []}
+        })
+        self.recommendation_dao.rows[(1, source)]['age'] = age
+
+    def test_fresh_trend_hit(self):
+        self.store(TREND, age=59)
+
+        self.assertEqual(self.service._find_stored(1, TREND, '사과'), {'top': []})
+        self.assertEqual(self.service.store_hits, 1)
+
+    def test_trend_older_than_store_ttl_is_stale(self):
+        self.store(TREND, age=61)
+
+        self.assertIsNone(self.service._find_stored(1, TREND, '사과'))
+        self.assertEqual(self.service.store_misses, 1)
+
+    def test_changed_keyword_is_stale(self):
+        self.store(TREND, keyword='바나나')
+
+        self.assertIsNone(self.service._find_stored(1, TREND, '사과'))
+
+    def test_association_depends_on_model_not_age(self):
+        self.store(ASSOCIATION, model_version='model-a', age=10 ** 6)
+
+        self.assertEqual(self.service._find_stored(1, ASSOCIATION, '사과', 'model-a'), {'top': []})
+        self.assertIsNone(self.service._find_stored(1, ASSOCIATION, '사과', 'model-b'))
+
+    def test_dao_error_is_a_miss(self):
+        self.recommendation_dao.error = RuntimeError('Database Error')
+
+        self.assertIsNone(self.service._find_stored(1, TREND, '사과'))
+        self.assertEqual(self.service.store_errors, 1)
+
+    def test_store_in_background_upserts_current_keyword(self):
+        self.service._store_in_background(1, TREND, '사과', None, {'top': [{'topic_title': '배'}]})
+
+        self.assertEqual(self.recommendation_dao.rows[(1, TREND)]['candidates'], {'top': [{'topic_title': '배'}]})
+        self.assertEqual(self.service.store_writes, 1)
+
+    def test_store_in_background_skips_changed_keyword(self):
+        self.service._store_in_background(1, TREND, '바나나', None, {'top': []})
+
+        self.assertNotIn((1, TREND), self.recommendation_dao.rows)
+        self.assertEqual(self.service.store_writes, 0)
+
+    def test_upsert_replaces_stale_entry(self):
+        self.store(TREND, keyword='바나나', age=120)
+        self.service._store(1, TREND, '사과', None, {'top': []})
+
+        self.assertEqual(self.service._find_stored(1, TREND, '사과'), {'top': []})
+
+
+if __name__ == '__main__':
+    unittest.main()
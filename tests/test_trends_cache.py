@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from recommend.google_trends.cache import TrendsCache
+
+
+class FakeTrends:
+    """pytrends 대신 사용하는 fetch / fetch_many (네트워크 없이 호출 기록만 남긴다.)"""
+
+    def __init__(self):
+        self.calls = []
+        self.batches = []
+        self.version = 1
+        self.block = None
+
+    def payload(self, keyword: str) -> dict:
+        return {'rising': [{'topic_title': f'{keyword}-{self.version}'}], 'top': []}
+
+    def fetch(self, keyword, geo, timeframe, hl):
+        if self.block is not None:
+            self.block.wait(5)
+        self.calls.append(keyword)
+        return self.payload(keyword)
+
+    def fetch_many(self, keywords, geo, timeframe, hl):
+        self.batches.append(list(keywords))
+        return {keyword: self.payload(keyword) for keyword in keywords}
+
+
+class LockedDatabase:
+    """다른 worker가 SQLite 파일을 잠근 것처럼 저장(INSERT)만 실패하는 연결"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def execute(self, query, *args):
+        if 'INSERT' in query:
+            raise sqlite3.OperationalError('database is locked')
+        return self.db.execute(query, *args)
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+
+class TrendsCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'trends.sqlite3')
+        self.trends = FakeTrends()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def create_cache(self, **kwargs) -> TrendsCache:
+        return TrendsCache(self.trends.fetch, path=self.path, fetch_many=self.trends.fetch_many, **kwargs)
+
+    def test_memory_hit(self):
+        cache = self.create_cache()
+
+        first = cache.get('사과')
+        second = cache.get('사과')
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.trends.calls, ['사과'])
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_sqlite_hit_after_restart(self):
+        self.create_cache().get('사과')
+
+        restarted = self.create_cache()
+        payload = restarted.get('사과')
+
+        self.assertEqual(payload['rising'][0]['topic_title'], '사과-1')
+        self.assertEqual(self.trends.calls, ['사과'])
+        self.assertEqual(restarted.stats()['disk_hits'], 1)
+
+    def test_expired_entry_is_refetched(self):
+        cache = self.create_cache(ttl=60, stale_ttl=60)
+        cache.put(cache.key('사과'), self.trends.payload('사과'), fetched_at=time.time() - 600)
+        self.trends.version = 2
+
+        payload = cache.get('사과')
+
+        self.assertEqual(payload['rising'][0]['topic_title'], '사과-2')
+        self.assertEqual(self.trends.calls, ['사과'])
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_stale_entry_is_served_while_refreshing(self):
+        cache = self.create_cache(ttl=60, stale_ttl=600)
+        cache.put(cache.key('사과'), self.trends.payload('사과'), fetched_at=time.time() - 120)
+        self.trends.version = 2
+        self.trends.block = threading.Event()
+
+        payload = cache.get('사과')
+
+        # 백그라운드 갱신이 끝나기 전에는 오래된 결과를 반환한다.
+        self.assertEqual(payload['rising'][0]['topic_title'], '사과-1')
+        self.assertEqual(cache.stats()['stale_hits'], 1)
+        self.assertEqual(cache.get('사과')['rising'][0]['topic_title'], '사과-1')
+
+        self.trends.block.set()
+        deadline = time.time() + 5
+        while cache.stats()['refreshes'] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(cache.stats()['refreshes'], 1)
+        self.assertEqual(self.trends.calls, ['사과'])
+        self.assertEqual(cache.get('사과')['rising'][0]['topic_title'], '사과-2')
+
+    def test_get_many_fetches_only_missing_keywords_in_one_batch(self):
+        cache = self.create_cache()
+        cache.get('사과')
+
+        results = cache.get_many(['사과', '바나나', '포도', '바나나'])
+
+        self.assertEqual(set(results), {'사과', '바나나', '포도'})
+        self.assertEqual(self.trends.batches, [['바나나', '포도']])
+        self.assertEqual(self.trends.calls, ['사과'])
+
+        cache.get_many(['바나나', '포도'])
+        self.assertEqual(len(self.trends.batches), 1)
+
+    def test_sqlite_write_failure_still_returns_fetched_payload(self):
+        cache = self.create_cache()
+        cache._db = LockedDatabase(cache._db)
+
+        payload = cache.get('사과')
+        results = cache.get_many(['바나나', '포도'])
+
+        self.assertEqual(payload, self.trends.payload('사과'))
+        self.assertEqual(set(results), {'바나나', '포도'})
+        self.assertEqual(cache.stats()['disk_errors'], 3)
+        self.assertEqual(cache.stats()['errors'], 0)
+
+        # 메모리 캐시에는 저장되었으므로 다시 조회하지 않는다.
+        cache.get('사과')
+        self.assertEqual(self.trends.calls, ['사과'])
+
+
+if __name__ == '__main__':
+    unittest.main()
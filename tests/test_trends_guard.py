@@ -0,0 +1,153 @@
+import threading
+import unittest
+
+from recommend.google_trends.guard import CircuitBreaker, GuardedTrendsClient, TrendsUnavailableError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class HttpError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f'HTTP {status_code}')
+        self.response = type('Response', (), {'status_code': status_code})()
+
+
+class FakeUpstream:
+    """google trends 대신 사용하는 upstream. outcomes 순서대로 결과를 반환하거나 예외를 발생시킨다."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def fetch(self, keyword, geo, timeframe, hl):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else {'keyword': keyword}
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=self.clock)
+
+    def open_breaker(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+
+    def test_closed_to_open_after_failure_threshold(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.stats()['trips'], 1)
+
+    def test_open_rejects_calls(self):
+        self.open_breaker()
+
+        self.assertFalse(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.stats()['rejected'], 2)
+
+    def test_half_open_allows_one_probe_and_closes_on_success(self):
+        self.open_breaker()
+        self.clock.now += 30
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_half_open_reopens_on_failure(self):
+        self.open_breaker()
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.stats()['trips'], 2)
+
+
+class GuardedTrendsClientTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=self.clock)
+        self.sleeps = []
+
+    def create_client(self, upstream_fetch, **kwargs) -> GuardedTrendsClient:
+        return GuardedTrendsClient(upstream_fetch, breaker=self.breaker, sleep=self.sleeps.append, **kwargs)
+
+    def test_failures_open_breaker_and_reject_without_calling_upstream(self):
+        upstream = FakeUpstream(RuntimeError('boom'), RuntimeError('boom'))
+        client = self.create_client(upstream.fetch, max_retries=1)
+
+        with self.assertRaises(RuntimeError):
+            client.fetch('사과', 'KR', 'today 5-y', 'ko')
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.sleeps, [0.5])
+
+        with self.assertRaises(TrendsUnavailableError):
+            client.fetch('사과', 'KR', 'today 5-y', 'ko')
+        self.assertEqual(upstream.calls, 2)
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+    def test_half_open_probe_success_closes_breaker(self):
+        upstream = FakeUpstream(RuntimeError('boom'), RuntimeError('boom'), {'ok': True})
+        client = self.create_client(upstream.fetch, max_retries=1)
+        with self.assertRaises(RuntimeError):
+            client.fetch('사과', 'KR', 'today 5-y', 'ko')
+
+        self.clock.now += 30
+
+        self.assertEqual(client.fetch('사과', 'KR', 'today 5-y', 'ko'), {'ok': True})
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_rate_limit_trips_breaker_immediately(self):
+        upstream = FakeUpstream(HttpError(429))
+        client = self.create_client(upstream.fetch, max_retries=3)
+
+        with self.assertRaises(TrendsUnavailableError):
+            client.fetch('사과', 'KR', 'today 5-y', 'ko')
+
+        self.assertEqual(upstream.calls, 1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(client.stats()['throttled'], 1)
+        self.assertEqual(self.sleeps, [])
+
+    def test_timeout_counts_as_failure(self):
+        release = threading.Event()
+
+        def slow_fetch(keyword, geo, timeframe, hl):
+            release.wait(5)
+            return {}
+
+        client = self.create_client(slow_fetch, timeout=0.05, max_retries=0)
+        try:
+            with self.assertRaises(TrendsUnavailableError):
+                client.fetch('사과', 'KR', 'today 5-y', 'ko')
+        finally:
+            release.set()
+
+        self.assertEqual(client.stats()['timeouts'], 1)
+        self.assertEqual(client.stats()['failures'], 1)
+        self.assertEqual(self.breaker.stats()['failures'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import time
+import unittest
+
+from recommend.google_trends.snapshot import TrendsSnapshotImporter, TrendsSnapshotStore, read_topics_csv
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class FakeFetchMany:
+    """pytrends 대신 사용하는 fetch_many. failing에 있는 keyword가 포함된 묶음은 실패한다."""
+
+    def __init__(self, failing=()):
+        self.batches = []
+        self.failing = set(failing)
+
+    def __call__(self, keywords, geo, timeframe, hl):
+        self.batches.append(list(keywords))
+        if self.failing & set(keywords):
+            raise RuntimeError('upstream unavailable')
+        return {keyword: {'top': [{'topic_title': f'{keyword} 토픽', 'topic_type': 'Topic', 'value': 100}],
+                          'rising': []} for keyword in keywords}
+
+
+class TrendsSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'snapshot.sqlite3')
+        self.store = TrendsSnapshotStore(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_topics_csv(self):
+        topics = read_topics_csv(os.path.join(FIXTURES, 'trends_topics.csv'))
+
+        self.assertEqual(set(topics), {'사과', '바나나', '포도'})
+        self.assertEqual([record['topic_title'] for record in topics['사과']['top']], ['과일', '아이폰'])
+        self.assertEqual(topics['사과']['rising'][0]['value'], 250)
+        self.assertEqual(topics['포도'], {'top': [], 'rising': []})
+
+    def test_import_csv_file(self):
+        importer = TrendsSnapshotImporter(self.store, FakeFetchMany())
+
+        result = importer.import_file(os.path.join(FIXTURES, 'trends_topics.csv'))
+
+        self.assertEqual(result, {'imported': 3, 'failed': 0})
+        self.assertEqual(self.store.get('바나나')['top'][0]['topic_title'], '바나나우유')
+        self.assertIsNone(self.store.get('딸기'))
+
+    def test_import_json_file(self):
+        importer = TrendsSnapshotImporter(self.store, FakeFetchMany())
+
+        result = importer.import_file(os.path.join(FIXTURES, 'trends_topics.json'))
+
+        self.assertEqual(result, {'imported': 2, 'failed': 0})
+        self.assertEqual(self.store.get('딸기')['rising'][0]['topic_title'], '딸기 케이크')
+        self.assertEqual(TrendsSnapshotStore(self.path).get('사과')['top'][0]['value'], 100)
+
+    def test_import_keywords_in_batches(self):
+        fetch_many = FakeFetchMany(failing={'실패'})
+        importer = TrendsSnapshotImporter(self.store, fetch_many, batch_size=2)
+
+        result = importer.import_keywords(['사과', '바나나', '실패', '포도', '사과', ''])
+
+        self.assertEqual(fetch_many.batches, [['사과', '바나나'], ['실패', '포도']])
+        self.assertEqual(result, {'imported': 2, 'failed': 2})
+        self.assertEqual(set(self.store.get_many(['사과', '바나나', '포도'])), {'사과', '바나나'})
+
+    def test_refresh_fetches_only_missing_and_expired_keywords(self):
+        importer = TrendsSnapshotImporter(self.store, FakeFetchMany(), lambda: ['사과', '바나나', '딸기'],
+                                          max_age=60 * 60)
+        importer.import_file(os.path.join(FIXTURES, 'trends_topics.csv'), fetched_at=time.time())
+        self.store.put_many({'바나나': {'top': [], 'rising': []}}, fetched_at=time.time() - 2 * 60 * 60)
+
+        fetch_many = importer.fetch_many = FakeFetchMany()
+        result = importer.refresh()
+
+        # 저장되지 않은 keyword를 먼저, 오래된 keyword를 나중에 조회한다.
+        self.assertEqual(fetch_many.batches, [['딸기', '바나나']])
+        self.assertEqual(result, {'keywords': 3, 'stale': 2, 'imported': 2, 'failed': 0})
+        self.assertEqual(self.store.get('바나나')['top'][0]['topic_title'], '바나나 토픽')
+        self.assertEqual(importer.stats()['runs'], 1)
+
+    def test_rows_written_by_another_process_are_read_after_memory_ttl(self):
+        store = TrendsSnapshotStore(self.path, memory_ttl=0.05)
+        store.put_many({'사과': {'top': [], 'rising': []}})
+        self.assertEqual(store.get('사과')['top'], [])
+
+        TrendsSnapshotStore(self.path).put_many({'사과': {'top': [{'topic_title': '과일'}], 'rising': []}})
+        time.sleep(0.1)
+
+        self.assertEqual(store.get('사과')['top'][0]['topic_title'], '과일')
+
+    def test_only_one_importer_holds_the_refresh_lock(self):
+        lock_path = self.path + '.lock'
+        first = TrendsSnapshotImporter(self.store, FakeFetchMany())
+        second = TrendsSnapshotImporter(self.store, FakeFetchMany())
+
+        self.assertTrue(first._acquire_lock(lock_path))
+        self.assertTrue(first._acquire_lock(lock_path))
+        self.assertFalse(second._acquire_lock(lock_path))
+
+        first._lock_file.close()
+        self.assertTrue(second._acquire_lock(lock_path))
+        second._lock_file.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
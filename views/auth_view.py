@@ -9,6 +9,33 @@ def create_auth_endpoint(services, config):
 
     jwt_service = services.jwt_service
     auth_service = services.auth_service
+    authorization_cache = services.authorization_cache
+
+    # metrics
+    @auth_view.route('/metrics', methods=['GET'])
+    @jwt_service.admin_required
+    def auth_metrics():
+        """인증 캐시 사용 정보 조회 엔드포인트 (관리자 전용)
+
+        :request: 관리자 토큰이 포함된 헤더:
+            { "adminToken": str }
+
+        :response: 상태, 결과메시지, 데이터가 담긴 json 객체:
+            {
+                "state": str,       # 상태
+                "message": str,     # 결과 메시지
+                "data": {           # 반환하는 데이터 (JWTService.stats, AuthorizationCache.stats 참고)
+                    "jwt": dict,
+                    "authorization": dict
+                }
+            }
+        """
+        try:
+            metrics = {'jwt': jwt_service.stats(), 'authorization': authorization_cache.stats()}
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, JwtMessage.ERROR.value)), 500
+
+        return jsonify(response_from_message(ResponseText.SUCCESS.value, JwtMessage.GET.value, metrics)), 200
 
     # login
     @auth_view.route('/sign-in', methods=['POST'])
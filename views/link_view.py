@@ -158,11 +158,60 @@ def create_link_endpoint(services):
             } for link in link_list]
         }))
 
+    @link_view.route('/suggest', methods=['GET'])
+    @jwt_service.login_required
+    @note_service.confirm_auth
+    def link_suggest():
+        """노트 내 페이지 간 연결 제안 엔드포인트
+
+        :request access token이 담긴 헤더:
+            {
+                "accessToken": str      # 사용자의 access 토큰
+            }
+        :request: 노트 id와 제안받을 연결 수를 포함한 query:
+            {
+                "noteId": int,  # 노트 id
+                "k": int        # 제안받을 연결 수 (기본값: 10, 1 이상, 최대 MAX_SUGGESTED_LINKS(100)개까지 반환)
+            }
+        :response: 상태, 결과메시지, 데이터가 담긴 json 객체:
+            {
+                "state": str,                       # 상태
+                "message": str,                     # 결과 메시지
+                "data": {                           # 반환하는 데이터
+                    linkList: [{
+                        "pageId": int,          # 페이지 id
+                        "linkedPageId": int,    # 연결할 페이지 id
+                        "linkage": double       # 제안하는 연결 강도
+                    }]
+                }
+            }
+        """
+        note_id = request.args.get('noteId')
+        k = request.args.get('k', 10, type=int)
+
+        try:
+            link_list = link_service.suggest_links(note_id, k)
+
+            if isinstance(link_list, LinkMessage):
+                message = response_from_message(ResponseText.FAIL.value, link_list.value)
+                if link_list == LinkMessage.FAIL_INVALID_REQUEST:
+                    return jsonify(message), 400
+                return jsonify(message), 500
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, LinkMessage.ERROR.value)), 500
+
+        return jsonify(response_from_message(ResponseText.SUCCESS.value, LinkMessage.READ.value, {
+            'linkList': [{
+                'pageId': link['page_id'],
+                'linkedPageId': link['linked_page_id'],
+                'linkage': link['linkage']
+            } for link in link_list]
+        }))
+
 
     # delete
     @link_view.route('/delete', methods=['POST'])
     @jwt_service.login_required
-    @page_service.confirm_auth
     @page_service.is_included_same_note
     def link_delete():
         """연결 정보 삭제 엔드포인트
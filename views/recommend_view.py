@@ -1,11 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 
 from data import response_from_message, ResponseText, RecommendMessage
 
+# 한 번의 batch 요청으로 추천받을 수 있는 최대 항목 수
+# (캐시에 없는 keyword는 keyword마다 google trends 요청을 보내므로 작게 유지한다.)
+MAX_BATCH_ITEMS = 10
+# 한 번의 자동 완성 요청으로 받을 수 있는 최대 키워드 수
+MAX_AUTOCOMPLETE_LIMIT = 20
+
 def create_recommend_endpoint(services):
     recommend_view = Blueprint('recommend_view', __name__)
 
     jwt_service = services.jwt_service
+    note_service = services.note_service
     recommend_service = services.recommend_service
 
     @recommend_view.route('/trend', methods=['GET'])
@@ -29,6 +36,69 @@ def create_recommend_endpoint(services):
             } for word in recommend]
         })), 200
 
+    @recommend_view.route('/trend/batch', methods=['POST'])
+    @jwt_service.login_required
+    def recommend_trend_batch():
+        """여러 키워드를 google trends로 한 번에 추천하는 엔드포인트
+
+        :request: access 토큰이 포함된 헤더:
+            { "accessToken": str }
+        :request: 추천할 키워드와 페이지 id 목록을 포함한 json 객체 (최대 MAX_BATCH_ITEMS(10)개):
+            {
+                "items": [{
+                    "keyword": str, # 추천할 키워드
+                    "pageId": int   # 페이지 id
+                }]
+            }
+        :response: 상태, 결과메시지, 데이터가 담긴 json 객체:
+            {
+                "state": str,               # 상태
+                "message": str,             # 결과 메시지
+                "data": {                   # 반환하는 데이터
+                    "recommendList": [{
+                        "keyword": str,     # 추천할 키워드
+                        "pageId": int,      # 페이지 id
+                        "recommend": [{     # 추천 결과 (실패하면 null)
+                            "keyword": str,
+                            "similarity": float
+                        }]
+                    }]
+                }
+            }
+        """
+        body = request.json
+
+        try:
+            items = [{
+                'keyword': item['keyword'],
+                'page_id': item['pageId']
+            } for item in body['items']]
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.FAIL_INVALID_REQUEST.value)), 400
+
+        if not items or len(items) > MAX_BATCH_ITEMS:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.FAIL_INVALID_REQUEST.value)), 400
+
+        try:
+            recommend_list = recommend_service.recommend_googletrends_batch(items)
+
+            if isinstance(recommend_list, RecommendMessage):
+                message = response_from_message(ResponseText.FAIL.value, recommend_list.value)
+                return jsonify(message), 500
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.ERROR.value)), 500
+
+        return jsonify(response_from_message(ResponseText.SUCCESS.value, RecommendMessage.GET.value, {
+            'recommendList': [{
+                'keyword': item['keyword'],
+                'pageId': item['page_id'],
+                'recommend': [{
+                    'keyword': word[0],
+                    'similarity': word[1]
+                } for word in recommend] if not isinstance(recommend, RecommendMessage) else None
+            } for item, recommend in zip(items, recommend_list)]
+        })), 200
+
     @recommend_view.route('/association', methods=['GET'])
     def recommend_association():
         keyword = request.args.get('keyword')
@@ -37,6 +107,59 @@ def create_recommend_endpoint(services):
         try:
             recommend = recommend_service.recommend_w2v(keyword, page_id)
 
+            if isinstance(recommend, RecommendMessage):
+                message = response_from_message(ResponseText.FAIL.value, recommend.value)
+                if recommend == RecommendMessage.FAIL_OVERLOADED:
+                    return jsonify(message), 503
+                return jsonify(message), 500
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.ERROR.value)), 500
+
+        return jsonify(response_from_message(ResponseText.SUCCESS.value, RecommendMessage.GET.value, {
+            'recommend': [{
+                'keyword': word[0],
+                'similarity': word[1]
+            } for word in recommend]
+        })), 200
+
+    @recommend_view.route('/note', methods=['GET'])
+    @jwt_service.login_required
+    @note_service.confirm_auth
+    def recommend_note():
+        """노트의 모든 페이지 키워드를 Word2Vec로 한 번에 추천하는 엔드포인트 (노트 소유주만 요청 가능)
+
+        :request: access 토큰이 포함된 헤더:
+            { "accessToken": str }
+        :request: 추천할 노트 id를 포함한 query string:
+            ?noteId=int
+        :response: 상태, 결과메시지, 데이터가 담긴 json 객체:
+            {
+                "state": str,               # 상태
+                "message": str,             # 결과 메시지
+                "data": {                   # 반환하는 데이터
+                    "pageList": [{
+                        "pageId": int,      # 페이지 id
+                        "keyword": str,     # 페이지 키워드
+                        "recommend": [{     # 페이지 키워드의 추천 결과
+                            "keyword": str,
+                            "similarity": float
+                        }]
+                    }],
+                    "recommend": [{         # 노트 전체(페이지 키워드 중심)의 추천 결과
+                        "keyword": str,
+                        "similarity": float
+                    }]
+                }
+            }
+        """
+        note_id = request.args.get('noteId')
+
+        if note_id is None:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.FAIL_INVALID_REQUEST.value)), 400
+
+        try:
+            recommend = recommend_service.recommend_note(note_id)
+
             if isinstance(recommend, RecommendMessage):
                 message = response_from_message(ResponseText.FAIL.value, recommend.value)
                 return jsonify(message), 500
@@ -44,10 +167,164 @@ def create_recommend_endpoint(services):
             return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.ERROR.value)), 500
 
         return jsonify(response_from_message(ResponseText.SUCCESS.value, RecommendMessage.GET.value, {
+            'pageList': [{
+                'pageId': page['page_id'],
+                'keyword': page['keyword'],
+                'recommend': [{
+                    'keyword': word[0],
+                    'similarity': word[1]
+                } for word in page['recommend']]
+            } for page in recommend['page_list']],
             'recommend': [{
                 'keyword': word[0],
                 'similarity': word[1]
+            } for word in recommend['note']]
+        })), 200
+
+    @recommend_view.route('/autocomplete', methods=['GET'])
+    @jwt_service.login_required
+    def recommend_autocomplete():
+        """페이지 키워드 자동 완성 엔드포인트
+
+        :request: 접두사와 결과 수를 포함한 query string:
+            ?prefix=str&limit=int (limit 생략 시 10, 최대 MAX_AUTOCOMPLETE_LIMIT)
+        :response: 상태, 결과메시지, 데이터가 담긴 json 객체:
+            {
+                "state": str,           # 상태
+                "message": str,         # 결과 메시지
+                "data": {               # 반환하는 데이터
+                    "recommend": [{
+                        "keyword": str, # 완성된 키워드
+                        "source": str   # 출처 ('user': 사용자가 사용한 키워드, 'vocabulary': 단어 사전)
+                    }]
+                }
+            }
+        """
+        prefix = request.args.get('prefix')
+
+        try:
+            limit = int(request.args.get('limit', 10))
+        except ValueError as e:
+            limit = None
+
+        if not prefix or limit is None or not 0 < limit <= MAX_AUTOCOMPLETE_LIMIT:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.FAIL_INVALID_REQUEST.value)), 400
+
+        try:
+            recommend = recommend_service.complete_keyword(prefix, g.user_id, limit)
+
+            if isinstance(recommend, RecommendMessage):
+                message = response_from_message(ResponseText.FAIL.value, recommend.value)
+                if recommend == RecommendMessage.FAIL_INVALID_REQUEST:
+                    return jsonify(message), 404
+                return jsonify(message), 500
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.ERROR.value)), 500
+
+        return jsonify(response_from_message(ResponseText.SUCCESS.value, RecommendMessage.GET.value, {
+            'recommend': [{
+                'keyword': word[0],
+                'source': word[1]
             } for word in recommend]
         })), 200
 
+    @recommend_view.route('/metrics', methods=['GET'])
+    @jwt_service.admin_required
+    def recommend_metrics():
+        try:
+            metrics = recommend_service.get_metrics()
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.ERROR.value)), 500
+
+        return jsonify(response_from_message(ResponseText.SUCCESS.value, RecommendMessage.GET.value, metrics)), 200
+
+    @recommend_view.route('/admin/model', methods=['GET'])
+    @jwt_service.admin_required
+    def recommend_model_versions():
+        """추천 모델 버전 조회 엔드포인트
+
+        :request: 관리자 토큰이 포함된 헤더:
+            { "adminToken": str }
+        :response: 상태, 결과메시지, 데이터가 담긴 json 객체:
+            {
+                "state": str,               # 상태
+                "message": str,             # 결과 메시지
+                "data": {                   # 반환하는 데이터 (ModelRegistry.stats 참고)
+                    "active": dict,         # 활성 버전 (version, path, loaded, load_time, vocab_size, activated_at)
+                    "previous": list,       # 되돌릴 수 있는 이전 버전
+                    "loading": int,         # 불러오는 중인 버전
+                    "last_error": str       # 마지막으로 실패한 버전과 오류
+                }
+            }
+        """
+        try:
+            versions = recommend_service.get_model_versions()
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.ERROR.value)), 500
+
+        return jsonify(response_from_message(ResponseText.SUCCESS.value, RecommendMessage.GET.value, versions)), 200
+
+    @recommend_view.route('/admin/model/reload', methods=['POST'])
+    @jwt_service.admin_required
+    def recommend_model_reload():
+        """새 추천 모델 버전을 백그라운드에서 불러오는 엔드포인트
+        검증에 성공하면 활성 버전과 교체되며, 결과는 /admin/model 로 확인합니다.
+
+        :request: 관리자 토큰이 포함된 헤더:
+            { "adminToken": str }
+        :request: 새 모델 경로를 포함한 json 객체 (생략하면 활성 버전의 모델 경로):
+            { "modelPath": str }
+        :response: 상태, 결과메시지, 데이터가 담긴 json 객체:
+            {
+                "state": str,       # 상태
+                "message": str,     # 결과 메시지
+                "data": {
+                    "version": int  # 불러오기 시작한 버전 번호
+                }
+            }
+        """
+        body = request.get_json(silent=True) or {}
+
+        try:
+            version = recommend_service.reload_model(body.get('modelPath'))
+
+            if isinstance(version, RecommendMessage):
+                message = response_from_message(ResponseText.FAIL.value, version.value)
+                if version == RecommendMessage.FAIL_MODEL_LOADING:
+                    return jsonify(message), 409
+                return jsonify(message), 500
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.ERROR.value)), 500
+
+        return jsonify(response_from_message(ResponseText.SUCCESS.value, RecommendMessage.GET.value, {'version': version})), 202
+
+    @recommend_view.route('/admin/model/rollback', methods=['POST'])
+    @jwt_service.admin_required
+    def recommend_model_rollback():
+        """추천 모델을 직전 버전으로 되돌리는 엔드포인트
+
+        :request: 관리자 토큰이 포함된 헤더:
+            { "adminToken": str }
+        :response: 상태, 결과메시지, 데이터가 담긴 json 객체:
+            {
+                "state": str,       # 상태
+                "message": str,     # 결과 메시지
+                "data": {
+                    "version": int  # 다시 활성화된 버전 번호
+                }
+            }
+        """
+        try:
+            version = recommend_service.rollback_model()
+
+            if isinstance(version, RecommendMessage):
+                message = response_from_message(ResponseText.FAIL.value, version.value)
+                if version == RecommendMessage.FAIL_NO_PREVIOUS_MODEL:
+                    return jsonify(message), 400
+                return jsonify(message), 500
+        except Exception as e:
+            return jsonify(response_from_message(ResponseText.FAIL.value, RecommendMessage.ERROR.value)), 500
+
+        return jsonify(response_from_message(ResponseText.SUCCESS.value, RecommendMessage.GET.value, {'version': version})), 200
+
     return recommend_view